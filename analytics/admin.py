@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import RollupRun
 
-# Register your models here.
+# ------------------------ ROLLUP RUN ADMIN ------------------------
+@admin.register(RollupRun)
+class RollupRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'full', 'days']
+    list_filter = ['full']
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily analytics rollups for every day whose jobs changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every day, not just the changed ones')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        run = rollup.run(
+            full=options['full'],
+            progress=lambda run, total: self.stdout.write(f'  {run.days:,} / {total:,} days'),
+        )
+        if run is None:
+            raise CommandError('Another rollup is in progress')
+
+        kind = 'full rebuild' if run.full else 'incremental'
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {run.days:,} day(s) ({kind}) in {time.perf_counter() - start:.1f} s'
+        ))
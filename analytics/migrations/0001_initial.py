@@ -0,0 +1,92 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0010_job_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('full', models.BooleanField(default=False)),
+                ('days', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StaleDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyJobStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('jobs', models.IntegerField(default=0)),
+                ('salaried', models.IntegerField(default=0)),
+                ('salary_min_sum', models.BigIntegerField(default=0)),
+                ('job_type', models.CharField(max_length=20)),
+                ('experience_level', models.CharField(max_length=20)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'job_type', 'experience_level'), name='analytics_daily_job_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCompanyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('jobs', models.IntegerField(default=0)),
+                ('salaried', models.IntegerField(default=0)),
+                ('salary_min_sum', models.BigIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.company')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'company'), name='analytics_daily_company_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyLocationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('jobs', models.IntegerField(default=0)),
+                ('salaried', models.IntegerField(default=0)),
+                ('salary_min_sum', models.BigIntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.location')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'location'), name='analytics_daily_location_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySkillStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('jobs', models.IntegerField(default=0)),
+                ('salaried', models.IntegerField(default=0)),
+                ('salary_min_sum', models.BigIntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'skill'), name='analytics_daily_skill_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def mark_rolled_up_days_stale(apps, schema_editor):
+    # The next rollup run recomputes these days and fills in the new series
+    DailySkillStat = apps.get_model('analytics', 'DailySkillStat')
+    StaleDay = apps.get_model('analytics', 'StaleDay')
+    days = DailySkillStat.objects.order_by().values_list('day', flat=True).distinct()
+    StaleDay.objects.bulk_create([StaleDay(day=day) for day in days], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('jobs', '0011_skill_cooccurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillTrend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField()),
+                ('new', models.BinaryField()),
+                ('active', models.BinaryField()),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trends', to='jobs.skill')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('skill', 'year'), name='analytics_skill_trend_unique')],
+            },
+        ),
+        migrations.RunPython(mark_rolled_up_days_stale, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,96 @@
 from django.db import models
 
-# Create your models here.
+from jobs.models import Company, Location, Skill
+
+# Daily rollups of approved, active jobs by posted_date, written by
+# analytics.rollup (python manage.py rollup_analytics) and read by the
+# dashboard, so its cost depends on the date range, not on the jobs table.
+
+
+class DailyRollup(models.Model):
+    day = models.DateField()  # Job.posted_date
+    jobs = models.IntegerField(default=0)  # Approved, active jobs posted that day
+    salaried = models.IntegerField(default=0)  # ...of which have a salary_min
+    salary_min_sum = models.BigIntegerField(default=0)  # Sum of their salary_min (for averages)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def avg_salary(self):
+        return self.salary_min_sum / self.salaried if self.salaried else None
+
+
+# Per day, job type and experience level (also gives the daily totals)
+class DailyJobStat(DailyRollup):
+    job_type = models.CharField(max_length=20)
+    experience_level = models.CharField(max_length=20)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'job_type', 'experience_level'], name='analytics_daily_job_unique'),
+        ]
+
+
+# Per day and skill
+class DailySkillStat(DailyRollup):
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'skill'], name='analytics_daily_skill_unique'),
+        ]
+
+
+# Per day and company
+class DailyCompanyStat(DailyRollup):
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'company'], name='analytics_daily_company_unique'),
+        ]
+
+
+# Per day and location (jobs without a location are only in DailyJobStat)
+class DailyLocationStat(DailyRollup):
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='daily_stats')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'location'], name='analytics_daily_location_unique'),
+        ]
+
+
+# A year of one skill's daily demand as arrays indexed by day of the year
+# (see analytics.trends), so any set of skills and days is one read
+class SkillTrend(models.Model):
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='trends')
+    year = models.SmallIntegerField()
+    new = models.BinaryField()  # 366 int32: jobs posted that day (DailySkillStat.jobs)
+    active = models.BinaryField()  # 366 int32: the skill's job_count that day, -1 before it was recorded
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'year'], name='analytics_skill_trend_unique'),
+        ]
+
+
+# Days whose rollups must be recomputed for changes updated_at can't show:
+# deleted jobs, skill changes and jobs moved to another posted_date
+class StaleDay(models.Model):
+    day = models.DateField(primary_key=True)
+
+
+# One rollup run; the last finished run is where the next one picks up
+class RollupRun(models.Model):
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, blank=True)
+    full = models.BooleanField(default=False)  # Rebuilt every day rather than the changed ones
+    days = models.IntegerField(default=0)  # Days recomputed
+
+    class Meta:
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"Rollup at {self.started_at:%Y-%m-%d %H:%M} ({self.days} days)"
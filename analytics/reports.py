@@ -0,0 +1,140 @@
+"""
+Dashboard queries over the daily rollups (see analytics.rollup).
+
+Every function takes an inclusive (start, end) date range and reads only
+rollup rows, so its cost depends on the length of the range and on the
+number of skills, companies and locations, never on how many jobs are
+stored.
+"""
+
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import DailyCompanyStat, DailyJobStat, DailyLocationStat, DailySkillStat
+
+DEFAULT_DAYS = 30
+
+# Timeline resolution: one point per day up to ~3 months, per week up to 2 years, then per month
+DAILY_UP_TO = 92
+WEEKLY_UP_TO = 730
+
+
+def parse_range(start=None, end=None, today=None, days=DEFAULT_DAYS):
+    """(start, end) from YYYY-MM-DD strings; missing or invalid values fall back to the last `days` days."""
+    end = _parse(end) or today or timezone.now().date()
+    start = _parse(start) or end - timedelta(days=days)
+    return (start, end) if start <= end else (end, start)
+
+
+def _parse(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:  # well formed but not a real date, e.g. 2025-02-30
+        return None
+
+
+def first_day():
+    """The earliest day with rollups (the start of "all time")."""
+    return DailyJobStat.objects.order_by('day').values_list('day', flat=True).first()
+
+
+def in_range(model, start, end):
+    return model.objects.filter(day__gte=start, day__lte=end)
+
+
+def totals(start, end):
+    """Jobs posted in the range and their average salary_min."""
+    row = in_range(DailyJobStat, start, end).aggregate(
+        jobs=Sum('jobs'), salaried=Sum('salaried'), salary_min_sum=Sum('salary_min_sum')
+    )
+    return {
+        'jobs': row['jobs'] or 0,
+        'avg_salary': row['salary_min_sum'] / row['salaried'] if row['salaried'] else None,
+    }
+
+
+def breakdown(field, start, end):
+    """[(value, jobs)] for job_type or experience_level, most jobs first."""
+    return list(
+        in_range(DailyJobStat, start, end).values(field).annotate(n=Sum('jobs'))
+        .order_by('-n', field).values_list(field, 'n')
+    )
+
+
+def top(model, field, start, end, limit=10):
+    """[(object, jobs)] for the `limit` skills, companies or locations with the most jobs in the range."""
+    rows = list(
+        in_range(model, start, end).values(f'{field}_id').annotate(n=Sum('jobs'))
+        .order_by('-n', f'{field}_id').values_list(f'{field}_id', 'n')[:limit]
+    )
+    objects = model._meta.get_field(field).related_model.objects.in_bulk([pk for pk, _ in rows])
+    return [(objects[pk], n) for pk, n in rows if pk in objects]
+
+
+def timeline_unit(start, end):
+    days = (end - start).days + 1
+    return 'day' if days <= DAILY_UP_TO else 'week' if days <= WEEKLY_UP_TO else 'month'
+
+
+def timeline(start, end):
+    """(unit, [(period start, jobs)]) with a point for every day, week or month in the range."""
+    unit = timeline_unit(start, end)
+    rows = in_range(DailyJobStat, start, end)
+    if unit == 'day':
+        rows = rows.values('day').annotate(n=Sum('jobs')).values_list('day', 'n')
+    else:
+        trunc = TruncWeek('day') if unit == 'week' else TruncMonth('day')
+        rows = rows.annotate(period=trunc).values('period').annotate(n=Sum('jobs')).values_list('period', 'n')
+    counts = dict(rows.order_by())
+    return unit, [(period, counts.get(period, 0)) for period in periods(start, end, unit)]
+
+
+def periods(start, end, unit):
+    """Start dates of the days, weeks (Mondays) or months covering start..end."""
+    if unit == 'week':
+        current = start - timedelta(days=start.weekday())
+    elif unit == 'month':
+        current = start.replace(day=1)
+    else:
+        current = start
+    while current <= end:
+        yield current
+        if unit == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if unit == 'week' else 1)
+
+
+def summary(start, end):
+    """The dashboard's figures for the range as JSON-ready data (the async API's /analytics/summary/)."""
+    row = totals(start, end)
+    unit, points = timeline(start, end)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'jobs': row['jobs'],
+        'avg_salary': round(row['avg_salary'], 2) if row['avg_salary'] else None,
+        'job_types': [{'job_type': value, 'jobs': n} for value, n in breakdown('job_type', start, end)],
+        'experience_levels': [
+            {'experience_level': value, 'jobs': n} for value, n in breakdown('experience_level', start, end)
+        ],
+        'top_skills': [
+            {'id': skill.pk, 'name': skill.name, 'jobs': n} for skill, n in top(DailySkillStat, 'skill', start, end)
+        ],
+        'top_companies': [
+            {'id': company.pk, 'name': company.name, 'jobs': n}
+            for company, n in top(DailyCompanyStat, 'company', start, end)
+        ],
+        'top_locations': [
+            {'id': location.pk, 'name': str(location), 'jobs': n}
+            for location, n in top(DailyLocationStat, 'location', start, end)
+        ],
+        'timeline': {
+            'unit': unit,
+            'points': [{'period': period.isoformat(), 'jobs': n} for period, n in points],
+        },
+    }
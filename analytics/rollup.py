@@ -0,0 +1,142 @@
+"""
+Incremental daily rollups for the analytics dashboard.
+
+Rollups are recomputed a whole day at a time: every rollup row for the
+day is deleted and re-aggregated from the approved, active jobs posted
+that day, in one transaction, so re-running a day is always safe. Which
+days need it is worked out from:
+
+- Job.updated_at since the previous run started (minus OVERLAP, so that
+  transactions committing late are not missed): new jobs, moderation,
+  re-scrapes, retagging and any other change to a field the rollups read
+  (jobs.models.ROLLUP_FIELDS) bump it
+- StaleDay rows, left by analytics.signals for changes updated_at can't
+  show: deleted jobs, skill changes and jobs moved to another posted_date
+  (both days)
+
+The first run, and run(full=True), rebuild every day. Each run also
+updates the per-skill trend series (see analytics.trends).
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from jobs import caching, counters
+from jobs.models import Job
+
+from . import trends
+from .models import DailyCompanyStat, DailyJobStat, DailyLocationStat, DailySkillStat, RollupRun, StaleDay
+
+ROLLUP_MODELS = [DailyJobStat, DailySkillStat, DailyCompanyStat, DailyLocationStat]
+
+OVERLAP = timedelta(minutes=10)
+DAYS_PER_CHUNK = 31  # days recomputed per transaction
+
+LOCK_KEY = 'skillscope:analytics:rollup'
+LOCK_TIMEOUT = 3600
+
+
+def _totals(prefix=''):
+    return {
+        'jobs': Count('pk'),
+        'salaried': Count(f'{prefix}salary_min'),
+        'salary_min_sum': Sum(f'{prefix}salary_min'),
+    }
+
+
+def _build(model, rows, day, **keys):
+    """Rollup objects from aggregated values() rows; `keys` maps model fields to row keys."""
+    return [
+        model(
+            day=row[day], jobs=row['jobs'], salaried=row['salaried'],
+            salary_min_sum=row['salary_min_sum'] or 0,
+            **{field: row[key] for field, key in keys.items()},
+        )
+        for row in rows
+    ]
+
+
+def rollup_days(days):
+    """Recompute every rollup for `days` in one transaction."""
+    jobs = Job.objects.filter(counters.COUNTED, posted_date__in=days).order_by()
+    links = Job.skills.through.objects.filter(
+        Q(job__is_active=True, job__status='approved'), job__posted_date__in=days
+    ).order_by()
+
+    with transaction.atomic():
+        # Markers go first: one added while this runs survives for the next run
+        StaleDay.objects.filter(day__in=days).delete()
+        for model in ROLLUP_MODELS:
+            model.objects.filter(day__in=days).delete()
+
+        DailyJobStat.objects.bulk_create(_build(
+            DailyJobStat,
+            jobs.values('posted_date', 'job_type', 'experience_level').annotate(**_totals()),
+            'posted_date', job_type='job_type', experience_level='experience_level',
+        ), batch_size=1000)
+        skill_stats = DailySkillStat.objects.bulk_create(_build(
+            DailySkillStat,
+            links.values('job__posted_date', 'skill_id').annotate(**_totals('job__')),
+            'job__posted_date', skill_id='skill_id',
+        ), batch_size=1000)
+        trends.write_new(days, skill_stats)
+        DailyCompanyStat.objects.bulk_create(_build(
+            DailyCompanyStat,
+            jobs.values('posted_date', 'company_id').annotate(**_totals()),
+            'posted_date', company_id='company_id',
+        ), batch_size=1000)
+        DailyLocationStat.objects.bulk_create(_build(
+            DailyLocationStat,
+            jobs.filter(location__isnull=False).values('posted_date', 'location_id').annotate(**_totals()),
+            'posted_date', location_id='location_id',
+        ), batch_size=1000)
+
+
+def changed_days(since):
+    """Posted dates of jobs changed since `since`, plus the days marked stale."""
+    days = set(
+        Job.objects.filter(updated_at__gte=since).order_by()
+        .values_list('posted_date', flat=True).distinct()
+    )
+    days.update(StaleDay.objects.values_list('day', flat=True))
+    return days
+
+
+def all_days():
+    """Every day with jobs, plus every day with rollups (which may have lost all of its jobs)."""
+    days = set(Job.objects.order_by().values_list('posted_date', flat=True).distinct())
+    days.update(DailyJobStat.objects.order_by().values_list('day', flat=True).distinct())
+    days.update(StaleDay.objects.values_list('day', flat=True))
+    return days
+
+
+def run(full=False, progress=None):
+    """Bring the rollups up to date; returns the RollupRun, or None if another run is in progress."""
+    if not cache.add(LOCK_KEY, 1, LOCK_TIMEOUT):
+        return None
+    try:
+        last = RollupRun.objects.filter(finished_at__isnull=False).first()
+        rollup = RollupRun.objects.create(started_at=timezone.now(), full=full or last is None)
+
+        days = sorted(all_days() if rollup.full else changed_days(last.started_at - OVERLAP))
+        for start in range(0, len(days), DAYS_PER_CHUNK):
+            rollup_days(days[start:start + DAYS_PER_CHUNK])
+            rollup.days = min(start + DAYS_PER_CHUNK, len(days))
+            if progress:
+                progress(rollup, len(days))
+
+        with transaction.atomic():
+            active_changed = trends.record_active(timezone.now().date())
+
+        rollup.days = len(days)
+        rollup.finished_at = timezone.now()
+        rollup.save()
+        if days or active_changed:
+            caching.invalidate()  # the dashboard and trends are cached on top of the rollups
+        return rollup
+    finally:
+        cache.delete(LOCK_KEY)
@@ -0,0 +1,50 @@
+"""
+Mark rollup days stale (see analytics.rollup) for job changes that don't
+bump Job.updated_at: deletes, skill changes and posted_date edits (the
+days a job leaves and joins, from saves and JobQuerySet.update()). Only
+approved, active jobs are in the rollups, so only they mark days.
+"""
+
+from django.db.models.signals import m2m_changed, pre_delete, pre_save
+from django.dispatch import receiver
+
+from jobs import counters
+from jobs.models import Job, posted_dates_changed
+
+from .models import StaleDay
+
+
+def mark_stale(days):
+    StaleDay.objects.bulk_create([StaleDay(day=day) for day in set(days)], ignore_conflicts=True)
+
+
+@receiver(pre_delete, sender=Job)
+def mark_deleted_job_day(sender, instance, **kwargs):
+    if counters.is_counted(instance):
+        mark_stale([instance.posted_date])
+
+
+@receiver(pre_save, sender=Job)
+def mark_moved_job_day(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields is not None and 'posted_date' not in update_fields):
+        return
+    old = Job.objects.filter(counters.COUNTED, pk=instance.pk).values_list('posted_date', flat=True).first()
+    if old is not None and old != instance.posted_date:
+        mark_stale([old, instance.posted_date])
+
+
+@receiver(posted_dates_changed, sender=Job)
+def mark_moved_jobs_days(sender, days, **kwargs):
+    mark_stale(days)
+
+
+@receiver(m2m_changed, sender=Job.skills.through)
+def mark_retagged_job_days(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        # job.skills.add/remove/clear()
+        if action in ('post_add', 'post_remove', 'post_clear') and counters.is_counted(instance):
+            mark_stale([instance.posted_date])
+    elif action in ('pre_add', 'pre_remove', 'pre_clear'):
+        # skill.jobs.add/remove/clear(): pk_set holds job ids (None for clear)
+        jobs = instance.jobs.all() if action == 'pre_clear' else Job.objects.filter(pk__in=pk_set)
+        mark_stale(jobs.filter(counters.COUNTED).values_list('posted_date', flat=True))
@@ -0,0 +1,9 @@
+from celery import shared_task
+
+from . import rollup
+
+
+@shared_task(ignore_result=True)
+def rollup_analytics():
+    """Bring the dashboard rollups up to date (scheduled by CELERY_BEAT_SCHEDULE)."""
+    rollup.run()
@@ -1,3 +1,160 @@
+import itertools
+from datetime import date, timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from frontend.views import build_analytics_context
+from jobs.models import Company, Job, Location, Skill
+
+from . import reports, rollup, trends
+from .models import DailyJobStat, DailySkillStat, RollupRun
+
+
+def snapshot():
+    """Every rollup row, without ids, for comparing runs."""
+    return {
+        model.__name__: sorted(model.objects.values_list(*[
+            f.attname for f in model._meta.concrete_fields if not f.primary_key
+        ]))
+        for model in rollup.ROLLUP_MODELS
+    }
+
+
+class RollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.acme = Company.objects.create(name='Acme')
+        self.globex = Company.objects.create(name='Globex')
+        self.remote = Location.objects.create(city='Remote', country='Worldwide', is_remote=True)
+        self.python = Skill.objects.create(name='Python')
+        self.go = Skill.objects.create(name='Go')
+        self.job_numbers = itertools.count()
+
+    def add_job(self, days_ago=0, company=None, skills=(), status='approved', **kwargs):
+        job = Job.objects.create(
+            title=f'Engineer {next(self.job_numbers)}', company=company or self.acme, location=self.remote,
+            description='...', external_url='https://example.com', status=status,
+            posted_date=self.today - timedelta(days=days_ago), **kwargs
+        )
+        job.skills.add(*skills)
+        return job
+
+    def rollup(self, *args):
+        out = StringIO()
+        call_command('rollup_analytics', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dashboard_reads_rollups_only(self):
+        self.add_job(0, skills=[self.python], salary_min=100000, job_type='contract')
+        self.add_job(1, company=self.globex, skills=[self.python, self.go], salary_min=50000)
+        self.add_job(40, skills=[self.go])
+        self.add_job(2, status='pending', skills=[self.go])
+        self.assertIn('(full rebuild)', self.rollup())
+
+        context = build_analytics_context(*reports.parse_range(today=self.today))
+        self.assertEqual(context['total_jobs'], 2)
+        self.assertEqual(context['avg_salary'], 75000)
+        self.assertEqual(context['skills_labels'], '["Python", "Go"]')
+        self.assertEqual(context['companies_data'], '[1, 1]')
+        self.assertEqual(context['job_type_labels'], '["contract", "full_time"]')
+        self.assertEqual(context['timeline_unit'], 'day')
+        self.assertEqual(len(context['timeline_data'].split(',')), 31)
+
+        # A long range is charted per month, still from the rollups alone
+        start, end = self.today - timedelta(days=1000), self.today
+        with self.assertNumQueries(12):
+            context = build_analytics_context(start, end)
+        self.assertEqual(context['total_jobs'], 3)
+        self.assertEqual(context['timeline_unit'], 'month')
+
+    async def test_summary_endpoint_matches_the_dashboard(self):
+        await sync_to_async(self.add_job)(0, skills=[self.python], salary_min=100000, job_type='contract')
+        await sync_to_async(self.add_job)(1, company=self.globex, skills=[self.python, self.go])
+        await sync_to_async(self.rollup)()
+
+        response = await self.async_client.get('/api/analytics/summary/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['jobs'], data['avg_salary']), (2, 100000))
+        self.assertEqual([row['name'] for row in data['top_skills']], ['Python', 'Go'])
+        self.assertEqual(data['job_types'], [
+            {'job_type': 'contract', 'jobs': 1}, {'job_type': 'full_time', 'jobs': 1},
+        ])
+        self.assertEqual((data['timeline']['unit'], len(data['timeline']['points'])), ('day', 31))
+
+    def test_incremental_runs_match_a_full_rebuild(self):
+        jobs = [self.add_job(days_ago, skills=[self.python]) for days_ago in range(10)]
+        self.rollup()
+        # As if that run was an hour ago, after the jobs were last changed
+        RollupRun.objects.update(started_at=timezone.now() - timedelta(hours=1))
+        Job.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+
+        Job.objects.filter(pk=jobs[0].pk).update(status='rejected')  # updated_at
+        jobs[1].delete()                                             # StaleDay
+        jobs[2].skills.add(self.go)                                  # StaleDay
+        self.go.jobs.add(jobs[3])                                    # StaleDay
+        jobs[4].posted_date = self.today - timedelta(days=20)        # both days
+        jobs[4].save()
+        Job.objects.filter(pk=jobs[5].pk).update(job_type='contract')  # updated_at
+        Job.objects.filter(pk=jobs[6].pk).update(posted_date=self.today - timedelta(days=25))  # both days
+        jobs[7].salary_min = 90000
+        jobs[7].save(update_fields=['salary_min'])                   # updated_at
+        self.add_job(30, skills=[self.go])                           # new job
+
+        self.assertIn('Rolled up 11 day(s) (incremental)', self.rollup())
+        incremental = snapshot()
+
+        self.rollup('--full')
+        self.assertEqual(snapshot(), incremental)
+        self.assertEqual(DailyJobStat.objects.filter(day=self.today).count(), 0)
+        self.assertEqual(DailySkillStat.objects.filter(skill=self.go).count(), 3)
+
+    def test_skill_trends_follow_the_rollups(self):
+        jobs = [self.add_job(days_ago, skills=[self.python]) for days_ago in (0, 0, 1, 8)]
+        self.add_job(3, skills=[self.go])
+        self.rollup()
+
+        def fetch():
+            response = self.client.get('/api/analytics/skill_trends/', {
+                'skills': f'Python,{self.go.pk},Nope', 'start': str(self.today - timedelta(days=9)), 'window': 2,
+            })
+            return {row['name']: row for row in response.data['skills']}
+
+        python = fetch()['Python']
+        self.assertEqual(list(fetch()), ['Python', 'Go'])
+        self.assertEqual(python['new'], [0, 1, 0, 0, 0, 0, 0, 0, 1, 2])
+        self.assertEqual(python['active'], [None] * 9 + [4])
+        self.assertEqual(python['new_average'][-2:], [0.5, 1.5])
+        self.assertIsNone(python['new_growth'])  # nothing in the two days before
+        self.assertEqual(fetch()['Go']['new_growth'], -1.0)
+
+        # Moderation reaches the series through the next incremental run
+        RollupRun.objects.update(started_at=timezone.now() - timedelta(hours=1))
+        Job.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+        Job.objects.filter(pk=jobs[0].pk).update(status='rejected')
+        self.rollup()
+        python = fetch()['Python']
+        self.assertEqual((python['new'][-1], python['active'][-1]), (1, 3))
+
+        with self.assertNumQueries(1):
+            trends.read([self.python.pk, self.go.pk], self.today - timedelta(days=400), self.today)
 
-# Create your tests here.
+    def test_ranges_and_periods(self):
+        today = date(2025, 3, 15)
+        self.assertEqual(reports.parse_range(today=today), (date(2025, 2, 13), today))
+        self.assertEqual(reports.parse_range('2025-02-30', 'nope', today=today), (date(2025, 2, 13), today))
+        self.assertEqual(
+            reports.parse_range('2025-03-01', '2024-03-01', today=today), (date(2024, 3, 1), date(2025, 3, 1))
+        )
+        self.assertEqual(
+            list(reports.periods(date(2025, 1, 31), date(2025, 4, 1), 'month')),
+            [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1), date(2025, 4, 1)],
+        )
+        self.assertEqual(reports.timeline_unit(today - timedelta(days=200), today), 'week')
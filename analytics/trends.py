@@ -0,0 +1,164 @@
+"""
+Per-skill daily demand series for trend charts.
+
+Each SkillTrend row holds one skill's year as two arrays indexed by day
+of the year (DAYS slots, little-endian int32):
+
+- new: approved, active jobs posted that day with the skill, copied from
+  DailySkillStat whenever analytics.rollup recomputes a day, so it
+  follows ingestion and moderation the way the rollups do
+- active: the skill's job_count (the demand counter, see jobs.counters)
+  as of that day's last rollup run, or NOT_RECORDED for days before
+  runs recorded it
+
+Reading any set of skills over any range is one query returning a row
+per skill and year; moving averages and growth rates are computed over
+the resulting (skills x days) matrix with NumPy.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from jobs.models import Skill
+
+from .models import SkillTrend
+
+DAYS = 366
+NOT_RECORDED = -1
+
+
+def slot(day):
+    return (day - date(day.year, 1, 1)).days
+
+
+def _empty(skill_id, year):
+    return SkillTrend(
+        skill_id=skill_id, year=year,
+        new=np.zeros(DAYS, dtype='<i4').tobytes(),
+        active=np.full(DAYS, NOT_RECORDED, dtype='<i4').tobytes(),
+    )
+
+
+def _rows(years):
+    """{(skill pk, year): SkillTrend} for `years`, locked for update."""
+    return {
+        (row.skill_id, row.year): row
+        for row in SkillTrend.objects.select_for_update().filter(year__in=years)
+    }
+
+
+def _save(rows, created):
+    SkillTrend.objects.bulk_update(rows, ['new', 'active'], batch_size=500)
+    SkillTrend.objects.bulk_create(created, batch_size=500)
+
+
+def write_new(days, stats):
+    """Copy freshly computed DailySkillStat rows for `days` into the series (inside rollup_days' transaction)."""
+    rows = _rows({day.year for day in days})
+    arrays = {key: np.frombuffer(row.new, dtype='<i4').copy() for key, row in rows.items()}
+    for (_, year), new in arrays.items():
+        new[[slot(day) for day in days if day.year == year]] = 0  # days that lost all their jobs
+
+    created = {}
+    for stat in stats:
+        key = (stat.skill_id, stat.day.year)
+        if key not in arrays:
+            created[key] = _empty(*key)
+            arrays[key] = np.zeros(DAYS, dtype='<i4')
+        arrays[key][slot(stat.day)] = stat.jobs
+
+    for key, row in {**rows, **created}.items():
+        row.new = arrays[key].tobytes()
+    _save(list(rows.values()), list(created.values()))
+
+
+def record_active(day):
+    """Store every skill's current job_count as its active count for `day`; returns the skills changed."""
+    rows = _rows([day.year])
+    changed, created = [], []
+    for skill_id, job_count in Skill.objects.values_list('pk', 'job_count'):
+        row = rows.get((skill_id, day.year))
+        if row is None:
+            if not job_count:
+                continue
+            row = _empty(skill_id, day.year)
+            created.append(row)
+        active = np.frombuffer(row.active, dtype='<i4').copy()
+        if active[slot(day)] != job_count:
+            active[slot(day)] = job_count
+            row.active = active.tobytes()
+            if row.pk:
+                changed.append(row)
+    _save(changed, created)
+    return len(changed) + len(created)
+
+
+def read(skill_ids, start, end):
+    """(new, active) int matrices of shape (len(skill_ids), days in start..end); one query."""
+    length = (end - start).days + 1
+    new = np.zeros((len(skill_ids), length), dtype=np.int64)
+    active = np.full((len(skill_ids), length), NOT_RECORDED, dtype=np.int64)
+    index = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+
+    for skill_id, year, row_new, row_active in SkillTrend.objects.filter(
+        skill_id__in=skill_ids, year__gte=start.year, year__lte=end.year
+    ).values_list('skill_id', 'year', 'new', 'active'):
+        # The part of this year inside the range, and where it goes in the matrix
+        first, last = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+        offset = (first - start).days
+        span = slice(slot(first), slot(last) + 1)
+        new[index[skill_id], offset:offset + span.stop - span.start] = np.frombuffer(row_new, dtype='<i4')[span]
+        active[index[skill_id], offset:offset + span.stop - span.start] = np.frombuffer(row_active, dtype='<i4')[span]
+    return new, active
+
+
+def moving_average(matrix, window):
+    """Trailing `window`-day mean along each row; the first days average what there is."""
+    sums = np.cumsum(matrix, axis=1, dtype=float)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    return sums / np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+
+
+def growth(matrix, window):
+    """Change of each row's total over the last `window` days against the `window` days before."""
+    current = matrix[:, -window:].sum(axis=1)
+    previous = matrix[:, -2 * window:-window].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(previous > 0, (current - previous) / previous, np.nan)
+
+
+def skill_trends(skills, start, end, window=7):
+    """Daily series, moving averages and growth for `skills` over start..end (see module docstring)."""
+    # Read enough days before `start` for the first moving averages and the growth comparison
+    first = min(start - timedelta(days=window - 1), end - timedelta(days=2 * window - 1))
+    skills = list(skills)
+    new, active = read([skill.pk for skill in skills], first, end)
+    averages = moving_average(new, window)
+    new_growth = growth(new, window)
+
+    # Active postings: compare the last recorded counts `window` days apart
+    then, now = active[:, -window - 1], active[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        active_growth = np.where((then > 0) & (now != NOT_RECORDED), (now - then) / then, np.nan)
+
+    shown = slice((start - first).days, None)
+    return {
+        'start': start,
+        'end': end,
+        'window': window,
+        'days': [start + timedelta(days=i) for i in range((end - start).days + 1)],
+        'skills': [
+            {
+                'id': skill.pk,
+                'name': skill.name,
+                'job_count': skill.job_count,
+                'new': new[i, shown].tolist(),
+                'new_average': np.round(averages[i, shown], 2).tolist(),
+                'active': [None if n == NOT_RECORDED else n for n in active[i, shown].tolist()],
+                'new_growth': None if np.isnan(new_growth[i]) else round(float(new_growth[i]), 4),
+                'active_growth': None if np.isnan(active_growth[i]) else round(float(active_growth[i]), 4),
+            }
+            for i, skill in enumerate(skills)
+        ],
+    }
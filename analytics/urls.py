@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('skill_trends/', views.skill_trends, name='skill_trends'),
+    path('summary/', views.summary, name='analytics_summary'),
+]
@@ -1,3 +1,61 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
 
-# Create your views here.
+from jobs.caching import acached, cached
+from jobs.models import Skill
+
+from . import reports, trends
+
+MAX_SKILLS = 200
+MAX_WINDOW = 90
+
+
+# ----------------------- SKILL TRENDS API -----------------------
+# /api/analytics/skill_trends/?skills=Python,React,12&start=&end=&window=7
+@api_view(['GET'])
+def skill_trends(request):
+    """Daily new and active postings per skill, with moving averages and growth (see analytics.trends).
+
+    ?skills= takes names or ids (default: the 10 most demanded skills); the range defaults to the last year.
+    """
+    start, end = reports.parse_range(request.query_params.get('start'), request.query_params.get('end'), days=364)
+    window = request.query_params.get('window', '')
+    window = min(max(int(window), 1), MAX_WINDOW) if window.isdigit() else 7
+
+    # Ids or names, in the order given
+    wanted = [
+        int(value) if value.isdigit() else value
+        for value in (value.strip() for value in request.query_params.get('skills', '').split(','))
+        if value
+    ]
+    if len(wanted) > MAX_SKILLS:
+        return Response({'error': f'At most {MAX_SKILLS} skills per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+    def compute():
+        if not wanted:
+            return trends.skill_trends(Skill.objects.order_by('-job_count', 'name')[:10], start, end, window)
+        found = Skill.objects.in_bulk([key for key in wanted if isinstance(key, int)])
+        found.update(Skill.objects.in_bulk([key for key in wanted if isinstance(key, str)], field_name='name'))
+        return trends.skill_trends([found[key] for key in dict.fromkeys(wanted) if key in found], start, end, window)
+
+    params = {'skills': wanted, 'start': start.isoformat(), 'end': end.isoformat(), 'window': window}
+    return Response(cached('skill_trends', compute, params=params))
+
+
+# ----------------------- SUMMARY API (ASYNC) -----------------------
+# /api/analytics/summary/?start=&end=
+async def summary(request):
+    """The analytics dashboard's figures as JSON (see analytics.reports.summary); the last 30 days by default.
+
+    A plain async view, like jobs.async_views: served from the data cache
+    without a thread, the rollup queries run in one thread hop on a miss.
+    """
+    start, end = reports.parse_range(request.GET.get('start'), request.GET.get('end'))
+    data = await acached(
+        'analytics_summary', lambda: sync_to_async(reports.summary)(start, end),
+        params={'start': start.isoformat(), 'end': end.isoformat()},
+    )
+    return JsonResponse(data)
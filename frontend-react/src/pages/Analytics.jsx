@@ -242,7 +242,7 @@ const Analytics = () => {
 
       // Fetch all data in parallel
       const [allJobsResponse, skillsData, companiesData] = await Promise.all([
-        getJobs({ page_size: 1000 }),
+        getJobs({ page_size: 100, count: 1 }),
         getTopSkills(),
         getCompanies()
       ]);
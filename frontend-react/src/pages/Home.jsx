@@ -55,7 +55,7 @@ console.log('TOTAL JOBS', stats.totalJobs);
       
       // Fetch all data in parallel
       const [jobsData, skillsData, companiesData, locationsData] = await Promise.all([
-        getJobs({ page_size: 10 }),
+        getJobs({ page_size: 10, count: 1 }),
         getTopSkills(),
         getCompanies(),
         getLocations()
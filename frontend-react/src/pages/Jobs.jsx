@@ -1,9 +1,9 @@
 // Jobs.jsx - Browse all jobs page
 // Shows job listings with search and filter functionality
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useSearchParams } from 'react-router-dom';
-import { getJobs } from '../services/api';
+import { getJobs, getJobsPage } from '../services/api';
 import JobCard from '../components/JobCard';
 import Loading from '../components/Loading';
 
@@ -15,6 +15,11 @@ const Jobs = () => {
   const [jobs, setJobs] = useState([]);
   const [loading, setLoading] = useState(true);
   const [totalCount, setTotalCount] = useState(0);
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  
+  // Sentinel element below the list; scrolling it into view loads the next page
+  const sentinelRef = useRef(null);
   
   // Filter states
   const [filters, setFilters] = useState({
@@ -42,25 +47,59 @@ const Jobs = () => {
         }
       });
 
-      // Call API with filters
-      const data = await getJobs(query);
+      // Call API with filters (ask for the total only on the first page)
+      const data = await getJobs({ ...query, count: 1 });
       
       // Handle both paginated and non-paginated responses
       if (data.results) {
         setJobs(data.results);
         setTotalCount(data.count);
+        setNextUrl(data.next);
       } else {
         setJobs(data);
         setTotalCount(data.length);
+        setNextUrl(null);
       }
     } catch (error) {
       console.error('Error fetching jobs:', error);
       setJobs([]);
+      setNextUrl(null);
     } finally {
       setLoading(false);
     }
   };
 
+  // Append the next cursor page (infinite scroll)
+  const fetchMoreJobs = async () => {
+    if (!nextUrl || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const data = await getJobsPage(nextUrl);
+      setJobs(prevJobs => [...prevJobs, ...data.results]);
+      setNextUrl(data.next);
+    } catch (error) {
+      console.error('Error fetching more jobs:', error);
+      setNextUrl(null);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Load the next page when the sentinel scrolls into view
+  useEffect(() => {
+    const sentinel = sentinelRef.current;
+    if (!sentinel || !nextUrl) return;
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries[0].isIntersecting) {
+        fetchMoreJobs();
+      }
+    }, { rootMargin: '400px' });
+
+    observer.observe(sentinel);
+    return () => observer.disconnect();
+  }, [nextUrl, loadingMore]);
+
   // Handle filter changes
   const handleFilterChange = (filterName, value) => {
     // Update filters state
@@ -226,13 +265,19 @@ const Jobs = () => {
       {loading ? (
         <Loading />
       ) : jobs.length > 0 ? (
-        <div className="row g-4">
-          {jobs.map((job) => (
-            <div key={job.id} className="col-md-6 col-lg-4">
-              <JobCard job={job} />
-            </div>
-          ))}
-        </div>
+        <>
+          <div className="row g-4">
+            {jobs.map((job) => (
+              <div key={job.id} className="col-md-6 col-lg-4">
+                <JobCard job={job} />
+              </div>
+            ))}
+          </div>
+
+          {/* Infinite scroll: more pages load as this comes into view */}
+          <div ref={sentinelRef} />
+          {loadingMore && <Loading />}
+        </>
       ) : (
         <div className="alert alert-info text-center">
           <i className="bi bi-info-circle me-2"></i>
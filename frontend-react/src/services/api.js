@@ -40,6 +40,23 @@ export const getJobs = async (filters = {}) => {
   }
 };
 
+/**
+ * Get the next page of a job listing
+ * Job lists are cursor-paginated: each response carries a `next` URL
+ * (null on the last page) instead of page numbers
+ * @param {string} url - The `next` link from a previous response
+ * @returns {Promise} - { next, previous, results }
+ */
+export const getJobsPage = async (url) => {
+  try {
+    const response = await api.get(url);
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching jobs page:', error);
+    throw error;
+  }
+};
+
 /**
  * Get a single job by ID
  * @param {number} id - Job ID
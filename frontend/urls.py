@@ -5,6 +5,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('jobs/', views.jobs_list, name='jobs'),
     path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('jobs/export.<str:fmt>', views.jobs_export, name='jobs_export'),
     path('analytics/', views.analytics, name='analytics'),
     path('companies/', views.companies_list, name='companies'),
 ]
@@ -1,28 +1,43 @@
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count, Avg, Q
-from jobs.models import Job, Company, Skill, Location, JobView
+from analytics import reports
+from analytics.models import DailyCompanyStat, DailyLocationStat, DailySkillStat, RollupRun
+from jobs.models import Job, Company, Skill, Location
+from jobs.caching import cached
+from jobs.export import FORMATS, export_response, parquet_available
+from jobs.pagination import InvalidCursor, paginate
+from jobs import similar
+from jobs.search import FILTER_PARAMS, filter_jobs
+from jobs.tracking import record_view
 from django.utils import timezone
 from datetime import timedelta
 import json
 
+JOBS_PER_PAGE = 50
+
 def home(request):
     """Home page with overview"""
+    # Aggregates only change on scrapes and moderation, so they are cached (see jobs.caching)
+    context = cached('home', build_home_context)
+    return render(request, 'home.html', context)
+
+
+def build_home_context():
+    """Statistics, recent jobs and top skills for the home page"""
     # Get statistics
     total_jobs = Job.objects.filter(is_active=True, status='approved').count()
     total_companies = Company.objects.count()
     total_skills = Skill.objects.count()
     total_locations = Location.objects.count()
     
-    # Recent jobs (last 10)
-    recent_jobs = Job.objects.filter(
+    # Recent jobs (last 10), evaluated so the list can be cached
+    recent_jobs = list(Job.objects.filter(
         is_active=True, 
         status='approved'
-    ).select_related('company', 'location').prefetch_related('skills')[:10]
+    ).select_related('company', 'location').prefetch_related('skills')[:10])
     
-    # Top 8 demanded skills
-    top_skills = Skill.objects.annotate(
-        job_count=Count('jobs', filter=Q(jobs__is_active=True, jobs__status='approved'))
-    ).order_by('-job_count')[:8]
+    # Top 8 demanded skills (job_count is a maintained counter, see jobs.counters)
+    top_skills = Skill.objects.order_by('-job_count')[:8]
     
     # Prepare chart data
     top_skills_labels = json.dumps([skill.name for skill in top_skills])
@@ -38,7 +53,7 @@ def home(request):
         'top_skills_data': top_skills_data,
     }
     
-    return render(request, 'home.html', context)
+    return context
 
 
 def jobs_list(request):
@@ -47,45 +62,23 @@ def jobs_list(request):
         'company', 'location'
     ).prefetch_related('skills')
     
-    # Search filter
-    search = request.GET.get('search', '')
-    if search:
-        jobs = jobs.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search) |
-            Q(company__name__icontains=search) |
-            Q(tags__icontains=search)
-        )
-    
-    # Location filter
-    location = request.GET.get('location', '')
-    if location:
-        jobs = jobs.filter(
-            Q(location__city__icontains=location) |
-            Q(location__country__icontains=location)
-        )
-    
-    # Job type filter
-    job_type = request.GET.get('job_type', '')
-    if job_type:
-        jobs = jobs.filter(job_type=job_type)
-    
-    # Experience level filter
-    experience = request.GET.get('experience', '')
-    if experience:
-        jobs = jobs.filter(experience_level=experience)
-    
-    # Skill filter
-    skill = request.GET.get('skill', '')
-    if skill:
-        jobs = jobs.filter(skills__name__icontains=skill)
+    # Search (full-text index, best matches first), location, type, experience
+    # and skill filters, shared with the bulk export (see jobs.search)
+    jobs = filter_jobs(jobs, request.GET)
+    search, location, job_type, experience, skill = (request.GET.get(name, '') for name in FILTER_PARAMS)
     
     # Get all skills and locations for filters
     all_skills = Skill.objects.all().order_by('name')
     all_locations = Location.objects.all().order_by('country', 'city')
     
+    # One cursor page at a time (see jobs.pagination)
+    try:
+        page = paginate(jobs, request.GET.get('cursor'), page_size=JOBS_PER_PAGE)
+    except InvalidCursor:
+        raise Http404('Invalid cursor')
+    
     context = {
-        'jobs': jobs[:50],  # Limit to 50 for performance
+        'jobs': page,
         'all_skills': all_skills,
         'all_locations': all_locations,
         'search': search,
@@ -93,11 +86,23 @@ def jobs_list(request):
         'job_type': job_type,
         'experience': experience,
         'skill': skill,
+        'parquet_available': parquet_available(),
     }
     
     return render(request, 'jobs.html', context)
 
 
+def jobs_export(request, fmt):
+    """Every approved job matching the jobs page filters, streamed as CSV, NDJSON or Parquet"""
+    if fmt not in FORMATS:
+        raise Http404('Unknown export format')
+    if fmt == 'parquet' and not parquet_available():
+        return HttpResponse('Parquet export needs pyarrow installed', status=501, content_type='text/plain')
+    
+    jobs = filter_jobs(Job.objects.filter(is_active=True, status='approved'), request.GET, ranked=None)
+    return export_response(jobs, fmt)
+
+
 def job_detail(request, job_id):
     """Job detail page"""
     job = get_object_or_404(
@@ -107,95 +112,73 @@ def job_detail(request, job_id):
         status='approved'
     )
     
-    # Track view
-    job.views += 1
-    job.save(update_fields=['views'])
-    
-    # Log view
-    JobView.objects.create(
-        job=job,
-        ip_address=get_client_ip(request)
-    )
-    
-    # Similar jobs
-    similar_jobs = Job.objects.filter(
-        is_active=True,
-        status='approved'
-    ).filter(
-        Q(company=job.company) |
-        Q(skills__in=job.skills.all())
-    ).exclude(id=job.id).distinct()[:4]
+    # Track view (buffered and written in batches, see jobs.tracking)
+    record_view(job, ip_address=get_client_ip(request))
     
+    # Similar jobs, ranked by weighted skill overlap and cached per job (see jobs.similar)
     context = {
         'job': job,
-        'similar_jobs': similar_jobs,
+        'similar_jobs': similar.similar_jobs(job, limit=4),
     }
     
     return render(request, 'job_detail.html', context)
 
 
 def analytics(request):
-    """Analytics dashboard"""
-    # Jobs by type
-    jobs_by_type = Job.objects.filter(
-        is_active=True, status='approved'
-    ).values('job_type').annotate(count=Count('id')).order_by('-count')
-    
-    # Jobs by experience level
-    jobs_by_experience = Job.objects.filter(
-        is_active=True, status='approved'
-    ).values('experience_level').annotate(count=Count('id')).order_by('-count')
-    
-    # Top 10 skills
-    top_skills = Skill.objects.annotate(
-        job_count=Count('jobs', filter=Q(jobs__is_active=True, jobs__status='approved'))
-    ).order_by('-job_count')[:10]
-    
-    # Top 10 companies
-    top_companies = Company.objects.annotate(
-        job_count=Count('jobs', filter=Q(jobs__is_active=True, jobs__status='approved'))
-    ).order_by('-job_count')[:10]
-    
-    # Top 10 locations
-    top_locations = Location.objects.annotate(
-        job_count=Count('jobs', filter=Q(jobs__is_active=True, jobs__status='approved'))
-    ).order_by('-job_count')[:10]
-    
-    # Average salary
-    avg_salary = Job.objects.filter(
-        is_active=True, 
-        status='approved',
-        salary_min__isnull=False
-    ).aggregate(Avg('salary_min'))['salary_min__avg']
-    
-    # Jobs posted over time (last 30 days)
-    thirty_days_ago = timezone.now().date() - timedelta(days=30)
-    jobs_over_time = Job.objects.filter(
-        is_active=True,
-        status='approved',
-        posted_date__gte=thirty_days_ago
-    ).extra(select={'day': 'date(posted_date)'}).values('day').annotate(
-        count=Count('id')
-    ).order_by('day')
+    """Analytics dashboard for a date range (?start=&end=, default the last 30 days)"""
+    start, end = reports.parse_range(request.GET.get('start'), request.GET.get('end'))
+    context = cached(
+        'analytics', lambda: build_analytics_context(start, end),
+        params={'start': start.isoformat(), 'end': end.isoformat()},
+    )
+    return render(request, 'analytics.html', context)
+
+
+def build_analytics_context(start, end):
+    """Chart data for the analytics dashboard, read from the daily rollups (see analytics.rollup)"""
+    totals = reports.totals(start, end)
+    
+    # Jobs by type and by experience level
+    jobs_by_type = reports.breakdown('job_type', start, end)
+    jobs_by_experience = reports.breakdown('experience_level', start, end)
+    
+    # Top 10 skills, companies and locations in the range
+    top_skills = reports.top(DailySkillStat, 'skill', start, end)
+    top_companies = reports.top(DailyCompanyStat, 'company', start, end)
+    top_locations = reports.top(DailyLocationStat, 'location', start, end)
+    
+    # Jobs posted over time: per day, week or month depending on the range
+    timeline_unit, timeline = reports.timeline(start, end)
+    
+    # Quick range links
+    today = timezone.now().date()
+    first_day = reports.first_day()
+    range_presets = [
+        (label, today - timedelta(days=days), today)
+        for label, days in [('30 days', 30), ('90 days', 90), ('1 year', 365)]
+    ]
+    if first_day:
+        range_presets.append(('All time', min(first_day, today), today))
+    last_run = RollupRun.objects.filter(finished_at__isnull=False).first()
     
     # Prepare chart data
-    job_type_labels = json.dumps([item['job_type'] for item in jobs_by_type])
-    job_type_data = json.dumps([item['count'] for item in jobs_by_type])
+    job_type_labels = json.dumps([job_type for job_type, _ in jobs_by_type])
+    job_type_data = json.dumps([count for _, count in jobs_by_type])
     
-    experience_labels = json.dumps([item['experience_level'] for item in jobs_by_experience])
-    experience_data = json.dumps([item['count'] for item in jobs_by_experience])
+    experience_labels = json.dumps([level for level, _ in jobs_by_experience])
+    experience_data = json.dumps([count for _, count in jobs_by_experience])
     
-    skills_labels = json.dumps([skill.name for skill in top_skills])
-    skills_data = json.dumps([skill.job_count for skill in top_skills])
+    skills_labels = json.dumps([skill.name for skill, _ in top_skills])
+    skills_data = json.dumps([count for _, count in top_skills])
     
-    companies_labels = json.dumps([company.name for company in top_companies])
-    companies_data = json.dumps([company.job_count for company in top_companies])
+    companies_labels = json.dumps([company.name for company, _ in top_companies])
+    companies_data = json.dumps([count for _, count in top_companies])
     
-    locations_labels = json.dumps([str(loc) for loc in top_locations])
-    locations_data = json.dumps([loc.job_count for loc in top_locations])
+    locations_labels = json.dumps([str(loc) for loc, _ in top_locations])
+    locations_data = json.dumps([count for _, count in top_locations])
     
-    timeline_labels = json.dumps([str(item['day']) for item in jobs_over_time])
-    timeline_data = json.dumps([item['count'] for item in jobs_over_time])
+    timeline_labels = json.dumps([str(period) for period, _ in timeline])
+    timeline_data = json.dumps([count for _, count in timeline])
     
     context = {
         'job_type_labels': job_type_labels,
@@ -210,18 +193,21 @@ def analytics(request):
         'locations_data': locations_data,
         'timeline_labels': timeline_labels,
         'timeline_data': timeline_data,
-        'avg_salary': round(avg_salary, 2) if avg_salary else 0,
-        'total_jobs': Job.objects.filter(is_active=True, status='approved').count(),
+        'timeline_unit': timeline_unit,
+        'avg_salary': round(totals['avg_salary'], 2) if totals['avg_salary'] else 0,
+        'total_jobs': totals['jobs'],
+        'start': start,
+        'end': end,
+        'range_presets': range_presets,
+        'rollup_updated': last_run.finished_at if last_run else None,
     }
     
-    return render(request, 'analytics.html', context)
+    return context
 
 
 def companies_list(request):
     """List all companies"""
-    companies = Company.objects.annotate(
-        job_count=Count('jobs', filter=Q(jobs__is_active=True, jobs__status='approved'))
-    ).filter(job_count__gt=0).order_by('-job_count')
+    companies = Company.objects.filter(job_count__gt=0).order_by('-job_count')
     
     context = {
         'companies': companies,
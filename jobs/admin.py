@@ -1,21 +1,18 @@
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
 from .models import Company, Skill, Location, Job, JobSource, JobView
+from .near_duplicates import merge
 
 # ------------------------ COMPANY ADMIN ------------------------
 @admin.register(Company)
 class CompanyAdmin(admin.ModelAdmin):
-    # Columns shown in the admin list page
+    # Columns shown in the admin list page; job_count is the maintained counter (see jobs.counters)
     list_display = ['name', 'website', 'job_count', 'created_at']
     # Enable search bar for these fields
     search_fields = ['name', 'description']
     # Sidebar filters
     list_filter = ['created_at']
-    
-    # Custom column: count number of jobs for each company
-    def job_count(self, obj):
-        return obj.jobs.count()
-    job_count.short_description = 'Total Jobs'
 
 
 # ------------------------ SKILL ADMIN ------------------------
@@ -24,10 +21,6 @@ class SkillAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'job_count', 'created_at']
     search_fields = ['name', 'category']
     list_filter = ['category', 'created_at']
-    
-    def job_count(self, obj):
-        return obj.jobs.count()
-    job_count.short_description = 'Jobs Requiring This Skill'
 
 
 # ------------------------ LOCATION ADMIN ------------------------
@@ -36,10 +29,6 @@ class LocationAdmin(admin.ModelAdmin):
     list_display = ['city', 'country', 'is_remote', 'job_count']
     search_fields = ['city', 'country']
     list_filter = ['is_remote', 'country']
-    
-    def job_count(self, obj):
-        return obj.jobs.count()
-    job_count.short_description = 'Jobs in This Location'
 
 
 # ------------------------ JOB SOURCE ADMIN ------------------------
@@ -55,13 +44,32 @@ class JobSourceAdmin(admin.ModelAdmin):
 
 
 # ------------------------ JOB ADMIN ------------------------
+# Sidebar filter for the near-duplicate flags set by find_near_duplicates
+class NearDuplicateFilter(admin.SimpleListFilter):
+    title = 'near duplicates'
+    parameter_name = 'duplicates'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('flagged', 'Flagged as duplicate'),
+            ('originals', 'Has duplicates'),
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'flagged':
+            return queryset.filter(duplicate_of__isnull=False)
+        if self.value() == 'originals':
+            return queryset.filter(near_duplicates__isnull=False).distinct()
+        return queryset
+
+
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     # Columns in job list
     list_display = ['title', 'company', 'location', 'job_type', 'experience_level',
-                    'status_badge', 'posted_date', 'views']
+                    'status_badge', 'posted_date', 'views', 'duplicate_of_link']
     # Sidebar filters
-    list_filter = ['status', 'job_type', 'experience_level', 'posted_date', 'is_active']
+    list_filter = ['status', 'job_type', 'experience_level', 'posted_date', 'is_active', NearDuplicateFilter]
     # Search options
     search_fields = ['title', 'description', 'company__name', 'tags']
     # Better UI for selecting skills (ManyToMany)
@@ -69,7 +77,9 @@ class JobAdmin(admin.ModelAdmin):
     # Date navigation bar at top
     date_hierarchy = 'posted_date'
     # Bulk actions
-    actions = ['approve_jobs', 'reject_jobs']
+    actions = ['approve_jobs', 'reject_jobs', 'merge_duplicates', 'dismiss_duplicates']
+    # Set by the near-duplicate detector, cleared by the actions below
+    readonly_fields = ['duplicate_of']
     
     # Organize form fields into sections
     fieldsets = (
@@ -83,7 +93,7 @@ class JobAdmin(admin.ModelAdmin):
             'fields': ('salary_min', 'salary_max', 'salary_currency')
         }),
         ('Source & Status', {
-            'fields': ('source', 'external_url', 'status', 'is_active')
+            'fields': ('source', 'external_url', 'status', 'is_active', 'duplicate_of')
         }),
         ('Metadata', {
             'fields': ('posted_date', 'views'),
@@ -105,7 +115,15 @@ class JobAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Status'
     
-    # Bulk approve jobs
+    # Link to the original of a flagged near-duplicate (uses the id only, no extra query)
+    def duplicate_of_link(self, obj):
+        if not obj.duplicate_of_id:
+            return ''
+        url = reverse('admin:jobs_job_change', args=[obj.duplicate_of_id])
+        return format_html('<a href="{}">#{}</a>', url, obj.duplicate_of_id)
+    duplicate_of_link.short_description = 'Duplicate of'
+    
+    # Bulk approve jobs (JobQuerySet.update keeps the demand counters in step)
     def approve_jobs(self, request, queryset):
         updated = queryset.update(status='approved')
         self.message_user(request, f'{updated} jobs approved successfully.')
@@ -116,6 +134,18 @@ class JobAdmin(admin.ModelAdmin):
         updated = queryset.update(status='rejected')
         self.message_user(request, f'{updated} jobs rejected.')
     reject_jobs.short_description = 'Reject selected jobs'
+    
+    # Deactivate flagged duplicates, moving their skills onto the original
+    def merge_duplicates(self, request, queryset):
+        merged = merge(queryset)
+        self.message_user(request, f'{merged} duplicate jobs merged into their originals.')
+    merge_duplicates.short_description = 'Merge flagged duplicates into their originals'
+    
+    # Clear the flag; the detector only checks new jobs, so it won't come back
+    def dismiss_duplicates(self, request, queryset):
+        updated = queryset.filter(duplicate_of__isnull=False).update(duplicate_of=None)
+        self.message_user(request, f'{updated} jobs marked as not duplicates.')
+    dismiss_duplicates.short_description = 'Not duplicates: clear the flag'
 
 
 # ------------------------ JOB VIEW ADMIN ------------------------
@@ -0,0 +1,97 @@
+"""
+Async JSON endpoints for the hot read paths, for deployments under ASGI.
+
+DRF views are synchronous, so under ASGI every request to one holds a
+thread until its response is written. These are plain Django async views
+returning the same JSON as their DRF counterparts, read through the async
+ORM (async iteration, acount, aget) and acached(): a request waiting on
+the database or on a slow client holds a coroutine, not a thread.
+
+    /api/async/jobs/                  like /api/jobs/ (cursor pages, ?count=1), with the jobs page filters
+    /api/async/jobs/<id>/             like /api/jobs/<id>/, counts the view
+    /api/async/skills/top_demanded/   like /api/skills/top_demanded/, sharing its cache entry
+
+The analytics dashboard data is at /api/analytics/summary/ (see
+analytics.views). Under WSGI these views still work, each in an event
+loop of its own; bench_asgi compares the two servers.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .caching import acached
+from .models import Job, Skill
+from .pagination import InvalidCursor, JobCursorPagination, apaginate
+from .search import filter_jobs
+from .serializers import JobDetailSerializer, JobListSerializer, SkillSerializer
+from .tracking import record_view
+from .views import JobViewSet
+
+
+def not_found(detail='Not found.'):
+    return JsonResponse({'detail': detail}, status=404)
+
+
+def client_ip(request):
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    return x_forwarded_for.split(',')[0] if x_forwarded_for else request.META.get('REMOTE_ADDR')
+
+
+def page_size(request):
+    try:
+        size = int(request.GET['page_size'])
+    except (KeyError, ValueError):
+        return JobCursorPagination.page_size
+    return min(max(size, 1), JobCursorPagination.max_page_size)
+
+
+def page_link(request, cursor):
+    url = remove_query_param(request.build_absolute_uri(), 'count')
+    if cursor is None:
+        return remove_query_param(url, 'cursor')
+    return replace_query_param(url, 'cursor', cursor)
+
+
+# ----------------------- JOBS -----------------------
+# /api/async/jobs/?cursor=&page_size=&count=1&search=&location=&job_type=&experience=&skill=
+async def job_list(request):
+    """One cursor page of approved, active jobs: {count?, next, previous, results}."""
+    jobs = filter_jobs(JobViewSet.queryset.all(), request.GET)
+    try:
+        page = await apaginate(JobViewSet.with_list_fields(jobs), request.GET.get('cursor'), page_size(request))
+    except InvalidCursor:
+        return not_found('Invalid cursor')
+
+    data = {
+        'next': page_link(request, page.next_cursor) if page.has_next else None,
+        'previous': page_link(request, page.previous_cursor) if page.has_previous else None,
+        'results': JobListSerializer(page, many=True).data,
+    }
+    if request.GET.get('count', '').lower() in ('1', 'true'):
+        data = {'count': await jobs.acount(), **data}
+    return JsonResponse(data)
+
+
+# /api/async/jobs/<id>/
+async def job_detail(request, pk):
+    try:
+        job = await JobViewSet.with_detail_fields(JobViewSet.queryset.all()).aget(pk=pk)
+    except Job.DoesNotExist:
+        return not_found()
+
+    # Buffered, but a full buffer is written out by the caller (see jobs.tracking)
+    await sync_to_async(record_view)(job, ip_address=client_ip(request))
+    return JsonResponse(JobDetailSerializer(job).data)
+
+
+# ----------------------- SKILLS -----------------------
+# /api/async/skills/top_demanded/
+async def top_demanded(request):
+    """The 10 skills with the most approved, active jobs."""
+    async def top_skills():
+        skills = [skill async for skill in Skill.objects.order_by('-job_count')[:10]]
+        return SkillSerializer(skills, many=True).data
+
+    # The same entry as SkillViewSet.top_demanded (see jobs.caching)
+    return JsonResponse(await acached('top_demanded', top_skills), safe=False)
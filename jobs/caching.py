@@ -0,0 +1,139 @@
+"""
+Cache for aggregate data (home page, analytics dashboard, top skills).
+
+Entries live in Django's cache framework (local memory by default, Redis
+when REDIS_URL is set) under one key per view and filter set. Each entry
+records the data generation it was computed for; invalidate() bumps the
+generation, so every entry goes stale at once without enumerating keys.
+
+Reads are stale-while-revalidate: a stale entry is still served, and only
+the request that wins a short cache lock recomputes it. Concurrent
+requests keep getting the previous value in the meantime. On a cold miss
+the others wait briefly for that single recompute instead of piling on.
+
+acached() is the same for async views: the cache calls are awaited and a
+cold miss waits without blocking the event loop.
+"""
+
+import asyncio
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIX = 'skillscope:data'
+GENERATION_KEY = f'{PREFIX}:generation'
+LOCK_TIMEOUT = 30  # seconds a recompute may hold the lock
+COLD_WAIT = 5  # seconds a cold miss waits for someone else's recompute
+
+
+def fresh_timeout():
+    return getattr(settings, 'DATA_CACHE_TIMEOUT', 300)
+
+
+def stale_timeout():
+    return getattr(settings, 'DATA_CACHE_STALE_TIMEOUT', 24 * 3600)
+
+
+def current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so an evicted counter never repeats an old generation
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate():
+    """Mark every cached entry stale."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns(), None)  # key was evicted
+
+
+def invalidate_on_commit():
+    """Invalidate once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(invalidate)
+
+
+def make_key(name, params=None):
+    if not params:
+        return f'{PREFIX}:{name}'
+    digest = hashlib.md5(repr(sorted(params.items())).encode()).hexdigest()
+    return f'{PREFIX}:{name}:{digest}'
+
+
+def cached(name, compute, params=None):
+    """Return compute(), cached per `name` and `params` with stale-while-revalidate."""
+    key = make_key(name, params)
+    lock_key = f'{key}:lock'
+    generation = current_generation()
+
+    entry = cache.get(key)  # (value, generation, fresh_until)
+    if entry and entry[1] == generation and entry[2] > time.time():
+        return entry[0]
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, (value, generation, time.time() + fresh_timeout()), stale_timeout())
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    # Someone else is recomputing: serve the stale value if there is one
+    if entry:
+        return entry[0]
+
+    deadline = time.time() + COLD_WAIT
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry:
+            return entry[0]
+    return compute()
+
+
+async def acurrent_generation():
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+async def acached(name, compute, params=None):
+    """cached() for async code: `compute` is a coroutine function."""
+    key = make_key(name, params)
+    lock_key = f'{key}:lock'
+    # One round trip on the hot path: the async cache API runs each call in a thread
+    found = await cache.aget_many([GENERATION_KEY, key])
+    generation = found.get(GENERATION_KEY)
+    if generation is None:
+        generation = await acurrent_generation()
+
+    entry = found.get(key)
+    if entry and entry[1] == generation and entry[2] > time.time():
+        return entry[0]
+
+    if await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = await compute()
+            await cache.aset(key, (value, generation, time.time() + fresh_timeout()), stale_timeout())
+            return value
+        finally:
+            await cache.adelete(lock_key)
+
+    if entry:
+        return entry[0]
+
+    deadline = time.time() + COLD_WAIT
+    while time.time() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await cache.aget(key)
+        if entry:
+            return entry[0]
+    return await compute()
@@ -0,0 +1,282 @@
+"""
+Skill co-occurrence: how many jobs list each pair of skills together.
+
+The counts are kept as a sparse matrix indexed by skill pk, in CSR layout:
+row i is indices[indptr[i]:indptr[i + 1]] (the skills seen with skill i,
+most shared jobs first) and the matching counts, plus the number of jobs
+per skill. The arrays are stored in the single SkillCooccurrence row and
+every process keeps them decoded in memory, reloaded when a new matrix is
+saved (see get_matrix), so related() is an array slice and needs no query.
+Like the demand counters (see jobs.counters), only approved, active jobs
+count.
+
+refresh() first brings the jobs in line: those approved or reactivated
+since the last refresh have the links already counted added, those
+rejected or closed have them taken out (counted_job_ids holds the jobs in
+the matrix). Then it reads the Job.skills through table in id order, LINK_CHUNK
+links at a time. For the counted jobs those links belong to it reads their other
+links and adds every pair with a link not counted before, so new jobs and
+skills added to stored jobs are picked up incrementally. Link ids are
+handed out when a row is inserted but become visible when its transaction
+commits, so a link can show up after links with higher ids were counted:
+each refresh rescans the LINK_WINDOW ids below the highest one counted and
+skips those it already counted (kept in counted_link_ids). A link that
+commits more than LINK_WINDOW ids late is missed, as are removed links and
+deleted jobs: rebuild() starts from an empty matrix (one streaming pass
+over the through table), and runs daily (CELERY_BEAT_SCHEDULE).
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import transaction
+
+from . import counters, skills
+from .models import Job, Skill, SkillCooccurrence
+
+LINK_CHUNK = 20_000
+LINK_WINDOW = 10_000  # ids below the highest counted link rescanned for late commits
+JOB_CHUNK = 5_000  # jobs whose links are read per query when they enter or leave the count
+VERSION_KEY = 'skillscope:cooccurrence:version'
+
+
+def _encode(rows, cols):
+    return (rows.astype(np.int64) << 32) | cols.astype(np.int64)
+
+
+def _add(keys, counts, new_keys, new_counts):
+    """Sum two sets of (pair key, count), as sorted unique keys."""
+    keys, inverse = np.unique(np.concatenate([keys, new_keys]), return_inverse=True)
+    return keys, np.bincount(inverse, weights=np.concatenate([counts, new_counts])).astype(np.int64)
+
+
+def _contains(sorted_ids, ids):
+    """Which of `ids` are in the sorted array `sorted_ids`."""
+    at = np.searchsorted(sorted_ids, ids).clip(max=max(len(sorted_ids) - 1, 0))
+    return sorted_ids[at] == ids if len(sorted_ids) else np.zeros(len(ids), dtype=bool)
+
+
+def _grow(totals, size):
+    return np.concatenate([totals, np.zeros(max(size - len(totals), 0), dtype=np.int64)])
+
+
+class Cooccurrence:
+    """Pair counts as a CSR matrix indexed by skill pk, plus the jobs per skill."""
+
+    def __init__(self, indptr, indices, counts, totals, jobs=0, last_link_id=0, counted=None, job_ids=None,
+                 names=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.counts = counts
+        self.totals = totals  # jobs per skill pk
+        self.jobs = jobs  # jobs with at least one skill
+        self.last_link_id = last_link_id
+        # Sorted ids of the links counted within LINK_WINDOW of last_link_id
+        self.counted = np.zeros(0, dtype=np.int64) if counted is None else counted
+        self.job_ids = np.zeros(0, dtype=np.int64) if job_ids is None else job_ids  # sorted pks of the jobs counted
+        self.names = names or {}  # skill pk -> name, filled by get_matrix()
+
+    @classmethod
+    def empty(cls):
+        return cls.from_pairs(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_pairs(cls, keys, counts, totals, **kwargs):
+        """Build from (row << 32 | col) keys and their counts."""
+        rows, cols = keys >> 32, keys & 0xFFFFFFFF
+        size = max(len(totals), int(rows.max()) + 1 if len(rows) else 0)
+        order = np.lexsort((cols, -counts, rows))  # by row, then most shared first
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=size), out=indptr[1:])
+        return cls(indptr, cols[order].astype(np.int32), counts[order].astype(np.int32), _grow(totals, size), **kwargs)
+
+    @classmethod
+    def from_model(cls, stored):
+        if not stored.indptr:
+            return cls.empty()
+        deferred = stored.get_deferred_fields()  # get_matrix() leaves out the refresh bookkeeping
+        return cls(
+            np.frombuffer(stored.indptr, dtype='<i8'),
+            np.frombuffer(stored.indices, dtype='<i4'),
+            np.frombuffer(stored.counts, dtype='<i4'),
+            np.frombuffer(stored.totals, dtype='<i8'),
+            jobs=stored.jobs,
+            last_link_id=stored.last_link_id,
+            counted=None if 'counted_link_ids' in deferred else np.frombuffer(stored.counted_link_ids, dtype='<i8'),
+            job_ids=None if 'counted_job_ids' in deferred else np.frombuffer(stored.counted_job_ids, dtype='<i8'),
+        )
+
+    def to_model(self, stored):
+        stored.indptr = self.indptr.astype('<i8').tobytes()
+        stored.indices = self.indices.astype('<i4').tobytes()
+        stored.counts = self.counts.astype('<i4').tobytes()
+        stored.totals = self.totals.astype('<i8').tobytes()
+        stored.jobs = self.jobs
+        stored.last_link_id = self.last_link_id
+        stored.counted_link_ids = self.counted.astype('<i8').tobytes()
+        stored.counted_job_ids = self.job_ids.astype('<i8').tobytes()
+
+    def pairs(self):
+        """The matrix as (pair keys, counts)."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr))
+        return _encode(rows, self.indices), self.counts.astype(np.int64)
+
+    def jobs_with(self, skill_id):
+        return int(self.totals[skill_id]) if 0 <= skill_id < len(self.totals) else 0
+
+    def related(self, skill_id, limit=10, by='jobs'):
+        """[(skill pk, shared jobs, Jaccard index)] for the skills listed most often with `skill_id`.
+
+        by='jobs' ranks by shared jobs, by='jaccard' by shared / jobs with either skill,
+        which favours specific companions over skills that are everywhere.
+        """
+        if not 0 <= skill_id < len(self.indptr) - 1:
+            return []
+        start, end = self.indptr[skill_id], self.indptr[skill_id + 1]
+        others, shared = self.indices[start:end], self.counts[start:end]
+        jaccard = shared / (self.totals[skill_id] + self.totals[others] - shared)
+        if by == 'jaccard':
+            order = np.argsort(-jaccard, kind='stable')[:limit]
+        else:
+            order = slice(0, limit)  # rows are stored most shared first
+        return list(zip(others[order].tolist(), shared[order].tolist(), jaccard[order].tolist()))
+
+
+def _pair_counts(links):
+    """Sorted pair keys and their counts over the skill pairs each job in `links` lists (with a new link, if marked)."""
+    pairs = links.merge(links, on='job_id')
+    keep = (pairs['skill_id_x'] != pairs['skill_id_y']).to_numpy()
+    if 'new' in links:
+        keep &= (pairs['new_x'] | pairs['new_y']).to_numpy()
+    keys, inverse = np.unique(
+        _encode(pairs['skill_id_x'].to_numpy()[keep], pairs['skill_id_y'].to_numpy()[keep]), return_inverse=True
+    )
+    return keys, np.bincount(inverse, minlength=len(keys))
+
+
+def refresh(rebuild=False, progress=None):
+    """Count the through-table links added since the last refresh (all of them if `rebuild`)."""
+    Through = Job.skills.through
+    SkillCooccurrence.objects.get_or_create(pk=1)  # seeded by migration 0011, but a flush drops it
+    with transaction.atomic():
+        # Row lock: concurrent refreshes would count the same links twice
+        stored = SkillCooccurrence.objects.select_for_update().get(pk=1)
+        matrix = Cooccurrence.empty() if rebuild else Cooccurrence.from_model(stored)
+        keys, counts = matrix.pairs()
+        totals, jobs, last, counted = matrix.totals, matrix.jobs, matrix.last_link_id, matrix.counted
+        # Links up to the floor are taken as counted; above it, those in `counted` are
+        floor = max(last - LINK_WINDOW, 0)
+        cursor = floor
+        job_ids = np.array(
+            Job.objects.filter(counters.COUNTED).order_by('pk').values_list('pk', flat=True), dtype=np.int64
+        )
+
+        # Jobs that entered or left the count: add or take out the links counted so far (none on a rebuild)
+        previous = job_ids if rebuild else matrix.job_ids
+        for sign, changed in ((1, np.setdiff1d(job_ids, previous)), (-1, np.setdiff1d(previous, job_ids))):
+            for start in range(0, len(changed), JOB_CHUNK):
+                links = pd.DataFrame.from_records(
+                    list(Through.objects.filter(job_id__in=changed[start:start + JOB_CHUNK].tolist(), id__lte=last)
+                         .order_by().values_list('id', 'job_id', 'skill_id')),
+                    columns=['id', 'job_id', 'skill_id'],
+                )
+                ids = links['id'].to_numpy()
+                links = links[(ids <= floor) | _contains(counted, ids)]
+                if links.empty:
+                    continue
+                chunk_keys, chunk_counts = _pair_counts(links)
+                keys, counts = _add(keys, counts, chunk_keys, sign * chunk_counts)
+                skill_ids = links['skill_id'].to_numpy()
+                totals = _grow(totals, int(skill_ids.max()) + 1)
+                totals += sign * np.bincount(skill_ids, minlength=len(totals))
+                jobs += sign * links['job_id'].nunique()
+
+        while True:
+            chunk = np.array(
+                Through.objects.filter(id__gt=cursor).order_by('id').values_list('id', 'job_id')[:LINK_CHUNK],
+                dtype=np.int64,
+            ).reshape(-1, 2)
+            if not len(chunk):
+                break
+            cursor = int(chunk[-1, 0])
+            chunk = chunk[~_contains(counted, chunk[:, 0])]
+            # Links of jobs outside the count are marked counted too: they are added if the job comes in
+            touched = chunk[_contains(job_ids, chunk[:, 1])]
+            counted = np.union1d(counted, chunk[:, 0])
+            last = max(last, cursor)
+            if not len(touched):
+                continue
+            # Every counted link of the jobs touched, and their links in the chunk (later ones are the next chunk's)
+            links = pd.DataFrame.from_records(
+                list(Through.objects.filter(job_id__in=set(touched[:, 1].tolist()), id__lte=last)
+                     .order_by().values_list('id', 'job_id', 'skill_id')),
+                columns=['id', 'job_id', 'skill_id'],
+            )
+            ids = links['id'].to_numpy()
+            links['new'] = _contains(touched[:, 0], ids)
+            links = links[links['new'].to_numpy() | (ids <= floor) | _contains(counted, ids)]
+
+            chunk_keys, chunk_counts = _pair_counts(links)
+            keys, counts = _add(keys, counts, chunk_keys, chunk_counts)
+
+            skill_ids = links.loc[links['new'], 'skill_id'].to_numpy()
+            totals = _grow(totals, int(skill_ids.max()) + 1)
+            totals += np.bincount(skill_ids, minlength=len(totals))
+            jobs += int(links.groupby('job_id')['new'].all().sum())  # jobs all of whose links are new
+            if progress:
+                progress(last, jobs)
+
+        nonzero = counts != 0  # pairs only jobs that left the count listed
+        matrix = Cooccurrence.from_pairs(
+            keys[nonzero], counts[nonzero], totals, jobs=jobs, last_link_id=last,
+            counted=counted[counted > last - LINK_WINDOW], job_ids=job_ids,
+        )
+        matrix.to_model(stored)
+        stored.save()
+        transaction.on_commit(invalidate_matrix)
+    return matrix
+
+
+def rebuild(progress=None):
+    """Recount every link from scratch (after links were removed or jobs deleted)."""
+    return refresh(rebuild=True, progress=progress)
+
+
+# ----------------------- PROCESS-WIDE CACHE -----------------------
+_matrix = None
+_matrix_version = None
+_lock = threading.Lock()
+
+
+def matrix_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_matrix():
+    """Make every process reload the matrix on next use."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def get_matrix():
+    """The saved co-occurrence matrix, with skill names; loaded once per process and version."""
+    global _matrix, _matrix_version
+    version = (matrix_version(), skills.skills_version())  # names change with the Skill table
+    with _lock:
+        if version == _matrix_version:
+            return _matrix
+    stored = SkillCooccurrence.objects.defer('counted_link_ids', 'counted_job_ids').filter(pk=1).first()
+    matrix = Cooccurrence.empty() if stored is None else Cooccurrence.from_model(stored)
+    matrix.names = dict(Skill.objects.values_list('pk', 'name'))
+    with _lock:
+        _matrix, _matrix_version = matrix, version
+    return matrix
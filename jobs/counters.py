@@ -0,0 +1,91 @@
+"""
+Materialized demand counters.
+
+Skill, Company and Location each carry a `job_count` column holding the
+number of approved, active jobs that reference them. The counters are kept
+in step incrementally:
+
+- single-object saves, deletes and skill changes go through the signal
+  handlers in jobs.signals
+- queryset.update() on jobs (admin bulk actions, bulk_update) goes through
+  JobQuerySet.update
+- bulk writes that bypass both (JobIngestor) call adjust_for_jobs directly
+
+`python manage.py rebuild_demand_counters` recomputes them from scratch and
+reports any drift.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+
+# A job counts towards demand when it is both approved and active
+COUNTED = Q(is_active=True, status='approved')
+COUNTED_VIA_JOBS = Q(jobs__is_active=True, jobs__status='approved')
+
+# Job fields that can change whether or where a job is counted
+TRACKED_FIELDS = {'status', 'is_active', 'company', 'company_id', 'location', 'location_id'}
+
+
+def is_counted(job):
+    return job.is_active and job.status == 'approved'
+
+
+def counter_models():
+    from .models import Company, Location, Skill
+    return [Skill, Company, Location]
+
+
+def apply_deltas(model, deltas):
+    """Add `deltas[pk]` to each row's job_count, one UPDATE per distinct delta."""
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(job_count=F('job_count') + delta)
+
+
+def adjust_for_jobs(job_ids, sign):
+    """Add (sign=1) or remove (sign=-1) the given jobs' contribution to every counter."""
+    from .models import Company, Location, Skill, Job
+
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+
+    jobs = Job.objects.filter(pk__in=job_ids).order_by()
+    groups = [
+        (Company, jobs.values_list('company_id').annotate(n=Count('pk'))),
+        (Location, jobs.exclude(location=None).values_list('location_id').annotate(n=Count('pk'))),
+        (
+            Skill,
+            Job.skills.through.objects.filter(job_id__in=job_ids)
+            .values_list('skill_id').annotate(n=Count('pk')).order_by(),
+        ),
+    ]
+    for model, rows in groups:
+        apply_deltas(model, {pk: sign * n for pk, n in rows})
+
+
+def adjust_skills(skill_ids, sign):
+    """Add or remove one job's worth of demand for each skill."""
+    from .models import Skill
+    apply_deltas(Skill, {pk: sign for pk in skill_ids})
+
+
+def find_drift(model):
+    """Return {pk: (stored, actual)} for rows whose job_count is wrong."""
+    actual = model.objects.annotate(n=Count('jobs', filter=COUNTED_VIA_JOBS)).values_list('pk', 'job_count', 'n')
+    return {pk: (stored, n) for pk, stored, n in actual if stored != n}
+
+
+def rebuild(model, drift=None):
+    """Write the correct job_count on every drifted row; returns the drift fixed."""
+    drift = find_drift(model) if drift is None else drift
+    model.objects.bulk_update(
+        [model(pk=pk, job_count=actual) for pk, (_, actual) in drift.items()],
+        ['job_count'],
+        batch_size=500,
+    )
+    return drift
@@ -0,0 +1,191 @@
+"""
+Streaming job exports for bulk consumers.
+
+Rows are read with QuerySet.iterator(chunk_size) (a server-side cursor on
+PostgreSQL; prefetches run per chunk) and written out a chunk at a time,
+so memory stays flat no matter how many jobs match.
+
+iter_ndjson() serializes API rows (?stream=1 on the list endpoints).
+export_chunks() reads the flat EXPORT_COLUMNS instead -- plain column
+values plus one skills query per chunk, no model instances or serializer
+-- for the full-dataset export in CSV, NDJSON or Parquet (FORMATS;
+Parquet needs pyarrow).
+"""
+
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Job
+
+CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 5000
+
+# (column, field read from Job); skills are added per chunk
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('company', 'company__name'),
+    ('city', 'location__city'),
+    ('country', 'location__country'),
+    ('remote', 'location__is_remote'),
+    ('job_type', 'job_type'),
+    ('experience_level', 'experience_level'),
+    ('salary_min', 'salary_min'),
+    ('salary_max', 'salary_max'),
+    ('salary_currency', 'salary_currency'),
+    ('posted_date', 'posted_date'),
+    ('external_url', 'external_url'),
+]
+COLUMNS = [name for name, _ in EXPORT_COLUMNS] + ['skills']
+
+
+def iter_ndjson(queryset, serializer_class, chunk_size=CHUNK_SIZE, context=None):
+    """Yield one JSON line per job, serialized by `serializer_class`."""
+    chunk = []
+    for job in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(job)
+        if len(chunk) == chunk_size:
+            yield from _dump_chunk(chunk, serializer_class, context)
+            chunk = []
+    if chunk:
+        yield from _dump_chunk(chunk, serializer_class, context)
+
+
+def _dump_chunk(jobs, serializer_class, context):
+    for row in serializer_class(jobs, many=True, context=context).data:
+        yield json.dumps(row, cls=JSONEncoder) + '\n'
+
+
+def ndjson_response(queryset, serializer_class, chunk_size=CHUNK_SIZE, context=None):
+    return StreamingHttpResponse(
+        iter_ndjson(queryset, serializer_class, chunk_size, context),
+        content_type='application/x-ndjson',
+    )
+
+
+# ----------------------- BULK EXPORT -----------------------
+def export_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield lists of export rows (tuples in COLUMNS order, skills as a list of names), in pk order."""
+    rows = queryset.order_by('pk').values_list(*[field for _, field in EXPORT_COLUMNS]).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield _with_skills(chunk)
+            chunk = []
+    if chunk:
+        yield _with_skills(chunk)
+
+
+def _with_skills(chunk):
+    skills = {row[0]: [] for row in chunk}
+    for job_id, name in Job.skills.through.objects.filter(job_id__in=skills).order_by(
+        'job_id', 'skill__name'
+    ).values_list('job_id', 'skill__name'):
+        skills[job_id].append(name)
+    return [(*row, skills[row[0]]) for row in chunk]
+
+
+def iter_csv(chunks):
+    """CSV text, one string per chunk; skills are joined with ';'."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for chunk in chunks:
+        writer.writerows((*row[:-1], ';'.join(row[-1])) for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()  # the header, if there were no rows
+
+
+def iter_export_ndjson(chunks):
+    """One JSON object per line, one string per chunk."""
+    for chunk in chunks:
+        yield ''.join(json.dumps(dict(zip(COLUMNS, row)), cls=JSONEncoder) + '\n' for row in chunk)
+
+
+class _ByteSink:
+    """Write-only file that keeps what was written until take() (a streaming target for ParquetWriter)."""
+
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        data, self.parts = b''.join(self.parts), []
+        return data
+
+
+def iter_parquet(chunks):
+    """A Parquet file, one row group (and bytes string) per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('company', pa.string()),
+        ('city', pa.string()),
+        ('country', pa.string()),
+        ('remote', pa.bool_()),
+        ('job_type', pa.string()),
+        ('experience_level', pa.string()),
+        ('salary_min', pa.decimal128(10, 2)),
+        ('salary_max', pa.decimal128(10, 2)),
+        ('salary_currency', pa.string()),
+        ('posted_date', pa.date32()),
+        ('external_url', pa.string()),
+        ('skills', pa.list_(pa.string())),
+    ])
+    sink = _ByteSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(zip(*chunk), schema)], schema=schema
+            ))
+            yield sink.take()
+    yield sink.take()  # footer
+
+
+# format -> (writer, content type, text?)
+FORMATS = {
+    'csv': (iter_csv, 'text/csv', True),
+    'ndjson': (iter_export_ndjson, 'application/x-ndjson', True),
+    'parquet': (iter_parquet, 'application/vnd.apache.parquet', False),
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_response(queryset, fmt, chunk_size=EXPORT_CHUNK_SIZE):
+    writer, content_type, _ = FORMATS[fmt]
+    response = StreamingHttpResponse(writer(export_chunks(queryset, chunk_size)), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="jobs.{fmt}"'
+    return response
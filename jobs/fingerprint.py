@@ -0,0 +1,39 @@
+"""
+Job fingerprints for deduplication.
+
+A fingerprint is a hash of the posting's normalized external URL, title and
+company name, so the same posting scraped twice maps to one row even when
+the URL gains tracking parameters or the title changes case, while distinct
+roles that merely share a title stay apart. It is set once, when the job is
+first stored, and backs the unique index ingestion upserts against.
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+# Query parameters that never identify a posting
+TRACKING_PARAMS = {'ref', 'source', 'src', 'fbclid', 'gclid', 'mc_cid', 'mc_eid'}
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    return WHITESPACE_RE.sub(' ', (text or '').strip()).casefold()
+
+
+def normalize_url(url):
+    """Scheme-, case- and tracking-insensitive form of `url`."""
+    parts = urlsplit((url or '').strip())
+    host = parts.netloc.lower().removeprefix('www.')
+    path = parts.path.rstrip('/')
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    )
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def job_fingerprint(external_url, title, company_name):
+    key = '\n'.join([normalize_url(external_url), normalize_text(title), normalize_text(company_name)])
+    return hashlib.sha1(key.encode()).hexdigest()
@@ -0,0 +1,305 @@
+"""
+Batched ingestion of scraped listings.
+
+Scrapers hand parsed listings (plain dicts) to a JobIngestor, which writes
+them in batches: companies, locations and skills are resolved with one
+lookup and one bulk_create each, jobs are bulk-created, and the job/skill
+through rows are inserted in bulk, all inside one transaction per batch.
+
+Postings are identified by their fingerprint (see jobs.fingerprint). Each
+batch looks its fingerprints up in one query; new postings are inserted,
+changed ones refreshed (REFRESH_FIELDS, added skills) through a single
+bulk_create(update_conflicts=True), and unchanged ones cost no writes.
+
+Each job also keeps a hash of the listing it was last written from
+(Job.listing_hash). Scrapers pass their listings through
+exclude_unchanged() before any extra work such as fetching detail pages,
+so on a steady-state run only new or changed listings reach a batch.
+
+A listing dict looks like:
+
+    {
+        'title': 'Senior Python Engineer',
+        'company': 'Acme',                        # company name
+        'location': ('Remote', 'Worldwide', True), # (city, country, is_remote)
+        'description': '...',
+        'external_url': 'https://...',
+        'skills': ['Python', 'Django'],           # skill names
+        # optional: job_type, experience_level, salary_min, salary_max,
+        # salary_currency, tags, posted_date, status, company_description
+    }
+"""
+
+import hashlib
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, counters, similar
+from .fingerprint import job_fingerprint
+from .models import Company, Location, Skill, Job
+from .skills import invalidate_extractor_on_commit
+
+JOB_FIELDS = [
+    'job_type', 'experience_level', 'salary_min', 'salary_max',
+    'salary_currency', 'tags', 'posted_date', 'status',
+]
+
+# What a re-scrape refreshes on a job it already has (never moderation state or history)
+REFRESH_FIELDS = [
+    'description', 'location', 'job_type', 'experience_level', 'salary_min',
+    'salary_max', 'salary_currency', 'tags', 'external_url', 'listing_hash',
+]
+
+
+def listing_hash(listing):
+    """Hash of everything a listing dict says (its 'listing_hash' aside)."""
+    data = {key: value for key, value in listing.items() if key != 'listing_hash'}
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class JobIngestor:
+    """Collect listings and write them to the DB a batch at a time."""
+
+    def __init__(self, source=None, batch_size=500, status='pending', refresh_fields=REFRESH_FIELDS):
+        self.source = source
+        self.batch_size = batch_size
+        self.status = status
+        self.refresh_fields = [Job._meta.get_field(name) for name in refresh_fields]
+        self.pending = []
+        self.created = []  # Job objects written so far
+        self.updated = []  # existing jobs refreshed with changed data
+        self.skipped = 0   # repeats and unchanged re-scrapes
+        self.listing_hashes = None  # the source's stored listing hashes, see load_listing_hashes()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(listing):
+        return job_fingerprint(listing['external_url'], listing['title'], listing['company'])
+
+    def add(self, listing):
+        self.pending.append(listing)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def extend(self, listings):
+        for listing in listings:
+            self.add(listing)
+
+    def exclude_existing(self, listings):
+        """Drop listings already stored (same fingerprint) with a single query."""
+        if not listings:
+            return []
+        existing = set(
+            Job.objects.filter(
+                fingerprint__in={self.fingerprint(l) for l in listings}
+            ).values_list('fingerprint', flat=True)
+        )
+        return [l for l in listings if self.fingerprint(l) not in existing]
+
+    def skip(self, count=1):
+        """Count listings dropped before reaching a batch (safe from other threads)."""
+        with self._lock:
+            self.skipped += count
+
+    def load_listing_hashes(self):
+        """Read the listing hashes of the source's jobs up front: exclude_unchanged() then needs no query."""
+        self.listing_hashes = set(
+            Job.objects.filter(source=self.source).exclude(listing_hash='')
+            .values_list('listing_hash', flat=True).iterator(chunk_size=10_000)
+        )
+
+    def exclude_unchanged(self, listings):
+        """Drop listings stored from identical data, counting them as skipped; one query, or none if loaded.
+
+        Stamps each listing with its hash first, so later edits to the dict
+        (a description from the detail page) don't count as changes.
+        """
+        if not listings:
+            return []
+        for listing in listings:
+            listing.setdefault('listing_hash', listing_hash(listing))
+        if self.listing_hashes is not None:
+            # The hash covers the URL, title and company, so a match is the same posting
+            changed = [l for l in listings if l['listing_hash'] not in self.listing_hashes]
+        else:
+            stored = dict(
+                Job.objects.filter(fingerprint__in={self.fingerprint(l) for l in listings})
+                .values_list('fingerprint', 'listing_hash')
+            )
+            changed = [l for l in listings if stored.get(self.fingerprint(l)) != l['listing_hash']]
+        self.skip(len(listings) - len(changed))
+        return changed
+
+    def flush(self):
+        """Write the pending batch; returns the jobs it created or refreshed."""
+        batch, self.pending = self.pending, []
+
+        # One listing per fingerprint; later repeats in the batch are duplicates
+        listings = {}
+        for listing in batch:
+            fingerprint = self.fingerprint(listing)
+            if fingerprint in listings:
+                self.skip()
+            else:
+                listings[fingerprint] = listing
+        if not listings:
+            return []
+
+        with transaction.atomic():
+            companies = self._resolve_companies(
+                {l['company']: l.get('company_description', '') for l in listings.values()}
+            )
+            locations = self._resolve_locations(
+                {tuple(l['location']) for l in listings.values() if l.get('location')}
+            )
+            skills = self._resolve_skills({name for l in listings.values() for name in l.get('skills', ())})
+
+            # The stored version of every posting in the batch, and its skills: two queries
+            stored = {
+                row['fingerprint']: row
+                for row in Job.objects.filter(fingerprint__in=listings).values(
+                    'pk', 'fingerprint', 'status', 'is_active', *(f.attname for f in self.refresh_fields)
+                )
+            }
+            stored_skills = defaultdict(set)
+            for job_id, skill_id in Job.skills.through.objects.filter(
+                job_id__in=[row['pk'] for row in stored.values()]
+            ).values_list('job_id', 'skill_id'):
+                stored_skills[job_id].add(skill_id)
+
+            new_jobs, changed_jobs, job_skills = [], [], {}
+            for fingerprint, listing in listings.items():
+                job = self._build_job(listing, fingerprint, companies, locations)
+                wanted_skills = {skills[name].pk for name in listing.get('skills', ())}
+                row = stored.get(fingerprint)
+                if row is None:
+                    new_jobs.append(job)
+                elif self._changed(job, row) or not wanted_skills <= stored_skills[row['pk']]:
+                    changed_jobs.append(job)
+                else:
+                    self.skip()  # unchanged re-scrape: nothing to write
+                    continue
+                job_skills[fingerprint] = wanted_skills
+
+            jobs = new_jobs + changed_jobs
+            if not jobs:
+                return []
+
+            # Insert new postings and refresh changed ones in one statement
+            Job.objects.bulk_create(
+                jobs,
+                update_conflicts=True,
+                unique_fields=['fingerprint'],
+                update_fields=[f.name for f in self.refresh_fields] + ['updated_at'],
+            )
+
+            Through = Job.skills.through
+            Through.objects.bulk_create(
+                [
+                    Through(job_id=job.pk, skill_id=skill_id)
+                    for job in jobs
+                    for skill_id in job_skills[job.fingerprint]
+                ],
+                ignore_conflicts=True,
+            )
+
+            # bulk_create skips the signal handlers, so count approved jobs here
+            counters.adjust_for_jobs([job.pk for job in new_jobs if counters.is_counted(job)], 1)
+            self._adjust_changed_counters(changed_jobs, stored, stored_skills, job_skills)
+            caching.invalidate_on_commit()
+            similar.invalidate_on_commit(job.pk for job in changed_jobs)
+
+        self.created.extend(new_jobs)
+        self.updated.extend(changed_jobs)
+        return jobs
+
+    def _build_job(self, listing, fingerprint, companies, locations):
+        job = Job(
+            title=listing['title'],
+            company=companies[listing['company']],
+            location=locations.get(tuple(listing['location'])) if listing.get('location') else None,
+            description=listing.get('description', ''),
+            external_url=listing['external_url'],
+            source=self.source,
+            status=self.status,
+            posted_date=timezone.now().date(),
+            fingerprint=fingerprint,
+            listing_hash=listing.get('listing_hash') or listing_hash(listing),
+        )
+        for field in JOB_FIELDS:
+            if listing.get(field) is not None:
+                setattr(job, field, listing[field])
+        return job
+
+    def _changed(self, job, row):
+        return any(
+            field.to_python(field.value_from_object(job)) != field.to_python(row[field.attname])
+            for field in self.refresh_fields
+        )
+
+    def _adjust_changed_counters(self, changed_jobs, stored, stored_skills, job_skills):
+        """Counter moves for refreshed jobs that are counted: new location, added skills."""
+        location_deltas, skill_deltas = defaultdict(int), defaultdict(int)
+        for job in changed_jobs:
+            row = stored[job.fingerprint]
+            if not (row['is_active'] and row['status'] == 'approved'):
+                continue
+            if 'location_id' in row and row['location_id'] != job.location_id:
+                location_deltas[row['location_id']] -= 1
+                location_deltas[job.location_id] += 1
+            for skill_id in job_skills[job.fingerprint] - stored_skills[row['pk']]:
+                skill_deltas[skill_id] += 1
+        location_deltas.pop(None, None)
+        counters.apply_deltas(Location, location_deltas)
+        counters.apply_deltas(Skill, skill_deltas)
+
+    # ----------------------- LOOKUPS -----------------------
+    def _resolve_companies(self, descriptions):
+        names = set(descriptions)
+        found = {}
+        for company in Company.objects.filter(name__in=names).order_by('pk'):
+            found.setdefault(company.name, company)  # names aren't unique; keep the oldest
+
+        missing = [
+            Company(name=name, description=descriptions[name])
+            for name in names if name not in found
+        ]
+        if missing:
+            Company.objects.bulk_create(missing)
+            for company in Company.objects.filter(name__in=[c.name for c in missing]).order_by('pk'):
+                found.setdefault(company.name, company)
+        return found
+
+    def _resolve_locations(self, keys):
+        def lookup():
+            return {
+                (loc.city, loc.country): loc
+                for loc in Location.objects.filter(
+                    city__in={city for city, _, _ in keys},
+                    country__in={country for _, country, _ in keys},
+                )
+            }
+
+        found = lookup()
+        missing = [
+            Location(city=city, country=country, is_remote=is_remote)
+            for city, country, is_remote in keys
+            if (city, country) not in found
+        ]
+        if missing:
+            Location.objects.bulk_create(missing, ignore_conflicts=True)
+            found = lookup()
+        return {key: found[key[:2]] for key in keys}
+
+    def _resolve_skills(self, names):
+        found = {skill.name: skill for skill in Skill.objects.filter(name__in=names)}
+        missing = [Skill(name=name) for name in names if name not in found]
+        if missing:
+            Skill.objects.bulk_create(missing, ignore_conflicts=True)
+            invalidate_extractor_on_commit()  # bulk_create skips the signal handlers
+            found = {skill.name: skill for skill in Skill.objects.filter(name__in=names)}
+        return found
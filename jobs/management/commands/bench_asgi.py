@@ -0,0 +1,179 @@
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from jobs.models import Job
+
+# (URL under WSGI, URL under ASGI): the DRF view, and its async version (see jobs.async_views)
+ENDPOINTS = {
+    'list': ('/api/jobs/', '/api/async/jobs/'),
+    'detail': ('/api/jobs/{job}/', '/api/async/jobs/{job}/'),
+    'skills': ('/api/skills/top_demanded/', '/api/async/skills/top_demanded/'),
+    'analytics': ('/api/analytics/summary/', '/api/analytics/summary/'),  # async only: WSGI runs it in a loop per request
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hot read endpoints under WSGI (a pool of worker threads) and ASGI (one event loop) '
+        'with many concurrent slow clients, in process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', action='append', choices=list(ENDPOINTS), help='Only these endpoints')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint and server')
+        parser.add_argument('--clients', type=int, default=64, help='Concurrent clients, each sending its next request once served')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads (gunicorn --threads)')
+        parser.add_argument(
+            '--client-delay', type=float, default=100,
+            help='Milliseconds each client takes to read its response (a slow network); the server waits on it'
+        )
+        parser.add_argument(
+            '--drf-under-asgi', action='store_true',
+            help='Also serve the sync DRF views through the ASGI handler'
+        )
+
+    def handle(self, *args, **options):
+        job = Job.objects.filter(is_active=True, status='approved').values_list('pk', flat=True).first()
+        if job is None:
+            raise CommandError('No approved jobs to request (see create_sample_data)')
+        connection.close()  # every client opens its own
+
+        delay = options['client_delay'] / 1000
+        self.stdout.write(
+            f'{options["requests"]:,} requests per run, {options["clients"]} clients reading each '
+            f'response in {options["client_delay"]:g} ms; WSGI on {options["threads"]} threads, ASGI on one loop'
+        )
+        for name in options['endpoint'] or ENDPOINTS:
+            sync_url, async_url = (url.format(job=job) for url in ENDPOINTS[name])
+            self.report(name, f'WSGI, {options["threads"]} threads', self.run_wsgi(
+                sync_url, options['requests'], options['clients'], options['threads'], delay
+            ))
+            self.report(name, 'ASGI', asyncio.run(self.run_asgi(
+                async_url, options['requests'], options['clients'], delay
+            )))
+            if options['drf_under_asgi'] and sync_url != async_url:
+                self.report(name, 'ASGI, DRF view', asyncio.run(self.run_asgi(
+                    sync_url, options['requests'], options['clients'], delay
+                )))
+
+    def report(self, endpoint, server, run):
+        seconds, latencies, errors = run
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f'{endpoint:<10} {server:<20} {len(latencies) / seconds:8,.0f} req/sec, '
+            f'p50 {statistics.median(latencies) * 1000 if latencies else 0:6,.0f} ms, '
+            f'p95 {p95 * 1000:6,.0f} ms, {errors} errors'
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f'  {errors} responses were not 200'))
+
+    # ----------------------- WSGI -----------------------
+    def run_wsgi(self, url, requests, clients, threads, delay):
+        """Clients on threads of their own, queued for `threads` workers in arrival order, as by a threaded WSGI server."""
+        handler = WSGIHandler()
+        workers = ThreadPoolExecutor(max_workers=threads)
+        self.wsgi_request(handler, url, 0)  # warm up: caches, plans
+        remaining = iter(range(requests))
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def client():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                start = time.perf_counter()
+                status = workers.submit(self.wsgi_request, handler, url, delay).result()
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+                    if not status.startswith('200'):
+                        errors.append(status)
+
+        start = time.perf_counter()
+        client_threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+        for thread in client_threads:
+            thread.start()
+        for thread in client_threads:
+            thread.join()
+        workers.shutdown()
+        return time.perf_counter() - start, latencies, len(errors)
+
+    @staticmethod
+    def wsgi_request(handler, url, delay):
+        parts = urlsplit(url)
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': parts.path, 'QUERY_STRING': parts.query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost', 'REMOTE_ADDR': '127.0.0.1',
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        status = []
+        response = handler(environ, lambda line, headers, exc_info=None: status.append(line))
+        try:
+            for _ in response:
+                pass
+            time.sleep(delay)  # writing to a slow client holds the worker thread
+        finally:
+            response.close()  # request_finished: closes the thread's DB connection
+        return status[0]
+
+    # ----------------------- ASGI -----------------------
+    async def run_asgi(self, url, requests, clients, delay):
+        """Clients as coroutines on this loop, all served at once, as by an ASGI server (uvicorn)."""
+        handler = ASGIHandler()
+        await self.asgi_request(handler, url, 0)
+        remaining = iter(range(requests))
+        latencies, errors = [], []
+
+        async def client():
+            while next(remaining, None) is not None:
+                start = time.perf_counter()
+                status = await self.asgi_request(handler, url, delay)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return time.perf_counter() - start, latencies, len(errors)
+
+    @staticmethod
+    async def asgi_request(handler, url, delay):
+        parts = urlsplit(url)
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': parts.path, 'raw_path': parts.path.encode(), 'query_string': parts.query.encode(),
+            'root_path': '', 'headers': [(b'host', b'localhost')],
+            'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+        }
+        received = False
+        status = []
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()  # the client never disconnects; the handler cancels this
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(delay)  # writing to a slow client only suspends this request
+
+        await handler(scope, receive, send)
+        return status[0]
@@ -0,0 +1,94 @@
+import re
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.scraper import WeWorkRemotelyScraper
+from jobs.scraper.parse import ListingParser, available_backends
+
+FIXTURE = Path(__file__).resolve().parents[2] / 'testdata' / 'weworkremotely' / 'category.html'
+LISTING_RE = re.compile(rb'<li class="new-listing-container.*?</li>', re.DOTALL)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark category page parsing throughput (pages/sec) on the saved WeWorkRemotely fixtures'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=200, help='Pages parsed per backend')
+        parser.add_argument(
+            '--listings', type=int, default=100,
+            help='Listings per page (the fixture listings repeated)'
+        )
+        parser.add_argument('--backend', action='append', choices=available_backends(), help='Only these backends')
+        parser.add_argument(
+            '--baseline', action='store_true',
+            help='Also time the old BeautifulSoup html.parser + select() path'
+        )
+
+    def handle(self, *args, **options):
+        page = self.build_page(options['listings'])
+        pages = options['pages']
+        self.stdout.write(f'{pages:,} pages of {options["listings"]:,} listings, {len(page) / 1e3:.0f} KB each')
+
+        expected, first = None, None
+        for backend in options['backend'] or available_backends():
+            parser = ListingParser(
+                WeWorkRemotelyScraper.LISTING_CONTAINER, WeWorkRemotelyScraper.LISTING_FIELDS, backend=backend
+            )
+            records = self.time(backend, lambda: parser.parse(page), pages, len(page))
+            if expected is None:
+                expected, first = records, backend
+            elif records != expected:
+                raise CommandError(f'{backend} extracted different fields than {first}')
+
+        if options['baseline']:
+            from bs4 import BeautifulSoup
+
+            def baseline():
+                soup = BeautifulSoup(page.decode('utf-8'), 'html.parser')
+                return [self.select_fields(li) for li in soup.select(WeWorkRemotelyScraper.LISTING_CONTAINER)]
+
+            records = self.time('BeautifulSoup + select', baseline, pages, len(page))
+            if expected is not None and records != expected:
+                raise CommandError(f'The baseline extracted different fields than {first}')
+
+    def build_page(self, listings):
+        """The fixture category page with its listings repeated to `listings` of them."""
+        fixture = FIXTURE.read_bytes()
+        items = LISTING_RE.findall(fixture)
+        start, end = fixture.index(items[0]), fixture.rindex(items[-1]) + len(items[-1])
+        body = b'\n'.join(items[i % len(items)] for i in range(listings))
+        return fixture[:start] + body + fixture[end:]
+
+    def time(self, label, parse, pages, size):
+        start = time.perf_counter()
+        for _ in range(pages):
+            records = parse()
+        seconds = time.perf_counter() - start
+        self.stdout.write(
+            f'{label}: {pages / seconds:,.0f} pages/sec, {pages * len(records) / seconds:,.0f} listings/sec, '
+            f'{pages * size / 1e6 / seconds:.1f} MB/sec ({seconds:.2f} s)'
+        )
+        return records
+
+    @staticmethod
+    def select_fields(li):
+        """The raw listing fields, one select() per field as the scraper used to."""
+        fields = {}
+        for name, field in WeWorkRemotelyScraper.LISTING_FIELDS.items():
+            if field.many:
+                elems = li.select(field.selector.css)
+                if elems:
+                    fields[name] = [elem.text.strip() for elem in elems]
+                continue
+            elem = li.select_one(field.selector.css)
+            if elem is None:
+                continue
+            if field.attr:
+                fields[name] = elem.get(field.attr)
+            elif field.mode == 'leading':
+                fields[name] = elem.contents[0].strip() if elem.contents and isinstance(elem.contents[0], str) else ''
+            else:
+                fields[name] = elem.text.strip()
+        return fields
@@ -0,0 +1,68 @@
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from jobs import synthetic
+from jobs.models import Job, Location, Skill
+from jobs.salaries import CHUNK_SIZE, salary_stats
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the chunked salary engine against one ORM query per skill/location/experience level'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1_000_000, help='Corpus size')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Jobs per chunk')
+        parser.add_argument('--currency', default='USD')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--skip-orm', action='store_true', help='Only time the chunked engine')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Preparing {options['jobs']:,} synthetic jobs...")
+        source = synthetic.ensure_jobs(
+            options['jobs'],
+            seed=options['seed'],
+            progress=lambda n: self.stdout.write(f'  inserted up to {n:,}'),
+        )
+        jobs = Job.objects.filter(source=source)
+        currency = options['currency']
+
+        start = time.perf_counter()
+        stats = salary_stats(jobs, currency=currency, chunk_size=options['chunk_size'])
+        engine_seconds = time.perf_counter() - start
+        overall = stats['overall'] or {}
+        self.stdout.write(
+            f"Chunked engine: {engine_seconds:.2f} s for {overall.get('jobs', 0):,} {currency} jobs "
+            f"(p10 {overall.get('p10')}, p50 {overall.get('p50')}, p90 {overall.get('p90')})"
+        )
+
+        # Second pass under tracemalloc (numpy and pandas report to it), which slows things down
+        tracemalloc.start()
+        salary_stats(jobs, currency=currency, chunk_size=options['chunk_size'])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(f'Chunked engine peak Python/numpy memory: {peak / 1e6:.1f} MB')
+
+        if options['skip_orm']:
+            return
+
+        # The per-group alternative: one query per group, salaries pulled into Python
+        priced = jobs.filter(salary_currency=currency, salary_min__isnull=False, salary_max__isnull=False)
+        groups = (
+            [('experience', {'experience_level': level}) for level, _ in Job.EXPERIENCE_CHOICES]
+            + [('skill', {'skills': pk}) for pk in Skill.objects.values_list('pk', flat=True)]
+            + [('location', {'location': pk}) for pk in Location.objects.values_list('pk', flat=True)]
+        )
+        start = time.perf_counter()
+        for _, lookup in groups:
+            rows = priced.filter(**lookup).values_list('salary_min', 'salary_max')
+            salaries = [(float(low) + float(high)) / 2 for low, high in rows]
+            if salaries:
+                np.percentile(salaries, [10, 50, 90])
+        orm_seconds = time.perf_counter() - start
+        self.stdout.write(
+            f'ORM per group: {orm_seconds:.2f} s for {len(groups):,} groups '
+            f'({engine_seconds and orm_seconds / engine_seconds:.1f}x the chunked engine)'
+        )
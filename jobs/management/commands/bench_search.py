@@ -0,0 +1,63 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import synthetic
+from jobs.models import Job
+from jobs.search import search_jobs, uses_full_text
+
+
+class Command(BaseCommand):
+    help = 'Benchmark job search latency (p50/p95/p99) over a synthetic corpus'
+
+    QUERIES = [
+        'python', 'django', 'react developer', 'senior backend engineer', 'kubernetes',
+        'machine learning', 'go', 'data engineer spark', 'typescript', 'remote devops',
+        'rust', 'aws terraform', 'company 42', 'postgresql', 'frontend vue',
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=1_000_000, help='Corpus size to search')
+        parser.add_argument('--queries', type=int, default=200, help='Number of timed searches')
+        parser.add_argument('--page-size', type=int, default=20, help='Rows fetched per search')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--cleanup', action='store_true', help='Delete the synthetic jobs afterwards')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Preparing {options['jobs']:,} synthetic jobs...")
+        source = synthetic.ensure_jobs(
+            options['jobs'],
+            seed=options['seed'],
+            progress=lambda n: self.stdout.write(f'  inserted up to {n:,}'),
+        )
+
+        jobs = Job.objects.filter(source=source).select_related('company', 'location')
+        backend = 'PostgreSQL full-text (GIN)' if uses_full_text(jobs) else 'icontains fallback'
+        self.stdout.write(f'Search backend: {backend}')
+
+        # Fresh planner statistics after the bulk load
+        if connections[jobs.db].vendor == 'postgresql':
+            with connections[jobs.db].cursor() as cursor:
+                cursor.execute(f'ANALYZE {Job._meta.db_table}')
+
+        rng = random.Random(options['seed'])
+        timings = []
+        for _ in range(options['queries']):
+            query = rng.choice(self.QUERIES)
+            start = time.perf_counter()
+            list(search_jobs(jobs, query)[:options['page_size']])
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        pct = lambda p: timings[min(len(timings) - 1, int(len(timings) * p))]
+        self.stdout.write(
+            f"{len(timings)} searches: mean {statistics.mean(timings):.1f} ms, "
+            f"p50 {pct(0.50):.1f} ms, p95 {pct(0.95):.1f} ms, p99 {pct(0.99):.1f} ms"
+        )
+
+        if options['cleanup']:
+            deleted = synthetic.delete_jobs()
+            self.stdout.write(f'Deleted {deleted:,} synthetic jobs')
@@ -0,0 +1,59 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import synthetic
+from jobs.models import Skill
+from jobs.skills import SkillExtractor
+
+
+class Command(BaseCommand):
+    help = 'Benchmark skill extraction throughput (docs/sec) over synthetic job descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=100_000, help='Number of synthetic descriptions')
+        parser.add_argument(
+            '--extra-skills',
+            type=int,
+            default=0,
+            help='Pad the vocabulary with this many generated skill names'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--baseline', action='store_true', help='Also time the old substring loop')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = set(Skill.objects.values_list('name', flat=True)).union(synthetic.SKILL_NAMES)
+        names.update(f'Tool{i}' for i in range(options['extra_skills']))
+
+        start = time.perf_counter()
+        extractor = SkillExtractor(names)
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(f'Compiled {len(extractor):,} skill terms in {build_ms:.1f} ms')
+
+        self.stdout.write(f"Generating {options['docs']:,} descriptions...")
+        docs = []
+        for i in range(options['docs']):
+            row = synthetic.listing(rng, i)
+            docs.append((row['title'], row['tags'], row['description']))
+        total_mb = sum(len(t) + len(g) + len(d) for t, g, d in docs) / 1e6
+
+        start = time.perf_counter()
+        found = sum(len(extractor.extract(*doc)) for doc in docs)
+        self.report('Compiled extractor', len(docs), total_mb, time.perf_counter() - start, found)
+
+        if options['baseline']:
+            keywords = [name.lower() for name in names]
+            start = time.perf_counter()
+            found = 0
+            for doc in docs:
+                text = ' '.join(doc).lower()
+                found += sum(1 for keyword in keywords if keyword in text)
+            self.report('Substring loop', len(docs), total_mb, time.perf_counter() - start, found)
+
+    def report(self, label, docs, total_mb, seconds, found):
+        self.stdout.write(
+            f'{label}: {docs / seconds:,.0f} docs/sec, {total_mb / seconds:.1f} MB/sec '
+            f'({seconds:.2f} s, {found:,} skill matches)'
+        )
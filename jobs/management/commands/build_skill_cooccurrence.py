@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import cooccurrence
+
+
+class Command(BaseCommand):
+    help = 'Add the job/skill links stored since the last run to the skill co-occurrence matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recount every link (needed after skills were removed from jobs or jobs deleted)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        matrix = cooccurrence.refresh(
+            rebuild=options['rebuild'],
+            progress=lambda last, jobs: self.stdout.write(f'  up to link #{last:,}, {jobs:,} jobs'),
+        )
+        seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(matrix.counts) // 2:,} skill pair(s) across {matrix.jobs:,} job(s), '
+            f'{(len(matrix.indptr) - 1):,} skill row(s) in {seconds:.1f} s'
+        ))
@@ -93,7 +93,12 @@ class Command(BaseCommand):
         experience_levels = ['entry', 'mid', 'senior', 'lead']
         
         for i, title in enumerate(job_titles):
-            for _ in range(3):  # Create 3 jobs for each title
+            for n in range(3):  # Create 3 jobs for each title
+                # One URL per posting; the fingerprint (URL + title + company) must be unique
+                external_url = f'https://example.com/jobs/sample-{i}-{n}'
+                if Job.objects.filter(source=source, external_url=external_url).exists():
+                    continue  # Already created by an earlier run
+                
                 job = Job.objects.create(
                     title=title,
                     company=random.choice(companies),
@@ -105,7 +110,7 @@ class Command(BaseCommand):
                     salary_max=random.randint(120000, 200000),
                     salary_currency='USD',
                     source=source,
-                    external_url='https://example.com/job',
+                    external_url=external_url,
                     status='approved',
                     posted_date=timezone.now().date() - timedelta(days=random.randint(0, 30)),
                     is_active=True
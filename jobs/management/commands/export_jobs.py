@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import counters
+from jobs.export import EXPORT_CHUNK_SIZE, FORMATS, export_chunks, parquet_available
+from jobs.models import Job
+from jobs.search import FILTER_PARAMS, filter_jobs
+
+
+class Command(BaseCommand):
+    help = 'Stream approved, active jobs with company, location and skills as CSV, NDJSON or Parquet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout; required for Parquet)')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Jobs read per chunk')
+        # The jobs page filters
+        for name in FILTER_PARAMS:
+            parser.add_argument(f'--{name.replace("_", "-")}', dest=name, default='')
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        writer, _, text = FORMATS[fmt]
+        if fmt == 'parquet' and not parquet_available():
+            raise CommandError('Parquet export needs pyarrow installed')
+        if not text and not options['output']:
+            raise CommandError('--output is required for binary formats')
+
+        jobs = filter_jobs(Job.objects.filter(counters.COUNTED), options, ranked=None)
+        start = time.perf_counter()
+        rows = 0
+
+        def counted(chunks):
+            nonlocal rows
+            for chunk in chunks:
+                rows += len(chunk)
+                yield chunk
+
+        parts = writer(counted(export_chunks(jobs, options['chunk_size'])))
+        if options['output']:
+            with open(options['output'], 'w' if text else 'wb', **({'newline': ''} if text else {})) as out:
+                out.writelines(parts)
+        else:
+            for part in parts:
+                self.stdout.write(part, ending='')
+        self.stderr.write(f'Exported {rows:,} job(s) as {fmt} in {time.perf_counter() - start:.1f} s')
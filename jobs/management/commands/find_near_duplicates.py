@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from jobs.near_duplicates import THRESHOLD, NearDuplicateIndex
+
+
+class Command(BaseCommand):
+    help = 'Sign jobs not yet in the near-duplicate index and flag the ones that repeat an indexed job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help='Only jobs from this JobSource (by name)')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=THRESHOLD,
+            help='Estimated Jaccard similarity at which a job is flagged'
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs signed and looked up per batch')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options['source']:
+            jobs = jobs.filter(source__name=options['source'])
+
+        index = NearDuplicateIndex(threshold=options['threshold'], batch_size=options['batch_size'])
+        start = time.perf_counter()
+        index.index_new_jobs(jobs, progress=self.progress)
+        seconds = time.perf_counter() - start
+
+        per_job = f' ({seconds * 1000 / index.indexed:.2f} ms per job)' if index.indexed else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {index.indexed:,} job(s) in {seconds:.1f} s{per_job}; '
+            f'flagged {index.flagged:,} near-duplicate(s)'
+        ))
+
+    def progress(self, index):
+        if index.indexed % (index.batch_size * 20) == 0:
+            self.stdout.write(f'  {index.indexed:,} jobs indexed, {index.flagged:,} flagged')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import caching, counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-skill/company/location job_count counters and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drifted counters, do not fix them'
+        )
+
+    def handle(self, *args, **options):
+        total_drift = 0
+
+        for model in counters.counter_models():
+            with transaction.atomic():
+                drift = counters.find_drift(model)
+                if drift and not options['check']:
+                    counters.rebuild(model, drift)
+
+            total_drift += len(drift)
+            label = model._meta.verbose_name_plural.title()
+            self.stdout.write(f'{label}: {len(drift)} drifted counter(s)')
+            for pk, (stored, actual) in list(drift.items())[:10]:
+                self.stdout.write(f'  #{pk}: stored {stored}, actual {actual}')
+
+        if options['check']:
+            self.stdout.write(f'Found {total_drift} drifted counter(s)')
+        else:
+            caching.invalidate()
+            self.stdout.write(self.style.SUCCESS(f'Reconciled {total_drift} counter(s)'))
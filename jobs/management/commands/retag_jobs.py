@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import cooccurrence
+from jobs.models import Job, Skill
+from jobs.retag import Checkpoint, Retagger
+
+
+class Command(BaseCommand):
+    help = 'Re-run skill extraction over stored jobs and apply only the changed job/skill links'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only jobs posted on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Only jobs posted on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--source', help='Only jobs from this JobSource (by name)')
+        parser.add_argument(
+            '--skill',
+            action='append',
+            dest='skills',
+            help='Only (re)consider this skill; repeat for several (default: all skills)'
+        )
+        parser.add_argument(
+            '--add-only',
+            action='store_true',
+            help='Attach newly found skills but never detach existing ones'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Jobs read and written per chunk')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help='Extract in this many worker processes (0 = in this process)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='JSON file recording progress; an interrupted run resumes from it'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without writing them')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options['since']:
+            jobs = jobs.filter(posted_date__gte=options['since'])
+        if options['until']:
+            jobs = jobs.filter(posted_date__lte=options['until'])
+        if options['source']:
+            jobs = jobs.filter(source__name=options['source'])
+
+        skills = Skill.objects.all()
+        if options['skills']:
+            skills = skills.filter(name__in=options['skills'])
+            missing = set(options['skills']).difference(skills.values_list('name', flat=True))
+            if missing:
+                raise CommandError(f"Unknown skill(s): {', '.join(sorted(missing))}")
+
+        # The checkpoint is only valid for the same selection of jobs and skills
+        scope = {key: options[key] for key in ('since', 'until', 'source', 'skills', 'add_only')}
+        checkpoint = Checkpoint(options['checkpoint'], scope)
+        try:
+            start_after = checkpoint.load()
+        except ValueError as e:
+            raise CommandError(str(e))
+        if start_after:
+            self.stdout.write(f'Resuming after job #{start_after}')
+
+        retagger = Retagger(
+            skills,
+            add_only=options['add_only'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
+        self.stdout.write(f'Extracting {len(retagger.extractor):,} skill terms...')
+        retagger.run(
+            jobs,
+            checkpoint,
+            progress=lambda r: self.stdout.write(
+                f'  {r.checked:,} jobs checked, {r.added:,} links added, {r.removed:,} removed'
+            ),
+        )
+
+        prefix = 'Would change' if options['dry_run'] else 'Changed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix} {retagger.added + retagger.removed:,} job/skill link(s) across '
+            f'{retagger.checked:,} job(s): +{retagger.added:,} -{retagger.removed:,}'
+        ))
+
+        # Added links are counted incrementally; removed ones need a recount
+        if not options['dry_run'] and (retagger.added or retagger.removed):
+            cooccurrence.refresh(rebuild=bool(retagger.removed))
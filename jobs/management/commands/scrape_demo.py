@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
-from jobs.models import Company, Location, Skill, Job, JobSource
-from django.utils import timezone
+from jobs.models import JobSource
+from jobs.ingest import JobIngestor
 import random
 
 class Command(BaseCommand):
@@ -113,53 +113,30 @@ class Command(BaseCommand):
             },
         ]
         
-        jobs_created = 0
-        
-        for job_data in demo_jobs:
-            # Create company
-            company, _ = Company.objects.get_or_create(
-                name=job_data['company'],
-                defaults={'description': f'{job_data["company"]} is a leading technology company.'}
-            )
-            
-            # Create location
-            location, _ = Location.objects.get_or_create(
-                city='Remote',
-                country=job_data['location'].split(' - ')[1],
-                is_remote=True
-            )
-            
-            # Check if exists
-            if Job.objects.filter(
-                title=job_data['title'],
-                company=company
-            ).exists():
-                continue
-            
-            # Create job
-            job = Job.objects.create(
-                title=job_data['title'],
-                company=company,
-                location=location,
-                description=job_data['description'],
-                job_type='full_time',
-                experience_level=random.choice(['mid', 'senior']),
-                salary_min=job_data['salary_min'],
-                salary_max=job_data['salary_max'],
-                salary_currency='USD',
-                source=source,
-                external_url=f'https://example.com/job/{jobs_created}',
-                status='pending',
-                posted_date=timezone.now().date()
-            )
-            
-            # Add skills
-            for skill_name in job_data['skills']:
-                skill, _ = Skill.objects.get_or_create(name=skill_name)
-                job.skills.add(skill)
-            
-            jobs_created += 1
-            self.stdout.write(f'Created: {job_data["title"]} at {job_data["company"]}')
+        # Batched writes: one lookup per related table and one bulk insert for the jobs
+        ingestor = JobIngestor(source=source)
+        ingestor.extend(
+            {
+                'title': job_data['title'],
+                'company': job_data['company'],
+                'company_description': f'{job_data["company"]} is a leading technology company.',
+                'location': ('Remote', job_data['location'].split(' - ')[1], True),
+                'description': job_data['description'],
+                'job_type': 'full_time',
+                'experience_level': random.choice(['mid', 'senior']),
+                'salary_min': job_data['salary_min'],
+                'salary_max': job_data['salary_max'],
+                'salary_currency': 'USD',
+                'external_url': f'https://example.com/job/{i}',
+                'skills': job_data['skills'],
+            }
+            for i, job_data in enumerate(demo_jobs)
+        )
+        ingestor.flush()
+        jobs_created = len(ingestor.created)
+
+        for job in ingestor.created:
+            self.stdout.write(f'Created: {job.title} at {job.company.name}')
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {jobs_created} demo jobs!')
@@ -1,41 +1,79 @@
-from django.core.management.base import BaseCommand
-from jobs.scraper import run_all_scrapers, RemoteOKScraper, IndeedScraper
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.models import JobSource
+from jobs.scraper import SCRAPERS, arun_sources, due_sources, ensure_sources, is_due, run_sources
+
 
 class Command(BaseCommand):
-    help = 'Scrape jobs from various sources'
-    
+    help = 'Scrape every job source that is due (see JobSource.scraping_frequency), several at a time'
+
     def add_arguments(self, parser):
         parser.add_argument(
-            '--source',
-            type=str,
-            help='Specific source to scrape (remoteok, indeed, or all)',
-            default='all'
+            '--source', action='append', default=[],
+            help='Only this source (by name); repeat for several. Runs it even if it is not due'
         )
+        parser.add_argument('--force', action='store_true', help='Scrape every active source, due or not')
+        parser.add_argument('--workers', type=int, default=4, help='Sources scraped at the same time')
         parser.add_argument(
-            '--query',
-            type=str,
-            help='Search query for Indeed',
-            default='software developer'
+            '--full', action='store_true',
+            help='Parse every page and listing even if unchanged since the last run (e.g. after a parser change)'
         )
-    
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help='Scrape every source at once on one event loop (Scraper.arun) instead of --workers threads'
+        )
+        parser.add_argument('--list', action='store_true', help='Show the sources and when they are due, then exit')
+
     def handle(self, *args, **options):
-        source = options['source'].lower()
-        query = options['query']
-        
-        self.stdout.write(self.style.SUCCESS('Starting job scraping...'))
-        
-        if source == 'all':
-            total_jobs = run_all_scrapers()
-        elif source == 'remoteok':
-            scraper = RemoteOKScraper()
-            total_jobs = scraper.scrape()
-        elif source == 'indeed':
-            scraper = IndeedScraper()
-            total_jobs = scraper.scrape(search_query=query)
+        ensure_sources()
+        sources = JobSource.objects.filter(name__in=list(SCRAPERS)).order_by('name')
+
+        if options['list']:
+            for source in sources:
+                state = 'inactive' if not source.is_active else 'due' if is_due(source) else 'not due'
+                self.stdout.write(
+                    f'{source.name:<24} every {source.scraping_frequency}h, '
+                    f'last scraped {source.last_scraped or "never"} ({state})'
+                )
+            return
+
+        if options['source']:
+            sources = list(sources.filter(name__in=options['source']))
+            unknown = set(options['source']) - {source.name for source in sources}
+            if unknown:
+                raise CommandError(f'No scraper for: {", ".join(sorted(unknown))} (known: {", ".join(SCRAPERS)})')
+        elif options['force']:
+            sources = list(sources.filter(is_active=True))
         else:
-            self.stdout.write(self.style.ERROR(f'Unknown source: {source}'))
+            sources = due_sources()
+
+        if not sources:
+            self.stdout.write('No sources are due')
             return
-        
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully scraped {total_jobs} jobs!')
-        )
\ No newline at end of file
+        self.stdout.write(f'Scraping {", ".join(source.name for source in sources)}...')
+
+        if options['use_async']:
+            results = async_to_sync(arun_sources)(sources, full=options['full'])
+        else:
+            results = run_sources(sources, workers=options['workers'], full=options['full'])
+        for result in results:
+            if result.ok:
+                self.stdout.write(
+                    f'  {result.source}: {result.created:,} created, {result.updated:,} updated, '
+                    f'{result.skipped:,} skipped, {result.flagged:,} near duplicates in {result.seconds:.1f} s'
+                )
+                if result.failed:
+                    self.stdout.write(self.style.WARNING(
+                        f'    {result.failed} page(s) failed and will be retried on the next run'
+                    ))
+                if options['verbosity'] > 1:
+                    for stage in result.stages:
+                        self.stdout.write(f'    {stage}')
+            else:
+                self.stdout.write(self.style.ERROR(f'  {result.source}: {result.error}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Scraped {sum(r.ok for r in results)} of {len(results)} source(s), '
+            f'{sum(r.created for r in results):,} new jobs'
+        ))
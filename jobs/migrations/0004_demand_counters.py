@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:20
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_counters(apps, schema_editor):
+    counted = Q(jobs__is_active=True, jobs__status='approved')
+    for model_name in ['Company', 'Location', 'Skill']:
+        model = apps.get_model('jobs', model_name)
+        rows = [
+            model(pk=pk, job_count=n)
+            for pk, n in model.objects.annotate(n=Count('jobs', filter=counted)).values_list('pk', 'n')
+            if n
+        ]
+        model.objects.bulk_update(rows, ['job_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_remove_location_unique_location_city_country_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:22
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The vector is maintained by triggers so bulk_create/update() paths stay covered.
+# Weights: title (A) > tags (B) > company name (C) > description (D).
+CREATE_SQL = '''
+CREATE OR REPLACE FUNCTION jobs_job_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(
+            (SELECT name FROM jobs_company WHERE id = NEW.company_id), '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER jobs_job_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, tags, description, company_id ON jobs_job
+    FOR EACH ROW EXECUTE FUNCTION jobs_job_search_vector_update();
+
+-- A company rename re-indexes its jobs (touching title fires the trigger above)
+CREATE OR REPLACE FUNCTION jobs_company_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    UPDATE jobs_job SET title = title WHERE company_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER jobs_company_search_vector_trigger
+    AFTER UPDATE OF name ON jobs_company
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION jobs_company_search_vector_update();
+
+UPDATE jobs_job SET title = title;
+
+CREATE INDEX jobs_job_search_vector_gin ON jobs_job USING gin (search_vector);
+'''
+
+DROP_SQL = '''
+DROP INDEX IF EXISTS jobs_job_search_vector_gin;
+DROP TRIGGER IF EXISTS jobs_company_search_vector_trigger ON jobs_company;
+DROP FUNCTION IF EXISTS jobs_company_search_vector_update();
+DROP TRIGGER IF EXISTS jobs_job_search_vector_trigger ON jobs_job;
+DROP FUNCTION IF EXISTS jobs_job_search_vector_update();
+'''
+
+
+def create_search_triggers(apps, schema_editor):
+    # Full-text search is PostgreSQL only; other backends fall back to icontains
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_demand_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_job_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobview',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
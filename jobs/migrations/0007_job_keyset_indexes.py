@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_jobview_viewed_at_default'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='job',
+            options={'ordering': ['-posted_date', '-scraped_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-posted_date', '-scraped_at', '-id'], name='jobs_job_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True), ('status', 'approved')), fields=['-posted_date', '-scraped_at', '-id'], name='jobs_job_listed_newest_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+from jobs.fingerprint import job_fingerprint
+
+
+def fill_fingerprints(apps, schema_editor):
+    # Oldest row wins: later exact duplicates keep a NULL fingerprint (the unique index allows that)
+    Job = apps.get_model('jobs', 'Job')
+    seen, batch = set(), []
+    rows = Job.objects.order_by('pk').values_list('pk', 'external_url', 'title', 'company__name')
+    for pk, url, title, company in rows.iterator(chunk_size=2000):
+        fingerprint = job_fingerprint(url, title, company)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        batch.append(Job(pk=pk, fingerprint=fingerprint))
+        if len(batch) == 1000:
+            Job.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    Job.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='fingerprint',
+            field=models.CharField(editable=False, max_length=40, null=True, unique=True),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_job_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['updated_at'], name='jobs_job_updated_2a4757_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 05:12
+
+from django.db import migrations, models
+
+
+def create_matrix(apps, schema_editor):
+    # The single row jobs.cooccurrence.refresh() locks and updates
+    apps.get_model('jobs', 'SkillCooccurrence').objects.create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_link_id', models.BigIntegerField(default=0)),
+                ('jobs', models.IntegerField(default=0)),
+                ('indptr', models.BinaryField(default=b'')),
+                ('indices', models.BinaryField(default=b'')),
+                ('counts', models.BinaryField(default=b'')),
+                ('totals', models.BinaryField(default=b'')),
+            ],
+        ),
+        migrations.RunPython(create_matrix, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_scrape_change_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillcooccurrence',
+            name='counted_link_ids',
+            field=models.BinaryField(default=b''),
+        ),
+    ]
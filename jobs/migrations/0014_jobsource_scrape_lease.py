@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_cooccurrence_counted_links'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobsource',
+            name='scrape_started_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
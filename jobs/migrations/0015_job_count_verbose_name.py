@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_jobsource_scrape_lease'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='company',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='approved jobs'),
+        ),
+        migrations.AlterField(
+            model_name='location',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='approved jobs'),
+        ),
+        migrations.AlterField(
+            model_name='skill',
+            name='job_count',
+            field=models.IntegerField(db_index=True, default=0, editable=False, verbose_name='approved jobs'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+def reset_matrix(apps, schema_editor):
+    # The stored matrix counts every job; empty it so the next refresh counts approved, active ones only
+    apps.get_model('jobs', 'SkillCooccurrence').objects.filter(pk=1).update(
+        last_link_id=0, counted_link_ids=b'', jobs=0, indptr=b'', indices=b'', counts=b'', totals=b'',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_job_count_verbose_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skillcooccurrence',
+            name='counted_job_ids',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(reset_matrix, migrations.RunPython.noop),
+    ]
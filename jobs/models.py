@@ -1,6 +1,12 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.dispatch import Signal
 from django.utils import timezone
 
+from . import caching, counters
+from .fingerprint import job_fingerprint
+
 # Represents a company that posts jobs
 class Company(models.Model):
     name = models.CharField(max_length=200)  # Company name
@@ -8,6 +14,7 @@ class Company(models.Model):
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)  # Optional logo
     description = models.TextField(blank=True)  # Optional company description
     created_at = models.DateTimeField(auto_now_add=True)  # Auto timestamp when created
+    job_count = models.IntegerField('approved jobs', default=0, db_index=True, editable=False)  # Approved active jobs (see jobs.counters)
 
     class Meta:
         verbose_name_plural = "Companies"  # Correct label in Django admin
@@ -22,6 +29,7 @@ class Skill(models.Model):
     name = models.CharField(max_length=100, unique=True)  # Unique skill name
     category = models.CharField(max_length=100, blank=True)  # Optional skill category
     created_at = models.DateTimeField(auto_now_add=True)  # Timestamp
+    job_count = models.IntegerField('approved jobs', default=0, db_index=True, editable=False)  # Approved active jobs (see jobs.counters)
 
     class Meta:
         ordering = ['name']  # Sort alphabetically
@@ -35,6 +43,7 @@ class Location(models.Model):
     city = models.CharField(max_length=100)  # City name
     country = models.CharField(max_length=100)  # Country name
     is_remote = models.BooleanField(default=False)  # Is it remote job?
+    job_count = models.IntegerField('approved jobs', default=0, db_index=True, editable=False)  # Approved active jobs (see jobs.counters)
 
     class Meta:
         unique_together = ['city', 'country']  # Prevent duplicate locations
@@ -53,11 +62,79 @@ class JobSource(models.Model):
     is_active = models.BooleanField(default=True)  # Used for enabling/disabling scrapers
     scraping_frequency = models.IntegerField(default=24)  # Hours
     last_scraped = models.DateTimeField(null=True, blank=True)  # Timestamp of last run
+    scrape_started_at = models.DateTimeField(null=True, blank=True, editable=False)  # Set while a scrape runs: its lease (see jobs.scraper.scheduler)
 
     def __str__(self):
         return self.name
 
 
+# Validators and body hash of the last copy of a page a scraper fetched (see jobs.scraper.cache)
+class CachedResponse(models.Model):
+    url = models.URLField(max_length=2000, unique=True)
+    etag = models.CharField(max_length=500, blank=True)  # ETag header, sent back as If-None-Match
+    last_modified = models.CharField(max_length=100, blank=True)  # Last-Modified header, sent back as If-Modified-Since
+    body_hash = models.CharField(max_length=40)  # SHA-1 of the body
+    fetched_at = models.DateTimeField(auto_now=True)  # Last time the page came back in full
+
+
+# Job fields the analytics rollups read (see analytics.rollup): changing any of them marks the job as modified
+ROLLUP_FIELDS = counters.TRACKED_FIELDS | {
+    'posted_date', 'job_type', 'experience_level', 'salary_min', 'salary_max', 'salary_currency',
+}
+
+# Sent by JobQuerySet.update() with the posted dates of the counted jobs it moved off and onto
+posted_dates_changed = Signal()
+
+
+# Job queryset whose bulk update() keeps the demand counters in step
+class JobQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        if not ROLLUP_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+
+        # Changes the rollups can see also mark the rows as modified
+        kwargs.setdefault('updated_at', timezone.now())
+        tracked = bool(counters.TRACKED_FIELDS.intersection(kwargs))
+        moves_days = 'posted_date' in kwargs
+        if not tracked and not moves_days:
+            return super().update(**kwargs)
+        moves_jobs = bool({'company', 'company_id', 'location', 'location_id'}.intersection(kwargs))
+
+        with transaction.atomic(using=self.db):
+            ids = list(self.values_list('pk', flat=True))
+            rows = Job.objects.using(self.db).filter(pk__in=ids)
+            before = set(rows.filter(counters.COUNTED).select_for_update().values_list('pk', flat=True))
+            days = set(rows.filter(counters.COUNTED).values_list('posted_date', flat=True)) if moves_days else set()
+
+            if not tracked:
+                updated = super(JobQuerySet, rows).update(**kwargs)
+            elif moves_jobs:
+                # Counted jobs may change company/location: take them all out and put them back
+                counters.adjust_for_jobs(before, -1)
+                updated = super(JobQuerySet, rows).update(**kwargs)
+                counters.adjust_for_jobs(rows.filter(counters.COUNTED).values_list('pk', flat=True), 1)
+            else:
+                updated = super(JobQuerySet, rows).update(**kwargs)
+                after = set(rows.filter(counters.COUNTED).values_list('pk', flat=True))
+                counters.adjust_for_jobs(after - before, 1)
+                counters.adjust_for_jobs(before - after, -1)
+
+            if moves_days:
+                days.update(rows.filter(counters.COUNTED).values_list('posted_date', flat=True))
+                posted_dates_changed.send(sender=Job, days=days)
+            caching.invalidate_on_commit()
+
+        return updated
+
+
+# Default manager: the search vector is only read inside the database, never load it
+class JobManager(models.Manager.from_queryset(JobQuerySet)):
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
 # Main Job model that stores job listings
 class Job(models.Model):
     # Choices for dropdown in Django admin
@@ -107,23 +184,83 @@ class Job(models.Model):
     updated_at = models.DateTimeField(auto_now=True)  # When job record last updated
     is_active = models.BooleanField(default=True)  # Hide/show job without deleting
     views = models.IntegerField(default=0)  # Track number of views
+    search_vector = SearchVectorField(null=True, editable=False)  # Weighted full-text vector, kept up to date by a DB trigger (see jobs.search)
+    fingerprint = models.CharField(max_length=40, unique=True, null=True, editable=False)  # Dedup key: normalized URL + title + company (see jobs.fingerprint)
+    listing_hash = models.CharField(max_length=40, blank=True, editable=False)  # Hash of the listing as last scraped; unchanged listings are skipped (see jobs.ingest)
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='near_duplicates'
+    )  # Oldest job of the near-duplicate cluster this one was flagged into (see jobs.near_duplicates)
+
+    objects = JobManager()
 
     class Meta:
-        ordering = ['-posted_date', '-scraped_at']  # Newest jobs first
+        ordering = ['-posted_date', '-scraped_at', '-id']  # Newest jobs first (id breaks ties for cursor paging)
         indexes = [
             models.Index(fields=['title', 'company']),  # Speed up search
             models.Index(fields=['posted_date']),       # Sorting/filtering
             models.Index(fields=['status']),            # Moderation filtering
+            models.Index(fields=['updated_at']),        # Changed-since scans (analytics rollups)
+            # Keyset pagination (see jobs.pagination): all jobs, and the approved & active listings
+            models.Index(fields=['-posted_date', '-scraped_at', '-id'], name='jobs_job_newest_idx'),
+            models.Index(
+                fields=['-posted_date', '-scraped_at', '-id'], name='jobs_job_listed_newest_idx',
+                condition=models.Q(is_active=True, status='approved'),
+            ),
         ]
 
     def __str__(self):
         return f"{self.title} at {self.company.name}"  # Display format
 
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude=exclude)
+        # The fingerprint is no form field, so model forms (the admin) would only find a duplicate on insert
+        if self._state.adding and not {'external_url', 'title', 'company'} & set(exclude or ()):
+            fingerprint = self.fingerprint or job_fingerprint(self.external_url, self.title, self.company.name)
+            if Job.objects.filter(fingerprint=fingerprint).exists():
+                raise ValidationError(
+                    'A job with this external URL, title and company already exists.', code='unique'
+                )
+
+    def save(self, *args, **kwargs):
+        # The fingerprint is fixed when the job is first stored, so later edits don't break dedup
+        if self._state.adding and not self.fingerprint:
+            self.fingerprint = job_fingerprint(self.external_url, self.title, self.company.name)
+        # auto_now only reaches the row if updated_at is saved too
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ROLLUP_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        super().save(*args, **kwargs)
+
+
+# MinHash signature of a job's title + description (see jobs.near_duplicates)
+class JobSignature(models.Model):
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    minhash = models.BinaryField()  # NUM_PERM little-endian uint32 values
+
+
+# One LSH band of a job's signature; jobs sharing a bucket are near-duplicate candidates
+class JobBand(models.Model):
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='bands')
+    bucket = models.BigIntegerField(db_index=True)  # Hash of (band number, band values)
+
+
+# Skill co-occurrence counts as a CSR matrix indexed by skill pk (see jobs.cooccurrence); a single row
+class SkillCooccurrence(models.Model):
+    updated_at = models.DateTimeField(auto_now=True)
+    last_link_id = models.BigIntegerField(default=0)  # Job.skills links up to this id are counted
+    counted_link_ids = models.BinaryField(default=b'')  # int64 ids counted within LINK_WINDOW of last_link_id
+    counted_job_ids = models.BinaryField(default=b'')  # int64 pks of the approved, active jobs counted
+    jobs = models.IntegerField(default=0)  # Counted jobs with at least one skill
+    indptr = models.BinaryField(default=b'')  # int64: row i is indices[indptr[i]:indptr[i + 1]]
+    indices = models.BinaryField(default=b'')  # int32 skill pks, most shared jobs first within a row
+    counts = models.BinaryField(default=b'')  # int32 jobs listing both skills
+    totals = models.BinaryField(default=b'')  # int64 jobs per skill pk
+
 
 # Tracks when a user views a job
 class JobView(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='job_views')  # Which job was viewed
-    viewed_at = models.DateTimeField(auto_now_add=True)  # Time of view
+    viewed_at = models.DateTimeField(default=timezone.now)  # Time of view (set when recorded, rows are written in batches)
     ip_address = models.GenericIPAddressField(null=True, blank=True)  # User IP (optional)
 
     class Meta:
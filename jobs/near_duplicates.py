@@ -0,0 +1,180 @@
+"""
+Near-duplicate detection with MinHash and LSH.
+
+The same posting often arrives from several sources with a reworded title
+or a trimmed description, which the exact fingerprint (jobs.fingerprint)
+cannot catch. A job's title + description is cut into word 3-gram
+shingles and summarised by a MinHash signature of NUM_PERM 32-bit values;
+the fraction of positions two signatures agree on estimates the Jaccard
+similarity of their shingle sets.
+
+Each signature is split into BANDS bands of ROWS values and every band is
+hashed to a bucket, stored as an indexed JobBand row. Two jobs are only
+compared when they share a bucket, which for Jaccard similarity s happens
+with probability 1 - (1 - s**ROWS)**BANDS: about 0.95 at s = 0.8 and 0.06
+at s = 0.5. A lookup is one indexed bucket__in query plus the candidates'
+signatures, so its cost grows with the number of near-duplicates found,
+not with the number of jobs stored.
+
+NearDuplicateIndex.index_new_jobs() signs every job that has no signature
+yet, in pk order. A job estimated at THRESHOLD or more against an indexed
+job is flagged with duplicate_of pointing at the oldest job of that
+cluster, for moderators to merge or dismiss in the admin (see merge()).
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from .models import Job, JobBand, JobSignature
+
+NUM_PERM = 128
+BANDS, ROWS = 16, 8
+SHINGLE_SIZE = 3  # words
+THRESHOLD = 0.8   # estimated Jaccard similarity for flagging
+
+WORD_RE = re.compile(r'\w+')
+
+
+def _coefficients(label, odd=False):
+    # Derived from a hash rather than an RNG so they never change between numpy
+    # versions: changing them would invalidate every stored signature.
+    return np.array([
+        int.from_bytes(hashlib.blake2b(f'{label}{i}'.encode(), digest_size=8).digest(), 'big') | odd
+        for i in range(NUM_PERM)
+    ], dtype=np.uint64)[:, None]
+
+
+# Multiply-shift hashing: the top 32 bits of (a * x + b) mod 2**64, a odd
+A, B = _coefficients('a', odd=True), _coefficients('b')
+
+
+def shingles(text):
+    """The distinct word 3-grams of `text`, hashed to 32 bits."""
+    words = WORD_RE.findall((text or '').casefold())
+    if len(words) <= SHINGLE_SIZE:
+        grams = [' '.join(words)]
+    else:
+        grams = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64)
+
+
+def signature(title, description):
+    """MinHash signature (NUM_PERM uint32 values) of a job's title and description."""
+    x = shingles(f'{title}\n{description}')
+    return ((A * x + B) >> np.uint64(32)).min(axis=1).astype(np.uint32)  # uint64 arithmetic wraps
+
+
+def buckets(sig):
+    """One signed 64-bit bucket id per band of `sig`."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(bytes([band]) + sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).digest(),
+            'big', signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return np.count_nonzero(a == b) / NUM_PERM
+
+
+def to_bytes(sig):
+    return sig.astype('<u4').tobytes()
+
+
+def from_bytes(value):
+    return np.frombuffer(value, dtype='<u4')
+
+
+class NearDuplicateIndex:
+    """Sign new jobs, look them up in the band index and flag near-duplicates."""
+
+    def __init__(self, threshold=THRESHOLD, batch_size=500):
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.indexed = 0
+        self.flagged = 0
+
+    def index_new_jobs(self, queryset=None, progress=None):
+        """Index every job in `queryset` (default: all jobs) that has no signature yet."""
+        jobs = (Job.objects.all() if queryset is None else queryset).filter(signature__isnull=True)
+        last_pk = 0
+        while True:
+            rows = list(
+                jobs.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'title', 'description')[:self.batch_size]
+            )
+            if not rows:
+                break
+            self.add(rows)
+            last_pk = rows[-1][0]
+            if progress:
+                progress(self)
+
+    def add(self, rows):
+        """Sign and index a batch of (pk, title, description) rows; returns {pk: original pk} for flagged jobs."""
+        signed = [(pk, signature(title, description)) for pk, title, description in rows]
+        job_buckets = {pk: buckets(sig) for pk, sig in signed}
+
+        # Indexed jobs sharing a bucket with the batch, and their signatures: two queries
+        members = defaultdict(set)
+        for bucket, job_id in JobBand.objects.filter(
+            bucket__in={bucket for ids in job_buckets.values() for bucket in ids}
+        ).values_list('bucket', 'job_id'):
+            members[bucket].add(job_id)
+        known = {
+            job_id: (from_bytes(minhash), original)
+            for job_id, minhash, original in JobSignature.objects.filter(
+                job_id__in=set().union(*members.values())
+            ).values_list('job_id', 'minhash', 'job__duplicate_of_id')
+        }
+
+        flagged = {}
+        for pk, sig in signed:
+            originals = []
+            for job_id in {job_id for bucket in job_buckets[pk] for job_id in members[bucket]}:
+                other, original = known[job_id]
+                if similarity(sig, other) >= self.threshold:
+                    originals.append(original or job_id)
+            if originals:
+                flagged[pk] = min(originals)  # the oldest job of the cluster
+            # Later jobs in the same batch are compared against this one too
+            known[pk] = (sig, flagged.get(pk))
+            for bucket in job_buckets[pk]:
+                members[bucket].add(pk)
+
+        with transaction.atomic():
+            JobSignature.objects.bulk_create([JobSignature(job_id=pk, minhash=to_bytes(sig)) for pk, sig in signed])
+            JobBand.objects.bulk_create([
+                JobBand(job_id=pk, bucket=bucket) for pk, ids in job_buckets.items() for bucket in ids
+            ])
+            Job.objects.bulk_update(
+                [Job(pk=pk, duplicate_of_id=original) for pk, original in flagged.items()], ['duplicate_of']
+            )
+
+        self.indexed += len(signed)
+        self.flagged += len(flagged)
+        return flagged
+
+
+def merge(queryset):
+    """Fold flagged jobs into their originals: the original gains their skills, they are deactivated."""
+    duplicates = queryset.filter(duplicate_of__isnull=False)
+    skills = defaultdict(set)
+    for original_id, skill_id in Job.skills.through.objects.filter(job__in=duplicates).values_list(
+        'job__duplicate_of_id', 'skill_id'
+    ):
+        skills[original_id].add(skill_id)
+
+    with transaction.atomic():
+        # skills.add() and JobQuerySet.update keep the demand counters in step
+        for original in Job.objects.filter(pk__in=skills):
+            original.skills.add(*skills[original.pk])
+        return duplicates.update(is_active=False)
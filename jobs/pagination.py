@@ -0,0 +1,258 @@
+"""
+Cursor pagination for job listings.
+
+Pages are addressed by an opaque cursor rather than a page number, so no
+page runs COUNT(*). With the default ordering (newest first: -posted_date,
+-scraped_at, -id) the cursor holds the sort key of the boundary row and the
+next page is a keyset seek on the composite index, so page 10,000 costs the
+same as page 1. Any other ordering (?ordering=, search relevance) falls back
+to an offset carried inside the cursor.
+
+paginate() works on plain querysets for the HTML pages, apaginate() in
+async views; JobCursorPagination wraps paginate() for DRF.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Job
+
+KEYSET_ORDERING = ('-posted_date', '-scraped_at', '-id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(list):
+    """One page of rows plus the cursors of its neighbours (None at either end)."""
+
+    def __init__(self, rows, next_cursor=None, previous_cursor=None, has_previous=False):
+        super().__init__(rows)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.has_previous = has_previous  # previous_cursor may be None for the first page
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(position, dict):
+        raise InvalidCursor(cursor)
+    return position
+
+
+def uses_keyset(queryset):
+    """True when `queryset` is in the default job ordering (explicitly or via Meta)."""
+    ordering = tuple(queryset.query.order_by)
+    if not ordering:
+        return queryset.query.default_ordering and tuple(Job._meta.ordering) == KEYSET_ORDERING
+    return ordering == KEYSET_ORDERING
+
+
+def sort_key(job):
+    return [job.posted_date.isoformat(), job.scraped_at.isoformat(), job.pk]
+
+
+def parse_sort_key(values):
+    try:
+        return [
+            Job._meta.get_field(name.lstrip('-')).to_python(value)
+            for name, value in zip(KEYSET_ORDERING, values, strict=True)
+        ]
+    except Exception:
+        raise InvalidCursor(values)
+
+
+def seek(values, forward=True):
+    """Rows strictly after (or before) the sort key `values` in KEYSET_ORDERING.
+
+    Expands (a, b, c) < (x, y, z) into a < x OR (a = x AND b < y) OR ...;
+    the redundant bound on the leading column lets the index range-scan.
+    """
+    condition = Q()
+    equal = Q()
+    for ordering, value in zip(KEYSET_ORDERING, values):
+        name = ordering.lstrip('-')
+        lookup = 'lt' if ordering.startswith('-') == forward else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    name = KEYSET_ORDERING[0].lstrip('-')
+    bound = 'lte' if KEYSET_ORDERING[0].startswith('-') == forward else 'gte'
+    return Q(**{f'{name}__{bound}': values[0]}) & condition
+
+
+def reverse_ordering(ordering):
+    return [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+
+
+def paginate(queryset, cursor=None, page_size=20):
+    """Return the Page of `queryset` that `cursor` points at (the first page if None)."""
+    rows, build = _page_query(queryset, cursor, page_size)
+    return build(list(rows))
+
+
+async def apaginate(queryset, cursor=None, page_size=20):
+    """paginate() for async views: the page is read with the async ORM."""
+    rows, build = _page_query(queryset, cursor, page_size)
+    return build([row async for row in rows])
+
+
+def _page_query(queryset, cursor, page_size):
+    """(queryset of the rows to read, function turning them into the Page) for `cursor`."""
+    position = decode_cursor(cursor) if cursor else {}
+
+    if uses_keyset(queryset):
+        if 'o' in position:
+            raise InvalidCursor(cursor)
+        return _keyset_page(queryset, position, page_size)
+    if 'k' in position:
+        raise InvalidCursor(cursor)
+    return _offset_page(queryset, position, page_size)
+
+
+def _keyset_page(queryset, position, page_size):
+    backwards = bool(position.get('r'))
+    ordering = reverse_ordering(KEYSET_ORDERING) if backwards else list(KEYSET_ORDERING)
+    queryset = queryset.order_by(*ordering)
+    if 'k' in position:
+        queryset = queryset.filter(seek(parse_sort_key(position['k']), forward=not backwards))
+
+    def build(rows):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return Page(rows)
+
+        if backwards:
+            next_cursor = encode_cursor({'k': sort_key(rows[-1])})
+            has_previous = has_more
+        else:
+            next_cursor = encode_cursor({'k': sort_key(rows[-1])}) if has_more else None
+            has_previous = 'k' in position
+        previous_cursor = encode_cursor({'k': sort_key(rows[0]), 'r': 1}) if has_previous else None
+        return Page(rows, next_cursor, previous_cursor, has_previous)
+
+    return queryset[:page_size + 1], build
+
+
+def _offset_page(queryset, position, page_size):
+    offset = position.get('o', 0)
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursor(position)
+
+    # Offsets only line up across requests if the order is total
+    ordering = list(queryset.query.order_by)
+    if not {'id', '-id', 'pk', '-pk'}.intersection(ordering):
+        queryset = queryset.order_by(*ordering, '-id')
+
+    def build(rows):
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        next_cursor = encode_cursor({'o': offset + page_size}) if has_more else None
+        previous = max(offset - page_size, 0)
+        previous_cursor = encode_cursor({'o': previous}) if offset and previous else None
+        return Page(rows, next_cursor, previous_cursor, has_previous=offset > 0)
+
+    return queryset[offset:offset + page_size + 1], build
+
+
+class JobCursorPagination(BasePagination):
+    """DRF pagination over paginate(): {next, previous, results}, plus count on ?count=1."""
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        try:
+            self.page = paginate(
+                queryset,
+                request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request),
+            )
+        except InvalidCursor:
+            raise NotFound('Invalid cursor')
+
+        # Counting is opt-in: it is the one query whose cost grows with the table
+        wants_count = request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+        self.count = queryset.count() if wants_count else None
+        return list(self.page)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_link(self, cursor):
+        url = remove_query_param(self.base_url, self.count_query_param)
+        if cursor is None:
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        return self.get_link(self.page.next_cursor) if self.page.has_next else None
+
+    def get_previous_link(self):
+        return self.get_link(self.page.previous_cursor) if self.page.has_previous else None
+
+    def get_paginated_response(self, data):
+        fields = [('next', self.get_next_link()), ('previous', self.get_previous_link())]
+        if self.count is not None:
+            fields.insert(0, ('count', self.count))
+        return Response(OrderedDict([*fields, ('results', data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param, 'required': False, 'in': 'query',
+                'description': 'Opaque cursor from the next/previous link', 'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param, 'required': False, 'in': 'query',
+                'description': f'Results per page (max {self.max_page_size})', 'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param, 'required': False, 'in': 'query',
+                'description': 'Include the total count (costs a COUNT query)', 'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,171 @@
+"""
+Batch re-tagging: re-run skill extraction (see jobs.skills) over stored jobs.
+
+Jobs are streamed in primary-key order with iterator(chunk_size=...) and
+handled a chunk at a time: the chunk's existing job/skill rows are read
+with one query, diffed against what the extractor finds, and only the
+difference is written (one bulk insert, one bulk delete, counter deltas),
+in one transaction per chunk.
+
+Extraction is pure Python, so it can be spread over a process pool: the
+workers only receive (id, title, tags, description) tuples and skill
+names, never touch the database, and results are applied in order so the
+checkpoint (the last applied job id) is always safe to resume from.
+"""
+
+import json
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, counters, similar
+from .models import Job, Skill
+from .skills import SkillExtractor
+
+FIELDS = ('pk', 'title', 'tags', 'description', 'status', 'is_active')
+
+_worker_extractor = None
+
+
+def _init_worker(names):
+    global _worker_extractor
+    _worker_extractor = SkillExtractor(names)
+
+
+def _extract_chunk(rows):
+    return [_worker_extractor.extract(title, tags, description) for _, title, tags, description, _, _ in rows]
+
+
+class Checkpoint:
+    """Last fully applied job id, stored as JSON next to the options it belongs to."""
+
+    def __init__(self, path, scope):
+        self.path = path
+        self.scope = scope
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        with open(self.path) as f:
+            data = json.load(f)
+        if data.get('scope') != self.scope:
+            raise ValueError(f'Checkpoint {self.path} belongs to a different run: {data.get("scope")}')
+        return data['last_id']
+
+    def save(self, last_id):
+        if not self.path:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'scope': self.scope, 'last_id': last_id}, f)
+        os.replace(tmp, self.path)  # atomic, so an interrupted run never leaves a torn file
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Retagger:
+    """Diff and apply extracted skills for a queryset of jobs, chunk by chunk."""
+
+    def __init__(self, skills=None, add_only=False, chunk_size=2000, workers=0, dry_run=False):
+        # skills: limit the run to these Skill rows (default: every skill)
+        skills = list(skills if skills is not None else Skill.objects.all())
+        self.skill_ids = {skill.name: skill.pk for skill in skills}
+        self.extractor = SkillExtractor(self.skill_ids)
+        self.add_only = add_only
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.checked = self.added = self.removed = 0
+
+    def run(self, queryset, checkpoint=None, progress=None):
+        start_after = checkpoint.load() if checkpoint else 0
+        rows = (
+            queryset.filter(pk__gt=start_after).order_by('pk')
+            .values_list(*FIELDS).iterator(chunk_size=self.chunk_size)
+        )
+        for chunk, found in self._extracted(self._chunks(rows)):
+            self.apply(chunk, found)
+            if checkpoint and not self.dry_run:
+                checkpoint.save(chunk[-1][0])
+            if progress:
+                progress(self)
+        if checkpoint and not self.dry_run:
+            checkpoint.clear()  # finished: the next run starts over
+
+    def _chunks(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _extracted(self, chunks):
+        """Yield (chunk, skill names per row) in order, extracting in worker processes if asked."""
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield chunk, [self.extractor.extract(title, tags, text) for _, title, tags, text, _, _ in chunk]
+            return
+
+        # Keep a bounded number of chunks in flight so memory stays flat
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(list(self.skill_ids),)) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append((chunk, pool.submit(_extract_chunk, chunk)))
+                if len(in_flight) >= self.workers * 2:
+                    chunk, future = in_flight.popleft()
+                    yield chunk, future.result()
+            while in_flight:
+                chunk, future = in_flight.popleft()
+                yield chunk, future.result()
+
+    def apply(self, chunk, found):
+        """Write the difference between stored and extracted skills for one chunk."""
+        Through = Job.skills.through
+        job_ids = [row[0] for row in chunk]
+        counted = {row[0] for row in chunk if row[5] and row[4] == 'approved'}
+
+        existing = defaultdict(dict)  # job_id -> {skill_id: through row id}
+        for pk, job_id, skill_id in Through.objects.filter(
+            job_id__in=job_ids, skill_id__in=self.skill_ids.values()
+        ).values_list('pk', 'job_id', 'skill_id'):
+            existing[job_id][skill_id] = pk
+
+        inserts, deletes, deltas, changed = [], [], defaultdict(int), []
+        for job_id, names in zip(job_ids, found):
+            wanted = {self.skill_ids[name] for name in names}
+            have = existing.get(job_id, {})
+            sign = 1 if job_id in counted else 0
+            before = len(inserts) + len(deletes)
+            for skill_id in wanted.difference(have):
+                inserts.append(Through(job_id=job_id, skill_id=skill_id))
+                deltas[skill_id] += sign
+            if not self.add_only:
+                for skill_id in set(have).difference(wanted):
+                    deletes.append(have[skill_id])
+                    deltas[skill_id] -= sign
+            if len(inserts) + len(deletes) > before:
+                changed.append(job_id)
+
+        self.checked += len(chunk)
+        self.added += len(inserts)
+        self.removed += len(deletes)
+        if self.dry_run or not (inserts or deletes):
+            return
+
+        with transaction.atomic():
+            Through.objects.bulk_create(inserts, ignore_conflicts=True)
+            Through.objects.filter(pk__in=deletes).delete()
+            # Retagged jobs count as modified (the analytics rollups pick them up by updated_at)
+            Job.objects.filter(pk__in=changed).update(updated_at=timezone.now())
+            # Bulk writes skip the m2m signal handlers, so adjust the counters here
+            counters.apply_deltas(Skill, deltas)
+            caching.invalidate_on_commit()
+            similar.invalidate_on_commit(changed)
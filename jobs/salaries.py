@@ -0,0 +1,150 @@
+"""
+Salary distributions: percentiles, histograms and per-group breakdowns.
+
+Jobs are read in primary-key order, CHUNK_SIZE at a time, with
+values_list (salary range, location, experience level) plus one range
+query for the chunk's skills, and each chunk is handled as a pandas
+frame. A job's salary is the midpoint of its range, or whichever end is
+given. Figures are only reported for one currency at a time.
+
+Nothing per job is kept between chunks: every group (all jobs, each
+experience level, skill and location) accumulates a fixed-width histogram
+(BIN_WIDTH-wide bins up to MAX_SALARY, plus one overflow bin) with
+np.bincount, and a running sum for the mean. Percentiles are read off the
+cumulative histograms at the end, exact to within half a bin. Memory is
+bounded by groups x bins, however many jobs there are.
+"""
+
+import numpy as np
+import pandas as pd
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+
+from . import counters
+from .models import Job, Location, Skill
+
+CHUNK_SIZE = 20_000
+BIN_WIDTH = 1_000
+MAX_SALARY = 500_000
+NUM_BINS = MAX_SALARY // BIN_WIDTH + 1  # the last bin holds MAX_SALARY and above
+PERCENTILES = (10, 50, 90)
+DISPLAY_BIN_WIDTH = 10_000  # histogram returned to clients
+
+
+class GroupHistograms:
+    """Salary histograms and sums per group key; keys are added as they show up."""
+
+    def __init__(self):
+        self.rows = {}  # group key -> row in counts/sums
+        self.counts = np.zeros((0, NUM_BINS), dtype=np.int64)
+        self.sums = np.zeros(0)
+
+    def add(self, keys, salaries):
+        codes, uniques = pd.factorize(keys)
+        new = [key for key in uniques if key not in self.rows]
+        if new:
+            self.rows.update(zip(new, range(len(self.rows), len(self.rows) + len(new))))
+            self.counts = np.vstack([self.counts, np.zeros((len(new), NUM_BINS), dtype=np.int64)])
+            self.sums = np.concatenate([self.sums, np.zeros(len(new))])
+
+        rows = np.array([self.rows[key] for key in uniques], dtype=np.int64)[codes]
+        bins = np.minimum(salaries // BIN_WIDTH, NUM_BINS - 1).astype(np.int64)
+        groups = len(self.rows)
+        self.counts += np.bincount(rows * NUM_BINS + bins, minlength=groups * NUM_BINS).reshape(groups, NUM_BINS)
+        self.sums += np.bincount(rows, weights=salaries, minlength=groups)
+
+    def summary(self):
+        """{key: {'jobs', 'mean', 'p10', 'p50', 'p90'}} for every group."""
+        if not self.rows:
+            return {}
+        jobs = self.counts.sum(axis=1)
+        cumulative = self.counts.cumsum(axis=1)
+        stats = {'jobs': jobs, 'mean': self.sums / jobs}
+        for q in PERCENTILES:
+            target = jobs * q / 100
+            # First bin whose cumulative count reaches the target, then interpolate inside it
+            index = (cumulative < target[:, None]).sum(axis=1)
+            in_bin = self.counts[np.arange(len(jobs)), index]
+            before = cumulative[np.arange(len(jobs)), index] - in_bin
+            stats[f'p{q}'] = (index + (target - before) / in_bin) * BIN_WIDTH
+        return {
+            key: {name: round(float(values[row])) if name != 'jobs' else int(values[row])
+                  for name, values in stats.items()}
+            for key, row in self.rows.items()
+        }
+
+
+def salary_stats(jobs=None, currency='USD', start=None, end=None, top=10, chunk_size=CHUNK_SIZE):
+    """Salary distribution of `jobs` (default: approved, active jobs) in `currency`, posted start..end."""
+    jobs = Job.objects.filter(counters.COUNTED) if jobs is None else jobs
+    jobs = jobs.filter(
+        Q(salary_min__isnull=False) | Q(salary_max__isnull=False), salary_currency=currency
+    )
+    if start:
+        jobs = jobs.filter(posted_date__gte=start)
+    if end:
+        jobs = jobs.filter(posted_date__lte=end)
+    rows = jobs.annotate(
+        low=Cast('salary_min', FloatField()), high=Cast('salary_max', FloatField())
+    ).order_by('pk').values_list('pk', 'low', 'high', 'location_id', 'experience_level')
+    links = Job.skills.through.objects.order_by()
+
+    overall, experience, skills, locations = (GroupHistograms() for _ in range(4))
+    last_pk = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        first_pk, last_pk = chunk[0][0], chunk[-1][0]
+
+        frame = pd.DataFrame.from_records(chunk, columns=['job_id', 'low', 'high', 'location_id', 'experience'])
+        frame['salary'] = frame[['low', 'high']].astype(float).mean(axis=1)  # midpoint, or the one end given
+        frame = frame[frame['salary'] > 0]
+        salary = frame['salary'].to_numpy()
+
+        overall.add(np.zeros(len(frame), dtype=np.int64), salary)
+        experience.add(frame['experience'].fillna('').to_numpy(), salary)
+        located = frame[frame['location_id'].notna()]
+        locations.add(located['location_id'].astype(np.int64).to_numpy(), located['salary'].to_numpy())
+
+        # The chunk's skills: one query over its pk range, joined to the jobs that made the cut
+        tagged = pd.DataFrame.from_records(
+            list(links.filter(job_id__gte=first_pk, job_id__lte=last_pk).values_list('job_id', 'skill_id')),
+            columns=['job_id', 'skill_id'],
+        ).merge(frame[['job_id', 'salary']], on='job_id')
+        skills.add(tagged['skill_id'].to_numpy(), tagged['salary'].to_numpy())
+
+    return {
+        'currency': currency,
+        'start': start,
+        'end': end,
+        'bin_width': BIN_WIDTH,
+        'overall': overall.summary().get(0),
+        'histogram': display_histogram(overall.counts[0] if overall.rows else np.zeros(NUM_BINS, dtype=np.int64)),
+        'by_experience': sorted(
+            ({'experience_level': level, **stats} for level, stats in experience.summary().items()),
+            key=lambda row: row['p50'],
+        ),
+        'by_skill': _top_groups(skills.summary(), Skill, 'skill', top),
+        'by_location': _top_groups(locations.summary(), Location, 'location', top),
+    }
+
+
+def display_histogram(counts):
+    """Re-bin a fine histogram to DISPLAY_BIN_WIDTH, trimmed to the non-empty range."""
+    factor = DISPLAY_BIN_WIDTH // BIN_WIDTH
+    coarse = np.add.reduceat(counts, np.arange(0, len(counts), factor))
+    filled = np.flatnonzero(coarse)
+    if not len(filled):
+        return []
+    return [
+        {'from': int(i * DISPLAY_BIN_WIDTH), 'to': int((i + 1) * DISPLAY_BIN_WIDTH), 'jobs': int(coarse[i])}
+        for i in range(filled[0], filled[-1] + 1)
+    ]
+
+
+def _top_groups(summary, model, name, limit):
+    """The `limit` groups with the most jobs, labelled with their object's name."""
+    keys = [int(key) for key in sorted(summary, key=lambda key: (-summary[key]['jobs'], key))[:limit]]
+    objects = model.objects.in_bulk(keys)
+    return [{name: str(objects[key]), 'id': key, **summary[key]} for key in keys if key in objects]
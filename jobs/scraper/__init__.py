@@ -0,0 +1,12 @@
+from .async_fetch import AsyncFetcher
+from .base import SCRAPERS, Scraper, ScrapeResult, ensure_sources, get_scraper, register
+from .fetch import Fetcher, FetchResult, HostRateLimiter
+from .scheduler import arun_sources, ascrape_source, due_sources, is_due, run_due, run_sources, scrape_source
+from .weworkremotely import WeWorkRemotelyScraper  # registers the built-in plugin
+
+__all__ = [
+    'AsyncFetcher', 'Fetcher', 'FetchResult', 'HostRateLimiter',
+    'SCRAPERS', 'Scraper', 'ScrapeResult', 'ensure_sources', 'get_scraper', 'register',
+    'arun_sources', 'ascrape_source', 'due_sources', 'is_due', 'run_due', 'run_sources', 'scrape_source',
+    'WeWorkRemotelyScraper',
+]
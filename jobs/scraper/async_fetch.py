@@ -0,0 +1,167 @@
+"""
+asyncio counterpart of the Fetcher, for Scraper.arun().
+
+An AsyncFetcher makes its requests from the event loop through one pooled
+httpx.AsyncClient: a page in flight is a coroutine waiting on a socket,
+not a thread, so one process can keep many sources' requests going at
+once. Like the requests session it stands in for, the client follows
+redirects and reads proxies and CA bundles from the environment
+(HTTP(S)_PROXY, SSL_CERT_FILE, and REQUESTS_CA_BUNDLE too).
+
+The rest matches Fetcher: at most `max_workers` requests in flight, the
+same per-host rate limit, retries with backoff on 429, 5xx and
+connection errors, conditional fetches against a ResponseCache, and
+FetchResults whose `response` has the status_code, headers and content
+the scrapers read. Bodies over `max_body` bytes are refused.
+
+    async with AsyncFetcher(max_workers=8, cache=responses) as fetcher:
+        result = await fetcher.get(url, conditional=True)
+        results = await fetcher.fetch_many(urls)
+"""
+
+import asyncio
+import os
+import ssl
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from asgiref.sync import sync_to_async
+
+from .fetch import DEFAULT_HEADERS, FetchResult
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_BODY = 20 * 1024 * 1024  # bytes; listing pages are a few hundred KB
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class Response:
+    """The parts of a requests.Response the scrapers and the ResponseCache read."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers  # case-insensitive
+        self.content = content
+
+    def __repr__(self):
+        return f'<Response [{self.status_code}]>'
+
+
+class AsyncHostRateLimiter:
+    """HostRateLimiter for coroutines: waiting for a slot sleeps without blocking the loop."""
+
+    def __init__(self, rate=5.0):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}  # host -> monotonic time of its next free slot
+
+    async def wait(self, url):
+        if not self.interval:
+            return
+        # No lock needed: nothing between reading and reserving the slot awaits
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def ca_bundle():
+    """TLS verification as requests does it: REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE if set, else the defaults."""
+    bundle = os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE')
+    return ssl.create_default_context(cafile=bundle) if bundle else True
+
+
+class AsyncFetcher:
+    """
+    Concurrent page fetcher on the running event loop.
+
+    Use as an async context manager so the pooled connections get closed.
+    """
+
+    def __init__(self, max_workers=8, rate=5.0, timeout=20, retries=2, headers=None, cache=None, max_body=MAX_BODY):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.max_body = max_body
+        self.rate_limiter = AsyncHostRateLimiter(rate)
+        self.cache = cache
+        # The semaphore queues requests beyond max_workers, so the pool never runs out
+        self._slots = asyncio.Semaphore(max_workers)
+        self.client = httpx.AsyncClient(
+            headers={**DEFAULT_HEADERS, **(headers or {})},
+            timeout=timeout,
+            follow_redirects=True,
+            verify=ca_bundle(),
+            limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers),
+        )
+
+    async def get(self, url, conditional=False):
+        """Fetch one URL, honoring the per-host rate limit; revalidated against the cache if `conditional`."""
+        conditional = conditional and self.cache is not None
+        if conditional:
+            await self._load([url])
+        return await self._get(url, conditional)
+
+    async def fetch_many(self, urls, conditional=False):
+        """Fetch all URLs concurrently; returns their results in input order."""
+        urls = list(urls)
+        conditional = conditional and self.cache is not None
+        if conditional:
+            await self._load(urls)
+        return await asyncio.gather(*(self._get(url, conditional) for url in urls))
+
+    async def _load(self, urls):
+        # The cache reads CachedResponse rows: the ORM is sync-only, so off the loop
+        missing = [url for url in urls if url not in self.cache.loaded]
+        if missing:
+            await sync_to_async(self.cache.load)(missing)
+
+    async def _get(self, url, conditional):
+        await self.rate_limiter.wait(url)
+        headers = self.cache.request_headers(url) if conditional else None
+        try:
+            async with self._slots:
+                response = await self.request(url, headers)
+        except (httpx.HTTPError, ResponseTooLarge) as e:
+            return FetchResult(url, error=e)
+        unchanged = conditional and self.cache.update(url, response)
+        return FetchResult(url, response=response, unchanged=unchanged)
+
+    async def request(self, url, headers=None):
+        """GET `url`, retrying 429/5xx and connection errors with backoff; returns a Response."""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._read(url, headers)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def _read(self, url, headers):
+        async with self.client.stream('GET', url, headers=headers) as response:
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > self.max_body:
+                raise ResponseTooLarge(f'{url}: {length} bytes')
+            chunks, size = [], 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > self.max_body:
+                    raise ResponseTooLarge(f'{url}: over {self.max_body} bytes')
+                chunks.append(chunk)
+        return Response(str(response.url), response.status_code, response.headers, b''.join(chunks))
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
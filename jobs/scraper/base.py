@@ -0,0 +1,345 @@
+"""
+Scraper plugins and their registry.
+
+A scraper fills one JobSource, matched by name. Subclasses implement the
+site-specific steps: pages() lists the index pages, parse_page() pulls
+the raw listings out of one, normalize() turns each into a listing dict
+in the JobIngestor format, and enrich() optionally adds to the new or
+changed ones. Scraper.run() chains them into a pipeline (see
+pipeline.py), so fetching, parsing and writing overlap:
+
+    fetch -> parse -> normalize -> enrich -> write
+
+Fetches go through a Fetcher capped at the scraper's max_concurrency.
+The write stage runs on the calling thread, followed by near-duplicate
+flagging, the related-skills matrix and the source's last_scraped. A
+page a stage failed on keeps no validators, so the next scheduled run
+fetches and parses it again; the source itself is marked scraped either
+way, so a page that keeps failing can't keep it due.
+
+Re-scrapes are incremental: pages fetched with conditional=True are
+skipped when they have not changed (see cache.py), and listings whose
+data matches what the job was stored from never reach the database
+(JobIngestor.exclude_unchanged). full=True ignores both, e.g. after a
+parser change.
+
+arun() is the same scrape on the event loop, with an AsyncFetcher: see
+its docstring.
+
+Plugins register with the @register decorator (see weworkremotely.py for
+a full one) and are looked up by their source with get_scraper().
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .. import cooccurrence
+from ..ingest import JobIngestor
+from ..models import Job, JobSource
+from ..near_duplicates import NearDuplicateIndex
+from .async_fetch import AsyncFetcher
+from .cache import ResponseCache
+from .fetch import Fetcher
+from .pipeline import Pipeline, Stage
+
+logger = logging.getLogger(__name__)
+
+# Sources scraped in parallel index their new jobs one at a time, so each
+# sees the other's jobs as near-duplicate candidates
+_index_lock = threading.Lock()
+
+
+class ScrapeError(Exception):
+    """A page could not be scraped."""
+
+
+class ScrapeResult:
+    """What one scraper run did, or the error that stopped it."""
+
+    def __init__(self, source, created=0, updated=0, skipped=0, flagged=0, error=None, seconds=0.0, stages=(),
+                 failed=0):
+        self.source = source
+        self.created = created
+        self.updated = updated
+        self.skipped = skipped
+        self.flagged = flagged
+        self.error = error
+        self.seconds = seconds
+        self.stages = stages  # pipeline.StageMetrics per stage
+        self.failed = failed  # pages dropped by a stage error, retried next run
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return f"<ScrapeResult {self.source} +{self.created} {self.error or 'ok'}>"
+
+
+class Scraper:
+    """
+    One job site. Subclasses set `name` (the JobSource name) and
+    `base_url`, and implement the steps of the pipeline:
+
+        @register
+        class ExampleScraper(Scraper):
+            name = 'Example'
+            base_url = 'https://jobs.example.com'
+
+            def pages(self):
+                return [f'{self.base_url}/jobs?page={n}' for n in range(1, 6)]
+
+            def parse_page(self, result):
+                return self.parser.parse(result.response.content)
+
+            def normalize(self, fields):
+                return {'title': fields['title'], ...}
+    """
+
+    name = None
+    base_url = None
+    scraping_frequency = 24  # hours, for the JobSource created by ensure_sources()
+    max_concurrency = 4  # simultaneous requests to this source
+    rate = 5.0  # max requests per second to one host
+    parse_workers = 2
+    normalize_workers = 2
+    enrich_workers = 2
+
+    def __init__(self, source, base_url=None, max_concurrency=None, rate=None, batch_size=500, full=False,
+                 log=None, **options):
+        self.source = source
+        self.base_url = (base_url or source.base_url or self.base_url).rstrip('/')
+        self.max_concurrency = max_concurrency or self.max_concurrency
+        self.rate = self.rate if rate is None else rate
+        self.batch_size = batch_size
+        self.full = full
+        self.log = log or logger.info
+        self.options = options
+
+    # ----------------------- PLUGIN STEPS -----------------------
+    def prepare(self):
+        """Set up before the pipeline starts, on the calling thread (the steps below must not query the DB)."""
+
+    def pages(self):
+        """URLs of the index pages to fetch."""
+        raise NotImplementedError
+
+    def parse_page(self, result):
+        """The raw listings of an index page (a FetchResult), in any form normalize() takes."""
+        raise NotImplementedError
+
+    def normalize(self, raw):
+        """A listing dict (see JobIngestor) from one raw listing, or None to leave it out."""
+        raise NotImplementedError
+
+    def enrich(self, fetcher, listings):
+        """Add to the new or changed `listings` of a page (e.g. from their own pages); returns them."""
+        return listings
+
+    # ----------------------- PIPELINE STAGES -----------------------
+    def fetch_page(self, fetcher, url):
+        return self.check_page(url, fetcher.get(url, conditional=True))
+
+    def check_page(self, url, result):
+        """The FetchResult of an index page to parse, None if unchanged; raises ScrapeError if it failed."""
+        self.log(f"Fetched: {url}")
+        if result.unchanged:
+            self.log("Unchanged since the last run\n")
+            return None
+        if not result.ok:
+            raise ScrapeError(f"Failed: {url} {result.status_code or result.error}")
+        return result
+
+    def normalize_page(self, ingestor, raw_listings):
+        listings = []
+        for raw in raw_listings:
+            try:
+                listing = self.normalize(raw)
+            except Exception as e:
+                self.log(f"Error: {e}")
+                continue
+            if listing is None:
+                continue
+            if not listing.get('external_url'):
+                self.log("Skipped job: No external URL\n")
+                ingestor.skip()
+                continue
+            listings.append(listing)
+        return self.changed(ingestor, listings) or None
+
+    def changed(self, ingestor, listings):
+        """The new or changed `listings` (all of them on a full run)."""
+        return listings if self.full else ingestor.exclude_unchanged(listings)
+
+    def run(self):
+        """Scrape the source and store what it found; returns a ScrapeResult."""
+        start = time.perf_counter()
+        self.prepare()
+        urls = list(self.pages())
+        ingestor = JobIngestor(source=self.source, batch_size=self.batch_size)
+        responses = ResponseCache()
+        if not self.full:
+            # Everything the worker threads look up, read here on the DB connection of this thread
+            ingestor.load_listing_hashes()
+            responses.load(urls)
+
+        # Items travel as (page url, value), so a stage error is traced back to its page
+        failed = set()
+        with Fetcher(max_workers=self.max_concurrency, rate=self.rate, cache=None if self.full else responses) as fetcher:
+            pipeline = Pipeline([
+                Stage('fetch', self.page_step(failed, lambda url: self.fetch_page(fetcher, url)),
+                      workers=self.max_concurrency),
+                Stage('parse', self.page_step(failed, self.parse_page), workers=self.parse_workers),
+                Stage('normalize', self.page_step(failed, lambda raw: self.normalize_page(ingestor, raw)),
+                      workers=self.normalize_workers),
+                Stage('enrich', self.page_step(failed, lambda listings: self.enrich(fetcher, listings)),
+                      workers=self.enrich_workers),
+                Stage('write', self.page_step(failed, ingestor.extend)),  # duplicates are dropped by the ingestor
+            ], log=self.log)
+            pipeline.run((url, url) for url in urls)
+        return self.finish(ingestor, responses, start, stages=pipeline.metrics, failed=failed)
+
+    @staticmethod
+    def page_step(failed, func):
+        """A stage function over (url, value) items that adds the url to `failed` when `func` raises."""
+        def step(item):
+            url, value = item
+            try:
+                value = func(value)
+            except Exception:
+                failed.add(url)
+                raise
+            return None if value is None else (url, value)
+        return step
+
+    def finish(self, ingestor, responses, start, stages=(), failed=()):
+        """Store what is left once every page is through, then index the new jobs; returns the ScrapeResult.
+
+        Pages in `failed` lost their listings to a stage error: their
+        validators are not saved, so the next run parses them again. The
+        source is marked scraped all the same: that run comes when it is
+        next due, not on every cycle until the page works.
+        """
+        ingestor.flush()
+        responses.discard(failed)
+        responses.save()  # only now: the pages' listings are stored
+
+        duplicates = NearDuplicateIndex()
+        if ingestor.created or ingestor.updated:  # a steady-state run stops here
+            with _index_lock:
+                # Check the new jobs against every indexed job (the same posting from other sources)
+                duplicates.index_new_jobs(Job.objects.filter(pk__in=[job.pk for job in ingestor.created]))
+
+                # Count the new job/skill links into the related-skills matrix
+                cooccurrence.refresh()
+
+        if failed:
+            self.log(f"{len(failed)} page(s) failed, to be retried on the next run: {', '.join(sorted(failed))}")
+        self.source.last_scraped = timezone.now()
+        JobSource.objects.filter(pk=self.source.pk).update(last_scraped=self.source.last_scraped)
+
+        return ScrapeResult(
+            self.source.name,
+            created=len(ingestor.created),
+            updated=len(ingestor.updated),
+            skipped=ingestor.skipped,
+            flagged=duplicates.flagged,
+            seconds=time.perf_counter() - start,
+            stages=stages,
+            failed=len(failed),
+        )
+
+    # ----------------------- ASYNC -----------------------
+    async def aenrich(self, fetcher, listings):
+        """enrich() for arun(), given an AsyncFetcher; plugins that override enrich() override this too."""
+        return listings
+
+    async def afetch_page(self, fetcher, url):
+        return self.check_page(url, await fetcher.get(url, conditional=True))
+
+    async def arun(self):
+        """run() on the event loop: requests are coroutines on an AsyncFetcher instead of threads.
+
+        Parsing and normalizing run on the default executor, the database
+        work through sync_to_async, so a process can scrape several sources
+        at once (see scheduler.arun_sources) with no thread per request.
+        Pages a step fails on are retried next run, as in run().
+        """
+        if type(self).enrich is not Scraper.enrich and type(self).aenrich is Scraper.aenrich:
+            raise NotImplementedError(f'{type(self).__name__} has no aenrich()')
+        start = time.perf_counter()
+        await sync_to_async(self.prepare)()
+        urls = list(self.pages())
+        ingestor = JobIngestor(source=self.source, batch_size=self.batch_size)
+        responses = ResponseCache()
+        if not self.full:
+            await sync_to_async(ingestor.load_listing_hashes)()
+            await sync_to_async(responses.load)(urls)
+
+        failed = set()  # as in run(): retried next time
+
+        async def scrape_pages(pending, fetcher):
+            for url in pending:
+                try:
+                    result = await self.afetch_page(fetcher, url)
+                    if result is None:
+                        continue
+                    listings = await asyncio.to_thread(
+                        lambda: self.normalize_page(ingestor, self.parse_page(result))
+                    )
+                    if not listings:
+                        continue
+                    listings = await self.aenrich(fetcher, listings)
+                except Exception as e:
+                    failed.add(url)
+                    self.log(f'{url}: {e!r}')  # like a pipeline stage: the page is dropped
+                    continue
+                await sync_to_async(ingestor.extend)(listings)
+
+
+        # max_concurrency pages in flight at a time, like the pipeline's fetch stage
+        pending = iter(urls)
+        async with AsyncFetcher(max_workers=self.max_concurrency, rate=self.rate,
+                                cache=None if self.full else responses) as fetcher:
+            workers = [asyncio.ensure_future(scrape_pages(pending, fetcher)) for _ in range(self.max_concurrency)]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                # A failed write stops the run, as in the pipeline: nothing is saved
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                raise
+        return await sync_to_async(self.finish)(ingestor, responses, start, failed=failed)
+
+
+# ----------------------- REGISTRY -----------------------
+SCRAPERS = {}  # JobSource name -> Scraper subclass
+
+
+def register(cls):
+    """Class decorator adding a Scraper to the registry under its source name."""
+    if not cls.name:
+        raise ValueError(f'{cls.__name__} has no source name')
+    SCRAPERS[cls.name] = cls
+    return cls
+
+
+def get_scraper(source, **kwargs):
+    """The registered scraper for `source` (a JobSource), or None if no plugin handles it."""
+    cls = SCRAPERS.get(source.name)
+    return cls(source, **kwargs) if cls else None
+
+
+def ensure_sources():
+    """Create the JobSource of every registered scraper that has none yet."""
+    for name, cls in SCRAPERS.items():
+        JobSource.objects.get_or_create(
+            name=name,
+            defaults={'base_url': cls.base_url, 'scraping_frequency': cls.scraping_frequency},
+        )
@@ -0,0 +1,91 @@
+"""
+HTTP response cache for conditional re-scraping.
+
+For every page fetched with conditional=True the Fetcher sends back the
+ETag / Last-Modified validators from the previous fetch, and hashes the
+body of a full response. A 304, or a 200 whose body hashes the same as
+last time, comes back as an unchanged FetchResult, which scrapers skip
+without parsing.
+
+Entries are CachedResponse rows, read for a whole batch of URLs in one
+query by the calling thread (load them up front for fetches made from
+other threads: those only touch memory) and
+written back by save() once the scrape has stored what the pages held,
+so a failed run fetches the same pages in full again next time. So does
+a page whose listings a later stage failed on: its entry is discarded.
+"""
+
+import hashlib
+import threading
+
+from ..models import CachedResponse
+
+
+def body_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class ResponseCache:
+    """CachedResponse entries for the pages of one scrape, saved together at the end."""
+
+    def __init__(self):
+        self.entries = {}  # url -> CachedResponse (unsaved ones included)
+        self.changed = {}  # url -> entry to write on save()
+        self.loaded = set()  # urls looked up, with or without an entry
+        self._lock = threading.Lock()
+
+    def load(self, urls):
+        """Read the entries of `urls` not loaded yet; one query."""
+        missing = [url for url in urls if url not in self.loaded]
+        if missing:
+            self.entries.update(
+                (entry.url, entry) for entry in CachedResponse.objects.filter(url__in=missing)
+            )
+            self.loaded.update(missing)
+
+    def request_headers(self, url):
+        """If-None-Match / If-Modified-Since for the copy we have of `url`."""
+        entry = self.entries.get(url)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def update(self, url, response):
+        """Record a conditional response; returns True if the page is unchanged since last time."""
+        entry = self.entries.get(url)
+        if response.status_code == 304:
+            return entry is not None
+        if response.status_code != 200:
+            return False
+
+        digest = body_hash(response.content)
+        unchanged = entry is not None and entry.body_hash == digest
+        entry = entry or CachedResponse(url=url)
+        entry.etag = response.headers.get('ETag', '')[:500]
+        entry.last_modified = response.headers.get('Last-Modified', '')[:100]
+        entry.body_hash = digest
+        with self._lock:
+            self.entries[url] = entry
+            self.changed[url] = entry
+        return unchanged
+
+    def discard(self, urls):
+        """Drop the new validators of `urls` (pages whose listings were not stored), so they are fetched in full again."""
+        with self._lock:
+            for url in urls:
+                self.changed.pop(url, None)
+
+    def save(self):
+        """Write the new and changed entries; one statement."""
+        with self._lock:
+            entries, self.changed = list(self.changed.values()), {}
+        CachedResponse.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['url'],
+            update_fields=['etag', 'last_modified', 'body_hash', 'fetched_at'],
+        )
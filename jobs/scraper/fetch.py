@@ -0,0 +1,143 @@
+"""
+Shared HTTP fetch layer for the scrapers.
+
+All requests go through one pooled keep-alive session. Pages are fetched
+concurrently on a small thread pool, and a per-host rate limit spaces out
+requests to the same site instead of fixed sleeps in the scrape loop.
+Given a ResponseCache, pages fetched with conditional=True are
+revalidated instead of downloaded again (see jobs.scraper.cache).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+
+class HostRateLimiter:
+    """Allow at most `rate` requests per second to any single host."""
+
+    def __init__(self, rate=5.0):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}  # host -> monotonic time of its next free slot
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+
+        # Reserve a slot under the lock, sleep outside it so other hosts
+        # are never blocked behind this one
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class FetchResult:
+    """Outcome of a single fetch: either a response or the error raised."""
+
+    def __init__(self, url, response=None, error=None, unchanged=False):
+        self.url = url
+        self.response = response
+        self.error = error
+        self.unchanged = unchanged  # 304, or the same body as the cached copy: nothing new to parse
+
+    @property
+    def ok(self):
+        return self.response is not None and self.response.status_code == 200
+
+    @property
+    def status_code(self):
+        return self.response.status_code if self.response is not None else None
+
+    def __repr__(self):
+        return f"<FetchResult {self.url} {self.status_code or self.error}>"
+
+
+class Fetcher:
+    """
+    Concurrent page fetcher backed by one pooled `requests.Session`.
+
+    Use as a context manager so the session and worker pool get closed:
+
+        with Fetcher(max_workers=8) as fetcher:
+            for result in fetcher.fetch_many(urls):
+                ...
+    """
+
+    def __init__(self, max_workers=8, rate=5.0, timeout=20, retries=2, headers=None, cache=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(rate)
+        self.cache = cache
+        # At most max_workers requests in flight, whichever threads make them
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+        # Keep-alive pool sized to the worker count so concurrent requests
+        # to one host reuse connections instead of opening new ones
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET', 'HEAD'],
+            ),
+        )
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+
+    def get(self, url, conditional=False):
+        """Fetch one URL, honoring the per-host rate limit; revalidated against the cache if `conditional`.
+
+        Safe to call from several threads.
+        """
+        conditional = conditional and self.cache is not None
+        if conditional:
+            self.cache.load([url])
+        return self._get(url, conditional)
+
+    def _get(self, url, conditional):
+        self.rate_limiter.wait(url)
+        headers = self.cache.request_headers(url) if conditional else None
+        try:
+            with self._slots:
+                response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            return FetchResult(url, error=e)
+        unchanged = conditional and self.cache.update(url, response)
+        return FetchResult(url, response=response, unchanged=unchanged)
+
+    def fetch_many(self, urls, conditional=False):
+        """Fetch all URLs concurrently, yielding results in input order."""
+        urls = list(urls)
+        conditional = conditional and self.cache is not None
+        if conditional:
+            self.cache.load(urls)  # one query, here rather than in the fetch threads
+        return self._executor.map(lambda url: self._get(url, conditional), urls)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
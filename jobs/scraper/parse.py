@@ -0,0 +1,305 @@
+"""
+Field extraction from listing pages.
+
+A ListingParser is told which elements hold one listing (`container`) and
+which fields to take from inside each, by simple `tag.class` selectors:
+
+    parser = ListingParser('li.listing', {
+        'title': Field('h3.title'),
+        'url': Field('a.link', attr='href'),
+        'tags': Field('span.tag', many=True),
+    })
+    parser.parse(response.content)  # [{'title': ..., 'url': ..., 'tags': [...]}, ...]
+
+Each listing is read in one walk over its elements, matching every field
+at once, instead of a CSS query per field. Pages are handed over as bytes:
+the backends decode them themselves (charset from the response header,
+else the page's <meta charset>, else UTF-8).
+
+Backends, fastest first, used if installed:
+
+- selectolax (lexbor): C parser, listings found by its CSS engine
+- lxml: C parser, listings found by tag with iter()
+- html.parser: the standard library tokenizer driving a streaming
+  extractor that keeps only the fields, never a tree; always available
+
+All three return the same values (see the parity test in jobs.tests, and
+bench_parse). Containers are assumed not to nest.
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional, see BACKENDS
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:  # optional, see BACKENDS
+    lxml = None
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+HEADER_CHARSET_RE = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# Elements that never have content or an end tag
+VOID_ELEMENTS = frozenset('area base br col embed hr img input link meta param source track wbr'.split())
+
+
+class Selector:
+    """`tag`, `.class`, `tag.class` or `tag.class1.class2`: the subset of CSS the scrapers need."""
+
+    def __init__(self, css):
+        if not re.fullmatch(r'[\w-]*(\.[\w-]+)*', css) or not css:
+            raise ValueError(f'Unsupported selector: {css!r}')
+        tag, *classes = css.split('.')
+        self.css = css
+        self.tag = tag or None
+        self.classes = frozenset(classes)
+
+    def matches(self, tag, classes):
+        """Whether an element named `tag` with the set of `classes` matches."""
+        return (self.tag is None or tag == self.tag) and self.classes <= classes
+
+
+class Field:
+    """
+    What to take from the first element matching `selector` inside a
+    listing (every one, in a list, if `many`): the attribute `attr`, or
+    its text, as
+
+    - 'text': all the text inside it, stripped
+    - 'lines': each piece of text inside it stripped, the non-empty
+      ones joined by newlines
+    - 'leading': only the text before its first child element, stripped
+    """
+
+    MODES = ('text', 'lines', 'leading')
+
+    def __init__(self, selector, attr=None, mode='text', many=False):
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown mode: {mode!r}')
+        self.selector = Selector(selector)
+        self.attr = attr
+        self.mode = mode
+        self.many = many
+
+    def clean(self, pieces):
+        """The field's value from the text nodes inside the element (the leading one only for 'leading')."""
+        if self.mode == 'lines':
+            return '\n'.join(piece for piece in (piece.strip() for piece in pieces) if piece)
+        return ''.join(pieces).strip()
+
+
+class ListingParser:
+    """Pull `fields` ({name: Field}) out of every `container` element of a page (the whole page if None)."""
+
+    def __init__(self, container, fields, backend=None):
+        self.container = Selector(container) if container else None
+        self.fields = fields
+        self.backend = backend or default_backend()
+        if self.backend not in available_backends():
+            raise ValueError(f'HTML backend {self.backend!r} is not installed')
+
+    def parse(self, content, encoding=None):
+        """[{field name: value}] per listing of `content` (bytes), in page order; missing fields are left out."""
+        if not content.strip():
+            return [] if self.container else [{}]
+        return BACKENDS[self.backend](self, content, encoding)
+
+    def _store(self, record, name, field, value):
+        if field.many:
+            record.setdefault(name, []).append(value)
+        else:
+            record[name] = value
+
+    def _wanted(self, record, tag, classes):
+        """The fields an element named `tag` with `classes` fills in `record`."""
+        return [
+            (name, field) for name, field in self.fields.items()
+            if (field.many or name not in record) and field.selector.matches(tag, classes)
+        ]
+
+
+def header_charset(content_type):
+    """The charset parameter of a Content-Type header, or None (requests falls back to ISO-8859-1 instead)."""
+    match = HEADER_CHARSET_RE.search(content_type or '')
+    return match.group(1) if match else None
+
+
+def page_encoding(content, encoding=None):
+    """The codec name for `content`: `encoding`, else the page's <meta charset>, else UTF-8."""
+    if not encoding:
+        match = CHARSET_RE.search(content[:2048])
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return 'utf-8'
+
+
+def decode(content, encoding=None):
+    return content.decode(page_encoding(content, encoding), errors='replace')
+
+
+# ----------------------- BACKENDS -----------------------
+def _classes(value):
+    return frozenset(value.split()) if value else frozenset()
+
+
+def _parse_selectolax(spec, content, encoding):
+    encoding = page_encoding(content, encoding)
+    if encoding != 'utf-8':
+        content = content.decode(encoding, errors='replace')  # lexbor reads bytes as UTF-8
+    tree = LexborHTMLParser(content)
+    records = []
+    for root in (tree.css(spec.container.css) if spec.container else [tree.root]):
+        record = {}
+        nodes = root.traverse()
+        if spec.container:
+            next(nodes)  # fields come from inside the container
+        for node in nodes:
+            attributes = node.attributes
+            for name, field in spec._wanted(record, node.tag, _classes(attributes.get('class'))):
+                if field.attr:
+                    value = attributes.get(field.attr)
+                elif field.mode == 'leading':
+                    child = node.first_child
+                    value = field.clean([child.text_content] if child is not None and child.is_text_node else [])
+                elif field.mode == 'lines':
+                    value = field.clean([n.text_content for n in node.traverse(include_text=True) if n.is_text_node])
+                else:
+                    value = field.clean([node.text(deep=True)])
+                spec._store(record, name, field, value)
+        records.append(record)
+    return records
+
+
+def _parse_lxml(spec, content, encoding):
+    # libxml2 would guess ISO-8859-1 for a page with neither header nor <meta> charset
+    parser = lxml.html.HTMLParser(encoding=page_encoding(content, encoding))
+    root = lxml.html.document_fromstring(content, parser=parser)
+    if spec.container:
+        tag = spec.container.tag or '*'
+        roots = [el for el in root.iter(tag) if spec.container.classes <= _classes(el.get('class'))]
+    else:
+        roots = [root]
+
+    records = []
+    for container in roots:
+        record = {}
+        for el in (container.iterdescendants() if spec.container else container.iter()):
+            if not isinstance(el.tag, str):  # comments, processing instructions
+                continue
+            for name, field in spec._wanted(record, el.tag, _classes(el.get('class'))):
+                if field.attr:
+                    value = el.get(field.attr)
+                elif field.mode == 'leading':
+                    value = field.clean([el.text or ''])
+                else:
+                    value = field.clean(list(el.itertext()))
+                spec._store(record, name, field, value)
+        records.append(record)
+    return records
+
+
+class _Capture:
+    __slots__ = ('name', 'field', 'depth', 'pieces', 'open')
+
+    def __init__(self, name, field, depth):
+        self.name, self.field, self.depth = name, field, depth
+        self.pieces = []
+        self.open = True  # still collecting ('leading' stops at the first child element)
+
+
+class _StreamExtractor(HTMLParser):
+    """Tokenizer callbacks that fill the listings' fields as the page streams by; no tree is built."""
+
+    def __init__(self, spec):
+        super().__init__(convert_charrefs=True)
+        self.spec = spec
+        self.records = []
+        self.open_tags = []
+        self.captures = []  # text fields being collected
+        self.record = None if spec.container else {}  # the listing being read
+        self.record_depth = -1
+
+    def handle_starttag(self, tag, attrs):
+        depth = len(self.open_tags)
+        for capture in self.captures:
+            if capture.field.mode == 'leading':
+                capture.open = False
+
+        attrs = dict(attrs)
+        classes = _classes(attrs.get('class'))
+        if self.record is None:
+            if self.spec.container.matches(tag, classes):
+                self.record, self.record_depth = {}, depth
+        else:
+            capturing = {capture.name for capture in self.captures}
+            for name, field in self.spec._wanted(self.record, tag, classes):
+                if field.attr:
+                    self.spec._store(self.record, name, field, attrs.get(field.attr))
+                elif field.many or name not in capturing:
+                    self.captures.append(_Capture(name, field, depth))
+
+        if tag in VOID_ELEMENTS:
+            self._closed(depth)
+        else:
+            self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in self.open_tags:
+            return  # stray end tag
+        while self.open_tags:
+            if self.open_tags.pop() == tag:
+                break
+            self._closed(len(self.open_tags))  # left open in the page
+        self._closed(len(self.open_tags))
+
+    def handle_data(self, data):
+        for capture in self.captures:
+            if capture.open:
+                capture.pieces.append(data)
+
+    def _closed(self, depth):
+        """The element at `depth` ended: finish the fields it held, and its listing if it was one."""
+        while self.captures and self.captures[-1].depth >= depth:
+            capture = self.captures.pop()
+            self.spec._store(self.record, capture.name, capture.field, capture.field.clean(capture.pieces))
+        if self.record is not None and depth == self.record_depth:
+            self.records.append(self.record)
+            self.record = None
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.open_tags.pop()
+            self._closed(len(self.open_tags))
+        self._closed(-1)
+
+
+def _parse_stream(spec, content, encoding):
+    extractor = _StreamExtractor(spec)
+    extractor.feed(decode(content, encoding))
+    extractor.close()
+    return extractor.records
+
+
+BACKENDS = {
+    'selectolax': _parse_selectolax,
+    'lxml': _parse_lxml,
+    'html.parser': _parse_stream,
+}
+
+
+def available_backends():
+    """The installed backends, fastest first."""
+    installed = {'selectolax': LexborHTMLParser is not None, 'lxml': lxml is not None, 'html.parser': True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def default_backend():
+    return available_backends()[0]
@@ -0,0 +1,197 @@
+"""
+Staged scrape pipeline: bounded queues between stages with their own threads.
+
+    pipeline = Pipeline([
+        Stage('fetch', fetch, workers=8),
+        Stage('parse', parse, workers=2),
+        Stage('write', write),  # runs on the calling thread
+    ])
+    pipeline.run(urls)
+
+Every stage but the last runs `func` on `workers` threads, each item in
+turn, and passes on what it returns (None drops the item). The last stage
+runs on the thread that called run(): that is where the database writes
+go, on the caller's connection and inside its transaction.
+
+Each queue holds at most `queue_size` items, so a slow stage blocks the
+ones before it instead of letting work pile up: the items in flight are
+bounded by the queue sizes plus the workers, however many pages a scrape
+covers. An exception in a worker stage drops that item and is counted in
+the stage's errors; one in the last stage stops the pipeline and is
+raised from run().
+"""
+
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # end of a stage's input, one per worker
+POLL = 0.1  # seconds between checks for an aborted run while blocked on a queue
+
+
+class StageMetrics:
+    """Throughput, queue depth and errors of one stage."""
+
+    def __init__(self, name, workers, queue_size):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self.items = 0  # items processed
+        self.emitted = 0  # items passed on
+        self.errors = 0
+        self.busy = 0.0  # seconds spent in the stage function, all workers together
+        self.max_depth = 0  # fullest the stage's input queue got
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds, emitted=False, error=False):
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter() - seconds
+            self.items += 1
+            self.emitted += emitted
+            self.errors += error
+            self.busy += seconds
+
+    def queued(self, depth):
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    @property
+    def seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rate(self):
+        """Items per second over the time the stage was active."""
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'emitted': self.emitted,
+            'errors': self.errors,
+            'items_per_sec': round(self.rate, 1),
+            'busy_seconds': round(self.busy, 3),
+            'max_queue_depth': self.max_depth,
+            'queue_size': self.queue_size,
+        }
+
+    def __str__(self):
+        return (
+            f'{self.name}: {self.items:,} items ({self.rate:,.1f}/s) on {self.workers} worker(s), '
+            f'{self.errors:,} errors, queue depth up to {self.max_depth}/{self.queue_size}'
+        )
+
+
+class Stage:
+    """One step of a Pipeline: `func(item)` on `workers` threads, fed through a queue of `queue_size`."""
+
+    def __init__(self, name, func, workers=1, queue_size=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size or 2 * workers
+
+
+class Pipeline:
+
+    def __init__(self, stages, log=None):
+        if stages[-1].workers != 1:
+            raise ValueError('The last stage runs on the calling thread and takes one worker')
+        self.stages = stages
+        self.log = log or logger.warning
+        self.metrics = [StageMetrics(stage.name, stage.workers, stage.queue_size) for stage in stages]
+        self.queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self._remaining = [stage.workers for stage in stages]  # workers still running, per stage
+        self._lock = threading.Lock()
+        self._aborted = threading.Event()
+
+    def run(self, items):
+        """Push `items` through every stage; returns once the last stage has handled all of them."""
+        threads = [threading.Thread(target=self._feed, args=(items,), name='pipeline-feed', daemon=True)]
+        for index, stage in enumerate(self.stages[:-1]):
+            threads += [
+                threading.Thread(target=self._work, args=(index,), name=f'pipeline-{stage.name}-{n}', daemon=True)
+                for n in range(stage.workers)
+            ]
+        for thread in threads:
+            thread.start()
+        try:
+            self._work(len(self.stages) - 1)
+        except BaseException:
+            self._aborted.set()  # unblocks and stops every thread
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+
+    # ----------------------- THREADS -----------------------
+    def _feed(self, items):
+        try:
+            for item in items:
+                if not self._put(0, item):
+                    return
+        except Exception as e:
+            self.log(f'{self.stages[0].name}: could not read the input: {e!r}')
+        self._finish(-1)
+
+    def _work(self, index):
+        stage, metrics, last = self.stages[index], self.metrics[index], index == len(self.stages) - 1
+        while True:
+            item = self._get(index)
+            if item is _DONE:
+                break
+            start = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                metrics.record(time.perf_counter() - start, error=True)
+                if last:
+                    raise
+                self.log(f'{stage.name}: {e!r}')
+                continue
+            metrics.record(time.perf_counter() - start, emitted=result is not None)
+            if result is not None and not last and not self._put(index + 1, result):
+                return
+        if not last:
+            self._finish(index)
+        metrics.finished = time.perf_counter()
+
+    def _finish(self, index):
+        """A worker of stage `index` (-1: the feeder) is done; the last one ends the next stage's input."""
+        if index >= 0:
+            with self._lock:
+                self._remaining[index] -= 1
+                if self._remaining[index]:
+                    return
+            self.metrics[index].finished = time.perf_counter()
+        for _ in range(self.stages[index + 1].workers):
+            self._put(index + 1, _DONE)
+
+    def _put(self, index, item):
+        """Queue `item` for stage `index`, waiting for room; False if the run was aborted."""
+        while not self._aborted.is_set():
+            try:
+                self.queues[index].put(item, timeout=POLL)
+            except queue.Full:
+                continue
+            self.metrics[index].queued(self.queues[index].qsize())
+            return True
+        return False
+
+    def _get(self, index):
+        while not self._aborted.is_set():
+            try:
+                return self.queues[index].get(timeout=POLL)
+            except queue.Empty:
+                continue
+        return _DONE
@@ -0,0 +1,123 @@
+"""
+Scrape cycles: run every source that is due, several at a time.
+
+A source is due when it is active, has a registered scraper and was last
+scraped at least scraping_frequency hours ago (or never). Due sources run
+in parallel on a pool of `workers` threads, each scraper limited to its own
+max_concurrency requests. A per-source lease in the database
+(JobSource.scrape_started_at, claimed with a conditional UPDATE) keeps
+overlapping cycles (a beat tick while the previous cycle is still going,
+or a manual run, in any process or on any host) from scraping the same
+source twice at once; a lease older than LEASE_TIMEOUT, left by a process
+that died mid-scrape, can be taken over.
+
+arun_sources() scrapes on one event loop instead (Scraper.arun): every
+source at once, with no thread per source or per request.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import JobSource
+from .base import SCRAPERS, ScrapeResult, ensure_sources, get_scraper
+
+LEASE_TIMEOUT = timedelta(hours=3)
+
+
+def is_due(source, now=None):
+    if source.last_scraped is None:
+        return True
+    now = now or timezone.now()
+    return source.last_scraped + timedelta(hours=source.scraping_frequency) <= now
+
+
+def due_sources(now=None):
+    """Active JobSources with a registered scraper whose next scrape is due."""
+    now = now or timezone.now()
+    sources = JobSource.objects.filter(is_active=True, name__in=list(SCRAPERS)).order_by('last_scraped', 'pk')
+    return [source for source in sources if is_due(source, now)]
+
+
+def _claim(source):
+    """Take `source`'s scrape lease; returns its start time, or None if another scrape holds it."""
+    now = timezone.now()
+    free = Q(scrape_started_at__isnull=True) | Q(scrape_started_at__lte=now - LEASE_TIMEOUT)
+    return now if JobSource.objects.filter(free, pk=source.pk).update(scrape_started_at=now) else None
+
+
+def _release(source, started):
+    # Only our own lease: a takeover after LEASE_TIMEOUT belongs to the other scrape
+    JobSource.objects.filter(pk=source.pk, scrape_started_at=started).update(scrape_started_at=None)
+
+
+def _scrape(source, **options):
+    try:
+        return get_scraper(source, **options).run()
+    except Exception as e:
+        # A failed source is not marked scraped, so the next cycle retries it
+        return ScrapeResult(source.name, error=e)
+
+
+def scrape_source(source, **options):
+    """Run `source`'s scraper unless another process is already running it; returns a ScrapeResult."""
+    started = _claim(source)
+    if started is None:
+        return ScrapeResult(source.name, error='already running')
+    try:
+        return _scrape(source, **options)
+    finally:
+        _release(source, started)
+
+
+def run_sources(sources, workers=4, **options):
+    """Scrape `sources` on `workers` threads; returns their ScrapeResults in order."""
+    if workers <= 1 or len(sources) <= 1:
+        return [scrape_source(source, **options) for source in sources]
+
+    def work(source, started):
+        if started is None:
+            return ScrapeResult(source.name, error='already running')
+        try:
+            return _scrape(source, **options)
+        finally:
+            connection.close()  # every pool thread opened its own
+
+    # The leases are taken and given back on this thread; the pool only scrapes
+    leases = [_claim(source) for source in sources]
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scrape') as pool:
+            return list(pool.map(work, sources, leases))
+    finally:
+        for source, started in zip(sources, leases):
+            if started is not None:
+                _release(source, started)
+
+
+async def ascrape_source(source, **options):
+    """scrape_source() on the event loop, with Scraper.arun()."""
+    started = await sync_to_async(_claim)(source)
+    if started is None:
+        return ScrapeResult(source.name, error='already running')
+    try:
+        return await get_scraper(source, **options).arun()
+    except Exception as e:
+        return ScrapeResult(source.name, error=e)
+    finally:
+        await sync_to_async(_release)(source, started)
+
+
+async def arun_sources(sources, **options):
+    """Scrape all `sources` concurrently on the running event loop; returns their ScrapeResults in order."""
+    return await asyncio.gather(*(ascrape_source(source, **options) for source in sources))
+
+
+def run_due(workers=4, now=None, **options):
+    """One scrape cycle: every due source, `workers` at a time."""
+    ensure_sources()
+    return run_sources(due_sources(now), workers=workers, **options)
@@ -0,0 +1,169 @@
+"""
+WeWorkRemotely.com: the programming category pages, plus the own page of
+each new or changed listing for its full description when `details` is
+set. Category pages that have not changed since the last run are not
+parsed. Skips listings without an external URL; also supports
+alternative link selectors.
+"""
+
+import asyncio
+import re
+
+from ..skills import get_extractor
+from .base import Scraper, register
+from .parse import Field, ListingParser, header_charset
+
+
+@register
+class WeWorkRemotelyScraper(Scraper):
+    name = 'WeWorkRemotely'
+    base_url = 'https://weworkremotely.com'
+    max_concurrency = 8
+
+    # All category pages we scrape (relative to base_url)
+    CATEGORY_PATHS = [
+        "/categories/remote-full-stack-programming-jobs",
+        "/categories/remote-back-end-programming-jobs",
+        "/categories/remote-front-end-programming-jobs",
+    ]
+
+    # The fields of each listing on a category page (see jobs.scraper.parse)
+    LISTING_CONTAINER = "li.new-listing-container"
+    LISTING_FIELDS = {
+        'title': Field("h3.new-listing__header__title"),
+        'company': Field("p.new-listing__company-name", mode='leading'),  # not the badge after it
+        'location': Field("p.new-listing__company-headquarters"),
+        'link': Field("a.listing-link--unlocked", attr='href'),
+        'view_link': Field("a.view-job", attr='href'),
+        'categories': Field("p.new-listing__categories__category", many=True),
+    }
+
+    # Where the full job description lives on a listing's own page, in order of preference
+    DETAIL_SELECTORS = [
+        "div.lis-container__job__content__description",
+        "div.listing-container",
+    ]
+
+    # Skills we look for on top of the Skill table (see jobs.skills)
+    SKILL_KEYWORDS = [
+        "Python", "JavaScript", "React", "Node", "Django", "C#",
+        "Java", "PHP", "Go", "Rust", "Vue", "AWS", "Docker",
+        "Kubernetes", "Full Stack", "Frontend", "Backend"
+    ]
+
+    def prepare(self):
+        self.extractor = get_extractor(self.SKILL_KEYWORDS)
+        self.category_parser = ListingParser(self.LISTING_CONTAINER, self.LISTING_FIELDS)
+        self.detail_parser = ListingParser(None, {
+            selector: Field(selector, mode='lines') for selector in self.DETAIL_SELECTORS
+        })
+
+    def pages(self):
+        return [self.base_url + path for path in self.CATEGORY_PATHS]
+
+    def parse_page(self, result):
+        job_listings = self.parse(self.category_parser, result.response)
+        self.log(f"Found {len(job_listings)} jobs in category.\n")
+        return job_listings
+
+    def enrich(self, fetcher, listings):
+        # Pull full descriptions for listings that are new or changed, concurrently
+        if self.options.get('details'):
+            self.fetch_descriptions(fetcher, listings)
+        return listings
+
+    async def aenrich(self, fetcher, listings):
+        if self.options.get('details'):
+            results = await fetcher.fetch_many(data['external_url'] for data in listings)
+            await asyncio.to_thread(self.add_descriptions, listings, results)
+        return listings
+
+    @staticmethod
+    def parse(parser, response):
+        """Run `parser` over the response body, decoded by the parser itself."""
+        return parser.parse(response.content, header_charset(response.headers.get('Content-Type')))
+
+    def normalize(self, fields):
+        """Turn the raw fields of one listing element into a listing dict (None if it has no title)."""
+
+        # Job title
+        title = fields.get('title')
+        if title is None:
+            return None
+
+        # Company name and location
+        company_name = fields.get('company') or "Unknown Company"
+        location_text = fields.get('location', "Remote")
+
+        # Job URL (important); some listings only have the "view job" link
+        href = fields.get('link') or fields.get('view_link')
+        job_url = self.base_url + href if href else None
+
+        # Categories/tags
+        categories = [c for c in fields.get('categories', []) if c != "Featured"]
+
+        # Determine job type
+        job_type = "full_time"
+        if any("contract" in c.lower() for c in categories):
+            job_type = "contract"
+        elif any("part" in c.lower() for c in categories):
+            job_type = "part_time"
+
+        # Salary extraction (if mentioned)
+        salary_min, salary_max = None, None
+        for c in categories:
+            if '$' in c:
+                nums = re.findall(r'\d+,?\d*', c)
+                if len(nums) >= 2:
+                    salary_min = float(nums[0].replace(",", ""))
+                    salary_max = float(nums[1].replace(",", ""))
+                elif len(nums) == 1:
+                    salary_min = float(nums[0].replace(",", ""))
+
+        # Simple description text
+        description = (
+            f"{title} at {company_name}\n"
+            f"Location: {location_text}\n"
+            f"Type: {job_type}"
+        )
+
+        # Skill detection (word-boundary matching over title and categories)
+        skills = self.extractor.extract(title, "\n".join(categories))
+
+        return {
+            'title': title,
+            'company': company_name,
+            'location': (
+                "Remote" if "remote" in location_text.lower() else location_text,
+                "Worldwide",
+                True,
+            ),
+            'description': description,
+            'job_type': job_type,
+            'experience_level': "mid",
+            'salary_min': salary_min,
+            'salary_max': salary_max,
+            'salary_currency': "USD" if salary_min else None,
+            'external_url': job_url,
+            'tags': ", ".join(categories),
+            'skills': skills,
+        }
+
+    def fetch_descriptions(self, fetcher, new_jobs):
+        """Replace the generated description with the listing page's text where available."""
+        urls = [data['external_url'] for data in new_jobs]
+        self.add_descriptions(new_jobs, fetcher.fetch_many(urls))
+
+    def add_descriptions(self, new_jobs, results):
+        """Parse the listing pages fetched for `new_jobs` (FetchResults in the same order)."""
+        for data, result in zip(new_jobs, results):
+            if not result.ok:
+                continue
+            [page] = self.parse(self.detail_parser, result.response)
+            for selector in self.DETAIL_SELECTORS:
+                if selector in page:
+                    text = page[selector]
+                    if text:
+                        data['description'] = text
+                        data['skills'] = self.extractor.extract(data['title'], data['tags'], text)
+                    break
@@ -0,0 +1,136 @@
+"""
+Job search.
+
+On PostgreSQL jobs carry a weighted `search_vector` (title > tags > company
+name > description) kept up to date by triggers and backed by a GIN index,
+so a search is an index lookup ranked with ts_rank. The query is read as
+by a web search box (quoted phrases, -exclusions, "or"), and its last word
+also matches as a prefix, so results show up while a word is being typed:
+"senior pyth" finds Python jobs. Other backends (the SQLite test runs)
+fall back to icontains across the same fields, ranked by which field
+matched.
+
+Ranking reads every match, and a broad term matches a tenth of the
+table, so only the RANKED_MATCHES newest matches are ranked and returned.
+Exports ask for every match (ranked=None).
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from rest_framework import filters
+
+from .models import Job
+
+SEARCH_CONFIG = 'english'
+PREFIX_WORD = re.compile(r'[^\W_]+')  # safe to hand to to_tsquery as is
+RANKED_MATCHES = 1000
+
+
+def uses_full_text(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def full_text_query(query):
+    """websearch_to_tsquery(`query`), with its last word matched as a prefix (to_tsquery 'word:*')."""
+    words = query.split()
+    last = words[-1]
+    typing = (
+        PREFIX_WORD.fullmatch(last)
+        and query.count('"') % 2 == 0  # not inside a phrase
+        and 'or' not in (last.lower(), words[-2].lower() if len(words) > 1 else '')
+    )
+    if not typing:
+        return SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+    prefix = SearchQuery(f'{last}:*', search_type='raw', config=SEARCH_CONFIG)
+    if len(words) == 1:
+        return prefix
+    return SearchQuery(query[:-len(last)], search_type='websearch', config=SEARCH_CONFIG) & prefix
+
+
+def search_jobs(queryset, query, ranked=RANKED_MATCHES):
+    """Filter `queryset` to jobs matching `query`, best matches first (annotated as `rank`).
+
+    Only the `ranked` newest matches are kept; None keeps them all.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    ordering = ['-rank', *Job._meta.ordering]
+
+    if uses_full_text(queryset):
+        search_query = full_text_query(query)
+        matches = queryset.filter(search_vector=search_query)
+        return _newest(queryset, matches, ranked).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by(*ordering)
+
+    # Fallback: substring match with the same field weights
+    matches = queryset.filter(
+        Q(title__icontains=query) |
+        Q(tags__icontains=query) |
+        Q(company__name__icontains=query) |
+        Q(description__icontains=query)
+    )
+    return _newest(queryset, matches, ranked).annotate(
+        rank=Case(
+            When(title__icontains=query, then=Value(4)),
+            When(tags__icontains=query, then=Value(3)),
+            When(company__name__icontains=query, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    ).order_by(*ordering)
+
+
+def _newest(queryset, matches, limit):
+    if limit is None:
+        return matches
+    # A subquery the newest-first index answers without reading the other matches
+    return queryset.filter(pk__in=matches.order_by(*Job._meta.ordering).values('pk')[:limit])
+
+
+# Query parameters of the jobs page, also accepted by the bulk export
+FILTER_PARAMS = ['search', 'location', 'job_type', 'experience', 'skill']
+
+
+def filter_jobs(queryset, params, ranked=RANKED_MATCHES):
+    """Apply the jobs page filters in `params` (a dict-like of FILTER_PARAMS) to `queryset`."""
+    if params.get('search'):
+        queryset = search_jobs(queryset, params['search'], ranked)
+    if params.get('location'):
+        queryset = queryset.filter(
+            Q(location__city__icontains=params['location']) |
+            Q(location__country__icontains=params['location'])
+        )
+    if params.get('job_type'):
+        queryset = queryset.filter(job_type=params['job_type'])
+    if params.get('experience'):
+        queryset = queryset.filter(experience_level=params['experience'])
+    if params.get('skill'):
+        # A subquery rather than a join: a job with several matching skills is listed once
+        queryset = queryset.filter(pk__in=Job.skills.through.objects.filter(
+            skill__name__icontains=params['skill']
+        ).values('job_id'))
+    return queryset
+
+
+class JobSearchFilter(filters.BaseFilterBackend):
+    """DRF filter backend: ?search=<terms> through search_jobs()."""
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        return search_jobs(queryset, request.query_params.get(self.search_param, ''))
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over title, tags, company and description',
+            'schema': {'type': 'string'},
+        }]
@@ -1,35 +1,23 @@
 from rest_framework import serializers
 from .models import Company, Skill, Location, Job, JobSource
 
+# job_count on Company, Skill and Location is the maintained counter of
+# approved, active jobs (see jobs.counters), so reading it costs no query
+
 class CompanySerializer(serializers.ModelSerializer):
-    job_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Company
         fields = ['id', 'name', 'website', 'logo', 'description', 'job_count', 'created_at']
-    
-    def get_job_count(self, obj):
-        return obj.jobs.filter(is_active=True, status='approved').count()
 
 class SkillSerializer(serializers.ModelSerializer):
-    job_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Skill
         fields = ['id', 'name', 'category', 'job_count']
-    
-    def get_job_count(self, obj):
-        return obj.jobs.filter(is_active=True, status='approved').count()
 
 class LocationSerializer(serializers.ModelSerializer):
-    job_count = serializers.SerializerMethodField()
-    
     class Meta:
         model = Location
         fields = ['id', 'city', 'country', 'is_remote', 'job_count']
-    
-    def get_job_count(self, obj):
-        return obj.jobs.filter(is_active=True, status='approved').count()
 
 class JobListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for listing jobs"""
@@ -57,15 +45,13 @@ class JobDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Job
-        fields = '__all__'
+        exclude = ['search_vector', 'fingerprint', 'listing_hash', 'duplicate_of']  # Internal search/dedup/re-scrape columns
 
 class JobSourceSerializer(serializers.ModelSerializer):
-    job_count = serializers.SerializerMethodField()
+    # Annotated by JobSourceViewSet's queryset
+    job_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = JobSource
         fields = ['id', 'name', 'base_url', 'is_active', 'scraping_frequency', 
                   'last_scraped', 'job_count']
-    
-    def get_job_count(self, obj):
-        return obj.jobs.filter(is_active=True).count()
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Signal handlers that keep the demand counters (see jobs.counters) in step
+with single-object changes: job saves, deletes and skill add/remove/clear.
+The same changes invalidate the aggregate data cache (see jobs.caching),
+skill changes the compiled skill extractor (see jobs.skills), and a job's
+skill changes its cached similar jobs (see jobs.similar).
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import caching, counters, similar, skills
+from .models import Company, Job, Location, Skill
+
+SKIP = object()  # pre_save marker: this save can't change any counter
+
+
+# ----------------------- JOB SAVE / DELETE -----------------------
+@receiver(pre_save, sender=Job)
+def snapshot_counted_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not counters.TRACKED_FIELDS.intersection(update_fields)):
+        instance._counter_snapshot = SKIP
+    elif instance._state.adding:
+        instance._counter_snapshot = None
+    else:
+        # Read the stored row rather than trusting the in-memory copy
+        instance._counter_snapshot = (
+            Job.objects.filter(pk=instance.pk)
+            .values('status', 'is_active', 'company_id', 'location_id')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Job)
+def update_counters_on_save(sender, instance, **kwargs):
+    old = getattr(instance, '_counter_snapshot', SKIP)
+    if old is SKIP:
+        return
+
+    was_counted = bool(old) and old['is_active'] and old['status'] == 'approved'
+    now_counted = counters.is_counted(instance)
+    if not was_counted and not now_counted:
+        return
+
+    company_deltas, location_deltas = {}, {}
+    if was_counted:
+        company_deltas[old['company_id']] = -1
+        location_deltas[old['location_id']] = -1
+    if now_counted:
+        company_deltas[instance.company_id] = company_deltas.get(instance.company_id, 0) + 1
+        location_deltas[instance.location_id] = location_deltas.get(instance.location_id, 0) + 1
+    location_deltas.pop(None, None)
+
+    counters.apply_deltas(Company, company_deltas)
+    counters.apply_deltas(Location, location_deltas)
+
+    # Skills don't change on save; they only move when the job enters or leaves the count
+    if was_counted != now_counted and not instance._state.adding:
+        skill_ids = instance.skills.values_list('pk', flat=True)
+        counters.adjust_skills(skill_ids, 1 if now_counted else -1)
+
+
+@receiver(pre_delete, sender=Job)
+def update_counters_on_delete(sender, instance, **kwargs):
+    # Runs before the job's skill rows are removed, so its full contribution is still visible
+    if counters.is_counted(instance):
+        counters.adjust_for_jobs([instance.pk], -1)
+
+
+# ----------------------- JOB SKILLS -----------------------
+@receiver(m2m_changed, sender=Job.skills.through)
+def update_counters_on_skill_change(sender, instance, action, reverse, pk_set, **kwargs):
+    Through = Job.skills.through
+
+    if not reverse:
+        # job.skills.add/remove/clear(): instance is a Job, pk_set holds skill ids
+        if not counters.is_counted(instance):
+            return
+        if action == 'post_add':
+            counters.adjust_skills(pk_set, 1)
+        elif action == 'pre_remove':
+            instance._removed_skill_ids = list(
+                Through.objects.filter(job_id=instance.pk, skill_id__in=pk_set).values_list('skill_id', flat=True)
+            )
+        elif action == 'pre_clear':
+            instance._removed_skill_ids = list(instance.skills.values_list('pk', flat=True))
+        elif action in ('post_remove', 'post_clear'):
+            counters.adjust_skills(instance.__dict__.pop('_removed_skill_ids', []), -1)
+        return
+
+    # skill.jobs.add/remove/clear(): instance is a Skill, pk_set holds job ids
+    counted_jobs = Job.objects.filter(counters.COUNTED)
+    if action == 'post_add':
+        counters.apply_deltas(Skill, {instance.pk: counted_jobs.filter(pk__in=pk_set).count()})
+    elif action == 'pre_remove':
+        instance._removed_job_count = Through.objects.filter(
+            skill_id=instance.pk, job__in=counted_jobs.filter(pk__in=pk_set)
+        ).count()
+    elif action == 'pre_clear':
+        instance._removed_job_count = instance.jobs.filter(counters.COUNTED).count()
+    elif action in ('post_remove', 'post_clear'):
+        counters.apply_deltas(Skill, {instance.pk: -instance.__dict__.pop('_removed_job_count', 0)})
+
+
+# ----------------------- DATA CACHE -----------------------
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(m2m_changed, sender=Job.skills.through)
+def invalidate_data_cache(sender, raw=False, update_fields=None, action=None, **kwargs):
+    if raw or (action is not None and not action.startswith('post_')):
+        return
+    if update_fields is not None and set(update_fields) <= {'views', 'updated_at'}:
+        return
+    caching.invalidate_on_commit()
+
+
+# ----------------------- SIMILAR JOBS -----------------------
+@receiver(m2m_changed, sender=Job.skills.through)
+def invalidate_similar_jobs(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            similar.invalidate_on_commit([instance.pk])
+    elif action == 'pre_clear':
+        instance._cleared_job_ids = list(instance.jobs.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        similar.invalidate_on_commit(pk_set)
+    elif action == 'post_clear':
+        similar.invalidate_on_commit(instance.__dict__.pop('_cleared_job_ids', []))
+
+
+# ----------------------- SKILL EXTRACTOR -----------------------
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_extractor(sender, raw=False, **kwargs):
+    skills.invalidate_extractor_on_commit()
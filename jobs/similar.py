@@ -0,0 +1,209 @@
+"""
+Similar jobs: approved, active jobs ranked by skill overlap.
+
+Candidates come from an inverted index, skill pk -> sorted job pks, built
+from the Job.skills through table in one streaming query and kept in
+memory per process. Each skill is weighted by its inverse document
+frequency, so sharing "Kafka" counts for more than sharing "Git", and a
+candidate's score is the weighted Jaccard index of the two skill sets:
+the weight of the skills they share over the weight of all skills either
+lists. A lookup touches only the posting lists of the job's own skills.
+Jobs that share no skill are filled in with the newest jobs from the same
+company.
+
+The index follows the data generation (see jobs.caching), rebuilt at most
+every SIMILAR_JOBS_INDEX_MAX_AGE seconds. The rebuild runs on a background
+thread of the process, one at a time, and requests keep getting the old
+index until it is swapped in; only a process's first lookup waits for a
+build. Results are cached per job for
+RESULT_TIMEOUT seconds and dropped when the job's skills change (see
+jobs.signals, and the bulk writes in jobs.ingest and jobs.retag).
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from . import caching, counters
+from .models import Job
+
+LIMIT = 20  # results computed and cached per job; callers take a prefix
+RESULT_TIMEOUT = 3600
+PREFIX = 'skillscope:similar'
+
+logger = logging.getLogger(__name__)
+
+
+def index_max_age():
+    return getattr(settings, 'SIMILAR_JOBS_INDEX_MAX_AGE', 300)
+
+
+class SimilarJobsIndex:
+    """Posting lists of job pks per skill pk, IDF weights and each job's total weight."""
+
+    def __init__(self, indptr, job_ids, idf, norms, unseen_weight):
+        self.indptr = indptr  # skill i's jobs are job_ids[indptr[i]:indptr[i + 1]]
+        self.job_ids = job_ids
+        self.idf = idf  # weight per skill pk
+        self.norms = norms  # summed skill weights per job pk
+        self.unseen_weight = unseen_weight  # weight of a skill no indexed job lists
+
+    @classmethod
+    def build(cls, jobs=None):
+        """Index the skills of `jobs` (default: approved, active jobs)."""
+        jobs = Job.objects.filter(counters.COUNTED) if jobs is None else jobs
+        links = np.fromiter(
+            Job.skills.through.objects.filter(job__in=jobs).order_by()
+            .values_list('skill_id', 'job_id').iterator(chunk_size=20_000),
+            dtype=[('skill', np.int64), ('job', np.int64)],
+        )
+        links.sort(order=['skill', 'job'])
+        skills = int(links['skill'].max()) + 1 if len(links) else 0
+        indptr = np.zeros(skills + 1, dtype=np.int64)
+        np.cumsum(np.bincount(links['skill'], minlength=skills), out=indptr[1:])
+
+        # Smoothed IDF: never zero, so a skill every job lists still counts a little
+        total = len(np.unique(links['job']))
+        idf = np.log((1 + total) / (1 + np.diff(indptr))) + 1
+        norms = np.bincount(links['job'], weights=idf[links['skill']])
+        return cls(indptr, links['job'].copy(), idf, norms, np.log(1 + total) + 1)
+
+    def weight(self, skill_id):
+        return self.idf[skill_id] if skill_id < len(self.idf) else self.unseen_weight
+
+    def similar(self, job_id, skill_ids, limit=LIMIT):
+        """[(job pk, score)] for the indexed jobs closest to a job with `skill_ids`, best first."""
+        skill_ids = sorted(set(skill_ids))
+        query_weight = sum(self.weight(skill_id) for skill_id in skill_ids)
+        postings = [
+            (self.job_ids[self.indptr[skill_id]:self.indptr[skill_id + 1]], self.idf[skill_id])
+            for skill_id in skill_ids if skill_id < len(self.idf)
+        ]
+        if not postings:
+            return []
+
+        ids = np.concatenate([jobs for jobs, _ in postings])
+        weights = np.repeat([weight for _, weight in postings], [len(jobs) for jobs, _ in postings])
+        shared = np.bincount(ids, weights=weights, minlength=len(self.norms))
+        shared[job_id:job_id + 1] = 0  # never similar to itself
+        candidates = np.flatnonzero(shared)
+        scores = shared[candidates] / (query_weight + self.norms[candidates] - shared[candidates])
+
+        if len(candidates) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            candidates, scores = candidates[best], scores[best]
+        order = np.lexsort((-candidates, -scores))  # ties: newest job first
+        return list(zip(candidates[order].tolist(), scores[order].tolist()))
+
+
+# ----------------------- PROCESS-WIDE INDEX -----------------------
+_index = None
+_index_generation = None
+_index_built_at = 0.0
+_rebuilding = None  # the thread building the next index, if any
+_lock = threading.Lock()
+_first_build = threading.Lock()  # held while a process builds its first index
+
+
+def get_index():
+    """The index for the current data generation, or the previous one while a new one is built."""
+    global _rebuilding
+    generation = caching.current_generation()
+    with _lock:
+        if _index is not None and (
+            generation == _index_generation or time.monotonic() - _index_built_at < index_max_age()
+        ):
+            return _index
+        rebuild = _index is not None and _rebuilding is None
+        if rebuild:
+            _rebuilding = True  # claimed; the thread takes its place
+    if rebuild:
+        _start_rebuild(generation)
+    elif _index is None:
+        # Nothing to serve yet: build once, the other threads wait for it
+        with _first_build:
+            if _index is None:
+                _swap(SimilarJobsIndex.build(), generation)
+    return _index
+
+
+def _swap(index, generation):
+    global _index, _index_generation, _index_built_at
+    with _lock:
+        _index, _index_generation, _index_built_at = index, generation, time.monotonic()
+
+
+def _rebuild(generation):
+    global _rebuilding
+    try:
+        _swap(SimilarJobsIndex.build(), generation)
+    except Exception:
+        logger.exception('Failed to rebuild the similar jobs index')  # the next lookup tries again
+    finally:
+        with _lock:
+            _rebuilding = None
+
+
+def _start_rebuild(generation):
+    global _rebuilding
+
+    def run():
+        try:
+            _rebuild(generation)
+        finally:
+            connection.close()  # the thread opened its own
+
+    thread = threading.Thread(target=run, name='similar-jobs-index', daemon=True)
+    with _lock:
+        _rebuilding = thread
+    thread.start()
+
+
+# ----------------------- PER-JOB RESULTS -----------------------
+def cache_key(job_id):
+    return f'{PREFIX}:{job_id}'
+
+
+def similar_job_ids(job):
+    """[(job pk, score)] for `job`, cached; score is None for same-company fill-ins."""
+    key = cache_key(job.pk)
+    results = cache.get(key)
+    if results is None:
+        results = get_index().similar(job.pk, [skill.pk for skill in job.skills.all()], LIMIT)
+        if len(results) < LIMIT:
+            seen = {pk for pk, _ in results} | {job.pk}
+            results += [
+                (pk, None) for pk in Job.objects.filter(counters.COUNTED, company_id=job.company_id)
+                .exclude(pk__in=seen).order_by('-posted_date', '-pk').values_list('pk', flat=True)[:LIMIT - len(results)]
+            ]
+        cache.set(key, results, RESULT_TIMEOUT)
+    return results
+
+
+def similar_jobs(job, limit=4, queryset=None):
+    """The `limit` approved, active jobs most similar to `job`, each with a .similarity score."""
+    results = similar_job_ids(job)[:limit]
+    queryset = Job.objects.select_related('company', 'location') if queryset is None else queryset
+    found = queryset.filter(counters.COUNTED).in_bulk([pk for pk, _ in results])
+    jobs = []
+    for pk, score in results:
+        if pk in found:  # jobs rejected or closed since are left out
+            found[pk].similarity = score
+            jobs.append(found[pk])
+    return jobs
+
+
+def invalidate(job_ids):
+    """Drop the cached results of `job_ids` (their skills changed)."""
+    cache.delete_many([cache_key(job_id) for job_id in job_ids])
+
+
+def invalidate_on_commit(job_ids):
+    job_ids = list(job_ids)
+    if job_ids:
+        transaction.on_commit(lambda: invalidate(job_ids))
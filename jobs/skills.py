@@ -0,0 +1,179 @@
+"""
+Skill extraction from job text.
+
+Every known skill name (the Skill table plus any extra names a caller
+supplies) and the ALIASES below are compiled into a single regex, shaped
+as a trie so that shared prefixes are only tried once. extract() scans
+title, tags and description in one pass. Matches must sit on word
+boundaries: "Go" does not match "Google", "Java" does not match
+"JavaScript", "C" does not match "C++" or "C#". Short names and common
+English words ("Go", "R", "Swift") match case-sensitively.
+
+The compiled extractor is cached per process and rebuilt when the skill
+set changes (see invalidate_extractor, called on Skill saves and deletes).
+"""
+
+import re
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Skill
+
+VERSION_KEY = 'skillscope:skills:version'
+
+# Alternative spellings -> canonical skill name. An alias only applies when its
+# target is a known skill and the alias isn't a skill name in its own right.
+ALIASES = {
+    'golang': 'Go',
+    'js': 'JavaScript',
+    'ts': 'TypeScript',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'reactjs': 'React',
+    'react.js': 'React',
+    'vuejs': 'Vue',
+    'vue.js': 'Vue',
+    'angularjs': 'Angular',
+    'postgres': 'PostgreSQL',
+    'psql': 'PostgreSQL',
+    'k8s': 'Kubernetes',
+    'ml': 'Machine Learning',
+    'c sharp': 'C#',
+    'cpp': 'C++',
+    'amazon web services': 'AWS',
+    'google cloud': 'GCP',
+    'ruby on rails': 'Rails',
+    'scikit learn': 'Scikit-learn',
+    'sklearn': 'Scikit-learn',
+    'full stack': 'Full Stack',
+    'front end': 'Frontend',
+    'back end': 'Backend',
+}
+
+# Matched case-sensitively on top of every name of two characters or less
+CASE_SENSITIVE = {'Swift', 'Express', 'Spark', 'Rails', 'Go'}
+
+SEPARATOR = ' '  # trie atom for a run of whitespace or hyphens
+SEPARATOR_RE = re.compile(r'[\s\-]+')
+
+
+def normalize(term):
+    return SEPARATOR_RE.sub(SEPARATOR, term.strip())
+
+
+def is_case_sensitive(name):
+    return len(name) <= 2 or name in CASE_SENSITIVE
+
+
+def trie_pattern(terms):
+    """A regex matching any of `terms`, longest first, with shared prefixes factored out."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for atom in term:
+            node = node.setdefault(atom, {})
+        node[''] = {}  # end of a term
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    alternatives = [
+        (r'[\s\-]+' if atom == SEPARATOR else re.escape(atom)) + _node_pattern(child)
+        for atom, child in sorted(node.items())
+        if atom
+    ]
+    if not alternatives:
+        return ''
+    pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    if '' in node:
+        pattern = f'(?:{pattern})?'  # greedy: a longer term wins, the shorter one is the fallback
+    return pattern
+
+
+class SkillExtractor:
+    """Finds known skills in text; build once, then call extract() per document."""
+
+    def __init__(self, names, aliases=ALIASES):
+        names = {name.strip() for name in names if name and name.strip()}
+
+        # Lookup from matched text (normalized) to canonical name
+        self.exact = {normalize(name): name for name in names if is_case_sensitive(name)}
+        self.folded = {normalize(name).lower(): name for name in names if not is_case_sensitive(name)}
+        taken = set(self.folded).union(key.lower() for key in self.exact)
+        for alias, target in aliases.items():
+            alias = normalize(alias).lower()
+            if target in names and alias not in taken:
+                self.folded[alias] = target
+
+        parts = []
+        if self.folded:
+            parts.append(f'(?P<folded>(?i:{trie_pattern(self.folded)}))')
+        if self.exact:
+            parts.append(f'(?P<exact>{trie_pattern(self.exact)})')
+        self.regex = re.compile(
+            r'(?<![A-Za-z0-9.])(?:' + '|'.join(parts) + r')(?![A-Za-z0-9+#])'
+        ) if parts else None
+
+    def __len__(self):
+        return len(self.exact) + len(self.folded)
+
+    def extract(self, *texts):
+        """Canonical skill names found in `texts`, in order of first appearance."""
+        if self.regex is None:
+            return []
+        found = {}
+        for match in self.regex.finditer('\n'.join(text for text in texts if text)):
+            if match.lastgroup == 'folded':
+                name = self.folded[normalize(match.group()).lower()]
+            else:
+                name = self.exact[normalize(match.group())]
+            found.setdefault(name, None)
+        return list(found)
+
+
+# ----------------------- PROCESS-WIDE CACHE -----------------------
+_extractors = {}
+_extractors_version = None
+_lock = threading.Lock()
+
+
+def skills_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_extractor():
+    """Make every process rebuild its extractor on next use."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate_extractor_on_commit():
+    transaction.on_commit(invalidate_extractor)
+
+
+def get_extractor(extra_names=()):
+    """The SkillExtractor for the current Skill table plus `extra_names`."""
+    global _extractors_version
+    version = skills_version()
+    key = tuple(sorted(extra_names))
+    with _lock:
+        if version != _extractors_version:
+            _extractors.clear()
+            _extractors_version = version
+        extractor = _extractors.get(key)
+    if extractor is None:
+        names = set(Skill.objects.values_list('name', flat=True)).union(extra_names)
+        extractor = SkillExtractor(names)
+        with _lock:
+            if _extractors_version == version:
+                _extractors[key] = extractor
+    return extractor
@@ -0,0 +1,156 @@
+"""
+Synthetic job data for the benchmark commands.
+
+Rows are generated deterministically from a seed and inserted with
+bulk_create under a dedicated JobSource, as pending jobs, so they never
+show up on the site or in the demand counters.
+"""
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .fingerprint import job_fingerprint
+from .models import Company, Job, JobSource, Location, Skill
+
+SKILL_NAMES = [
+    'Python', 'Django', 'Flask', 'FastAPI', 'JavaScript', 'TypeScript', 'React',
+    'Vue', 'Angular', 'Node.js', 'Go', 'Rust', 'Java', 'Kotlin', 'C#', 'C++',
+    'PHP', 'Ruby', 'Rails', 'SQL', 'PostgreSQL', 'MySQL', 'MongoDB', 'Redis',
+    'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Terraform', 'GraphQL',
+    'Machine Learning', 'TensorFlow', 'PyTorch', 'Pandas', 'Spark', 'Kafka',
+]
+
+TITLE_PREFIXES = ['Senior', 'Junior', 'Lead', 'Staff', 'Principal', 'Mid-level', '']
+TITLE_ROLES = [
+    'Backend Engineer', 'Frontend Developer', 'Full Stack Developer', 'Data Engineer',
+    'DevOps Engineer', 'Software Engineer', 'Platform Engineer', 'ML Engineer',
+    'Site Reliability Engineer', 'Mobile Developer', 'Data Scientist',
+]
+
+FILLER = (
+    'we are looking for a motivated engineer to join our distributed team and help us '
+    'build reliable scalable products for customers around the world you will design '
+    'implement test and ship features collaborate with product and design review code '
+    'mentor teammates improve our infrastructure and own services end to end experience '
+    'with modern tooling strong communication remote friendly flexible hours benefits '
+    'health insurance equity learning budget'
+).split()
+
+CURRENCIES = ['USD', 'USD', 'USD', 'EUR', 'GBP']
+EXPERIENCE = [choice for choice, _ in Job.EXPERIENCE_CHOICES]
+JOB_TYPES = [choice for choice, _ in Job.JOB_TYPE_CHOICES]
+
+BENCHMARK_SOURCE = 'Synthetic Benchmark'
+
+
+def description(rng, skills, words=120):
+    """A plausible description of roughly `words` words mentioning `skills`."""
+    text = [rng.choice(FILLER) for _ in range(words)]
+    for skill in skills:
+        text.insert(rng.randrange(len(text)), skill)
+    return ' '.join(text).capitalize() + '.'
+
+
+def listing(rng, i):
+    """One ingest-shaped listing dict (see jobs.ingest)."""
+    skills = rng.sample(SKILL_NAMES, rng.randint(2, 6))
+    salary_min = rng.randrange(40_000, 160_000, 1000)
+    return {
+        'title': f"{rng.choice(TITLE_PREFIXES)} {skills[0]} {rng.choice(TITLE_ROLES)}".strip(),
+        'company': f'Company {rng.randrange(2000)}',
+        'location': (f'City {rng.randrange(200)}', f'Country {rng.randrange(40)}', rng.random() < 0.3),
+        'description': description(rng, skills),
+        'external_url': f'https://example.com/jobs/{i}',
+        'tags': ', '.join(skills[:3]),
+        'skills': skills,
+        'job_type': rng.choice(JOB_TYPES),
+        'experience_level': rng.choice(EXPERIENCE),
+        'salary_min': salary_min,
+        'salary_max': salary_min + rng.randrange(0, 60_000, 1000),
+        'salary_currency': rng.choice(CURRENCIES),
+    }
+
+
+def benchmark_source():
+    source, _ = JobSource.objects.get_or_create(
+        name=BENCHMARK_SOURCE,
+        defaults={'base_url': 'https://example.com', 'is_active': False},
+    )
+    return source
+
+
+def ensure_jobs(n, seed=0, batch_size=5000, status='pending', progress=None):
+    """Make sure the benchmark source holds at least `n` jobs; returns the source."""
+    source = benchmark_source()
+    existing = Job.objects.filter(source=source).count()
+    if existing >= n:
+        return source
+
+    rng = random.Random(seed + existing)
+    companies = list(Company.objects.filter(name__startswith='Synthetic Company '))
+    if not companies:
+        Company.objects.bulk_create([Company(name=f'Synthetic Company {i}') for i in range(500)])
+        companies = list(Company.objects.filter(name__startswith='Synthetic Company '))
+    locations = list(Location.objects.filter(city__startswith='Synthetic City '))
+    if not locations:
+        Location.objects.bulk_create(
+            [Location(city=f'Synthetic City {i}', country=f'Country {i % 40}') for i in range(200)],
+            ignore_conflicts=True,
+        )
+        locations = list(Location.objects.filter(city__startswith='Synthetic City '))
+    Skill.objects.bulk_create([Skill(name=name) for name in SKILL_NAMES], ignore_conflicts=True)
+    skills = {skill.name: skill.pk for skill in Skill.objects.filter(name__in=SKILL_NAMES)}
+
+    today = timezone.now().date()
+    Through = Job.skills.through
+    for start in range(existing, n, batch_size):
+        rows = [listing(rng, i) for i in range(start, min(start + batch_size, n))]
+        with transaction.atomic():
+            picked = [rng.choice(companies) for _ in rows]
+            jobs = Job.objects.bulk_create([
+                Job(
+                    title=row['title'],
+                    company=company,
+                    location=rng.choice(locations),
+                    description=row['description'],
+                    job_type=row['job_type'],
+                    experience_level=row['experience_level'],
+                    salary_min=Decimal(row['salary_min']),
+                    salary_max=Decimal(row['salary_max']),
+                    salary_currency=row['salary_currency'],
+                    tags=row['tags'],
+                    source=source,
+                    external_url=row['external_url'],
+                    status=status,
+                    posted_date=today - timedelta(days=rng.randrange(365)),
+                    fingerprint=job_fingerprint(row['external_url'], row['title'], company.name),
+                )
+                for row, company in zip(rows, picked)
+            ])
+            Through.objects.bulk_create([
+                Through(job_id=job.pk, skill_id=skills[name])
+                for job, row in zip(jobs, rows)
+                for name in row['skills']
+            ])
+        if progress:
+            progress(start + len(rows))
+    return source
+
+
+def delete_jobs(chunk_size=10000):
+    """Remove every benchmark job, a chunk at a time."""
+    source = JobSource.objects.filter(name=BENCHMARK_SOURCE).first()
+    if source is None:
+        return 0
+    deleted = 0
+    while True:
+        ids = list(Job.objects.filter(source=source).values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        Job.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+    return deleted
@@ -0,0 +1,26 @@
+from celery import shared_task
+from django.utils.dateparse import parse_datetime
+
+from . import cooccurrence, tracking
+from .scraper import run_due
+
+
+@shared_task(ignore_result=True)
+def flush_job_views(events):
+    """Write a batch of buffered job views handed over by jobs.tracking in 'celery' mode."""
+    tracking.write_events([
+        (job_id, ip_address, parse_datetime(viewed_at))
+        for job_id, ip_address, viewed_at in events
+    ])
+
+
+@shared_task(ignore_result=True)
+def scrape_due_sources():
+    """Scrape every job source whose scraping_frequency has elapsed (scheduled by CELERY_BEAT_SCHEDULE)."""
+    run_due()
+
+
+@shared_task(ignore_result=True)
+def rebuild_skill_cooccurrence():
+    """Recount the skill co-occurrence matrix from scratch, for what refresh() misses (see jobs/cooccurrence.py)."""
+    cooccurrence.rebuild()
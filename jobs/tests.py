@@ -1,3 +1,1388 @@
-from django.test import TestCase
+import csv
+import hashlib
+import itertools
+import json
+import random
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.forms import modelform_factory
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import numpy as np
+
+from . import caching, cooccurrence, counters, similar, synthetic
+from .ingest import JobIngestor
+from .near_duplicates import merge
+from .export import parquet_available
+from .retag import Checkpoint
+from .salaries import salary_stats
+from .search import search_jobs
+from .skills import SkillExtractor, get_extractor
+from .tracking import ViewBuffer, flush_views, write_events
+from .models import CachedResponse, Company, Job, JobSource, JobView, Location, Skill, SkillCooccurrence
+from .scraper import SCRAPERS, AsyncFetcher, Fetcher, Scraper, ScrapeResult, WeWorkRemotelyScraper, run_due, run_sources
+from .scraper.parse import Field, ListingParser, available_backends
+from .scraper.pipeline import Pipeline, Stage
+from .scraper.scheduler import is_due
+
+TESTDATA = Path(__file__).resolve().parent / 'testdata'
+
+# Buffer job views in memory without the background flush thread
+BUFFERED_VIEWS = override_settings(
+    JOB_VIEW_TRACKING={'MODE': 'local', 'FLUSH_SIZE': 500, 'FLUSH_INTERVAL': 0}
+)
+
+# Recompute cached aggregates on every request
+NO_DATA_CACHE = override_settings(DATA_CACHE_TIMEOUT=0)
+
+
+# ----------------------- LOCAL STUB SERVER -----------------------
+class RecordedPagesHandler(BaseHTTPRequestHandler):
+    """Serve recorded WeWorkRemotely pages: category pages and listing pages, with ETags."""
+
+    routes = {
+        '/categories/': TESTDATA / 'weworkremotely' / 'category.html',
+        '/remote-jobs/': TESTDATA / 'weworkremotely' / 'listing.html',
+    }
+
+    def do_GET(self):
+        for prefix, page in self.routes.items():
+            if self.path.startswith(prefix):
+                body = page.read_bytes()
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServerMixin:
+    """Run a local HTTP server for the test class so scrapers never touch the network."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), RecordedPagesHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+
+# ----------------------- FETCH LAYER -----------------------
+class FetcherTests(StubServerMixin, TestCase):
+
+    def test_fetch_many_keeps_input_order(self):
+        urls = [f'{self.base_url}/categories/{i}' for i in range(5)] + [f'{self.base_url}/missing']
+        with Fetcher(max_workers=4, rate=0) as fetcher:
+            results = list(fetcher.fetch_many(urls))
+
+        self.assertEqual([r.url for r in results], urls)
+        self.assertTrue(all(r.ok for r in results[:5]))
+        self.assertEqual(results[-1].status_code, 404)
+
+    def test_connection_errors_are_returned_not_raised(self):
+        with Fetcher(max_workers=1, rate=0, retries=0) as fetcher:
+            result = fetcher.get('http://127.0.0.1:9/unreachable')
+        self.assertFalse(result.ok)
+        self.assertIsNotNone(result.error)
+
+    async def test_async_fetcher_matches_fetcher(self):
+        urls = [f'{self.base_url}/categories/{i}' for i in range(5)] + [f'{self.base_url}/missing']
+        async with AsyncFetcher(max_workers=4, rate=0, retries=0) as fetcher:
+            results = await fetcher.fetch_many(urls)
+            unreachable = await fetcher.get('http://127.0.0.1:9/unreachable')
+
+        self.assertEqual([r.url for r in results], urls)
+        self.assertTrue(all(r.ok for r in results[:5]))
+        self.assertEqual(results[0].response.content, (TESTDATA / 'weworkremotely' / 'category.html').read_bytes())
+        self.assertEqual(results[0].response.headers['content-type'], 'text/html; charset=utf-8')
+        self.assertEqual(results[-1].status_code, 404)
+        self.assertFalse(unreachable.ok)
+        self.assertIsNotNone(unreachable.error)
+
+    async def test_async_fetcher_refuses_oversized_bodies(self):
+        async with AsyncFetcher(max_workers=1, rate=0, retries=0, max_body=1000) as fetcher:
+            result = await fetcher.get(f'{self.base_url}/categories/')
+        self.assertFalse(result.ok)
+        self.assertIn('bytes', str(result.error))
+
+
+# ----------------------- WEWORKREMOTELY SCRAPER -----------------------
+class ScrapeWeWorkRemotelyTests(StubServerMixin, TestCase):
+
+    def scrape(self, *args):
+        out = StringIO()
+        call_command('scrape_weworkremotely', '--base-url', self.base_url, '--rate', '0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_scrape_creates_pending_jobs_once(self):
+        out = self.scrape()
+        self.assertIn('fetch: 3 items', out)
+
+        # Five listings per page, one without a URL; the other categories repeat the page
+        self.assertEqual(Job.objects.count(), 4)
+        self.assertFalse(Job.objects.exclude(status='pending').exists())
+
+        job = Job.objects.get(title='Senior Python Engineer')
+        self.assertEqual(job.salary_min, 100000)
+        self.assertEqual(job.salary_max, 149999)
+        self.assertEqual(job.external_url, f'{self.base_url}/remote-jobs/acme-data-senior-python-engineer')
+        self.assertIn('Python', job.skills.values_list('name', flat=True))
+
+        # A second run finds nothing new
+        self.scrape()
+        self.assertEqual(Job.objects.count(), 4)
+
+    def test_details_flag_uses_listing_page_description(self):
+        self.scrape('--details')
+        job = Job.objects.get(title='Senior Python Engineer')
+        self.assertIn('ingestion platform', job.description)
+        self.assertTrue(Skill.objects.exists())
+
+    def test_unchanged_pages_are_not_parsed_again(self):
+        self.scrape()
+
+        # The server answers 304 to the ETags sent back
+        with CaptureQueriesContext(connection) as ctx:
+            out = self.scrape()
+        self.assertEqual(out.count('Unchanged since the last run'), 3)
+        # The source, taking its lease, its listing hashes, the cached validators, last_scraped, the lease back
+        self.assertLessEqual(len(ctx.captured_queries), 6)
+
+        # Without validators the body hash gives it away
+        CachedResponse.objects.update(etag='')
+        self.assertEqual(self.scrape().count('Unchanged since the last run'), 3)
+
+    def test_unchanged_listings_are_not_written_again(self):
+        self.scrape('--details')
+        stored = dict(Job.objects.values_list('pk', 'updated_at'))
+
+        # Pages that look changed, listings that are not: no writes, and the
+        # descriptions from the listing pages stay
+        CachedResponse.objects.all().delete()
+        out = self.scrape('--details')
+        self.assertEqual(out.count('Unchanged since the last run'), 0)
+        self.assertEqual(dict(Job.objects.values_list('pk', 'updated_at')), stored)
+        self.assertIn('ingestion platform', Job.objects.get(title='Senior Python Engineer').description)
+
+    def test_pages_a_stage_failed_on_are_parsed_again(self):
+        parse_page = WeWorkRemotelyScraper.parse_page
+        broken = set()
+
+        def fail_on_broken(scraper, result):
+            if result.url in broken or not broken:
+                broken.add(result.url)  # the first page parsed, every time
+                raise ValueError('parser broke')
+            return parse_page(scraper, result)
+
+        for args in [(), ('--async',)]:
+            CachedResponse.objects.all().delete()
+            broken.clear()
+            with mock.patch.object(WeWorkRemotelyScraper, 'parse_page', fail_on_broken):
+                for run in range(2):
+                    JobSource.objects.update(last_scraped=None)
+                    out = self.scrape(*args)
+                    self.assertIn('Pages Failed: 1', out)
+                    self.assertEqual(out.count('Unchanged since the last run'), run * 2, args)
+                    # Scraped all the same: a page that keeps failing doesn't keep the source due
+                    source = JobSource.objects.get(name=WeWorkRemotelyScraper.name)
+                    self.assertFalse(is_due(source))
+
+            # The failed page comes back in full, the other two as unchanged
+            out = self.scrape(*args)
+            self.assertEqual(out.count('Unchanged since the last run'), 2, args)
+            self.assertIn('Pages Failed: 0', out)
+            self.assertEqual(Job.objects.count(), 4)
+
+    def test_async_scrape_stores_the_same_jobs(self):
+        self.scrape('--async', '--details')
+        self.assertEqual(Job.objects.count(), 4)
+        self.assertIn('ingestion platform', Job.objects.get(title='Senior Python Engineer').description)
+
+        # The validators it saved make the threaded run skip every page, and back
+        self.assertEqual(self.scrape().count('Unchanged since the last run'), 3)
+        self.assertEqual(self.scrape('--async').count('Unchanged since the last run'), 3)
+        self.assertEqual(Job.objects.count(), 4)
+
+
+# ----------------------- HTML PARSING -----------------------
+class ListingParserTests(TestCase):
+
+    def test_backends_extract_the_same_fields(self):
+        page = (TESTDATA / 'weworkremotely' / 'category.html').read_bytes()
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                listings = ListingParser(
+                    WeWorkRemotelyScraper.LISTING_CONTAINER, WeWorkRemotelyScraper.LISTING_FIELDS, backend=backend
+                ).parse(page)
+                self.assertEqual(len(listings), 5)
+                self.assertEqual(listings[0], {
+                    'title': 'Senior Python Engineer',
+                    'company': 'Acme Data',  # the badge after the name is left out
+                    'location': 'Anywhere in the World',
+                    'link': '/remote-jobs/acme-data-senior-python-engineer',
+                    'categories': ['Featured', 'Full-Time', '$100,000 - $149,999 USD'],
+                })
+                self.assertEqual(listings[2]['view_link'], '/remote-jobs/cloudline-backend-go-engineer')
+                self.assertNotIn('link', listings[3])
+
+    def test_backends_agree_on_untidy_markup(self):
+        page = (
+            '<meta charset="latin-1"><ul><li class="job"><b class="t">Caf\xe9 &amp; Bar<br>Staff</b>'
+            '<i class="t">second</i></span><p class="d">one<p class="d">two</li>'
+            '<li class="job"><a class="u" href="/x">link</a></li></ul>'
+        ).encode('latin-1')
+        fields = {'title': Field('b.t', mode='lines'), 'text': Field('.t', many=True), 'url': Field('a.u', attr='href')}
+        results = {
+            backend: ListingParser('li.job', fields, backend=backend).parse(page) for backend in available_backends()
+        }
+        expected = [{'title': 'Caf\xe9 & Bar\nStaff', 'text': ['Caf\xe9 & BarStaff', 'second']}, {'url': '/x'}]
+        for backend, listings in results.items():
+            self.assertEqual(listings, expected, backend)
+
+
+# ----------------------- SCRAPE PIPELINE -----------------------
+class PipelineTests(TestCase):
+
+    def test_stages_overlap_within_bounded_queues(self):
+        def double(n):
+            if n == 7:
+                raise ValueError('bad item')
+            return 2 * n
+
+        written = []
+
+        def write(n):
+            time.sleep(0.001)  # the slowest stage: the others wait on it
+            written.append(n)
+
+        pipeline = Pipeline([
+            Stage('double', double, workers=3, queue_size=2),
+            Stage('skip odd tens', lambda n: None if n % 20 == 10 else n, workers=2, queue_size=2),
+            Stage('write', write, queue_size=1),
+        ], log=lambda message: None)
+        pipeline.run(range(100))
+
+        self.assertEqual(sorted(written), [2 * n for n in range(100) if n != 7 and (2 * n) % 20 != 10])
+        double_stats, skip_stats, write_stats = pipeline.metrics
+        self.assertEqual((double_stats.items, double_stats.emitted, double_stats.errors), (100, 99, 1))
+        self.assertEqual((skip_stats.items, skip_stats.emitted), (99, len(written)))
+        self.assertEqual(write_stats.items, len(written))
+        for stage, stats in zip(pipeline.stages, pipeline.metrics):
+            self.assertLessEqual(stats.max_depth, stage.queue_size)
+
+    def test_failed_write_stops_an_endless_input(self):
+        def write(n):
+            if n == 50:
+                raise RuntimeError('disk full')
+
+        pipeline = Pipeline([Stage('pass', lambda n: n, workers=2), Stage('write', write)])
+        with self.assertRaisesMessage(RuntimeError, 'disk full'):
+            pipeline.run(itertools.count())
+        self.assertEqual(pipeline.metrics[-1].errors, 1)
+
+
+# ----------------------- SCRAPE SCHEDULER -----------------------
+class ScrapeSchedulerTests(StubServerMixin, TestCase):
+
+    def test_only_due_sources_are_scraped(self):
+        source = JobSource.objects.create(
+            name='WeWorkRemotely', base_url=self.base_url, scraping_frequency=24,
+            last_scraped=timezone.now() - timedelta(hours=23),
+        )
+        self.assertEqual(run_due(rate=0), [])
+        self.assertFalse(Job.objects.exists())
+
+        JobSource.objects.filter(pk=source.pk).update(last_scraped=timezone.now() - timedelta(hours=25))
+        [result] = run_due(rate=0)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.created, 4)
+        source.refresh_from_db()
+        self.assertGreater(source.last_scraped, timezone.now() - timedelta(minutes=1))
+
+        # Just scraped: the next cycle leaves it alone
+        self.assertEqual(run_due(rate=0), [])
+
+    def test_a_source_is_scraped_by_one_process_at_a_time(self):
+        source = JobSource.objects.create(name='WeWorkRemotely', base_url=self.base_url)
+        # Another process (or host) holds the lease
+        JobSource.objects.filter(pk=source.pk).update(scrape_started_at=timezone.now())
+        [result] = run_sources([source], rate=0)
+        self.assertEqual(str(result.error), 'already running')
+        self.assertFalse(Job.objects.exists())
+
+        # ...and died three hours ago
+        JobSource.objects.filter(pk=source.pk).update(scrape_started_at=timezone.now() - timedelta(hours=3))
+        [result] = run_sources([source], rate=0)
+        self.assertTrue(result.ok)
+        self.assertEqual(result.created, 4)
+        source.refresh_from_db()
+        self.assertIsNone(source.scrape_started_at)
+
+    def test_independent_sources_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        class Waiting(Scraper):
+            def run(self):
+                barrier.wait()  # broken unless the other source is running at the same time
+                return ScrapeResult(self.source.name)
+
+        for name in ('Board A', 'Board B'):
+            SCRAPERS[name] = type(name, (Waiting,), {'name': name})
+            self.addCleanup(SCRAPERS.pop, name)
+        sources = [JobSource.objects.create(name=name, base_url='https://example.com') for name in ('Board A', 'Board B')]
+
+        results = run_sources(sources, workers=2)
+        self.assertEqual([r.source for r in results], ['Board A', 'Board B'])
+        self.assertTrue(all(r.ok for r in results), results)
+
+
+# ----------------------- BULK INGESTION -----------------------
+class JobIngestorTests(TestCase):
+
+    def listing(self, i, company='Acme'):
+        return {
+            'title': f'Engineer {i}',
+            'company': company,
+            'location': ('Remote', 'Worldwide', True),
+            'description': 'Build things.',
+            'external_url': f'https://example.com/jobs/{i}',
+            'skills': ['Python', 'Django'] if i % 2 else ['Go'],
+        }
+
+    def flush_queries(self, listings):
+        ingestor = JobIngestor(batch_size=len(listings))
+        ingestor.pending.extend(listings)
+        with CaptureQueriesContext(connection) as ctx:
+            ingestor.flush()
+        return len(ctx.captured_queries)
+
+    def test_batch_query_count_does_not_grow_with_batch_size(self):
+        small = self.flush_queries([self.listing(i, company=f'Company {i % 7}') for i in range(10)])
+        Job.objects.all().delete()
+        Company.objects.all().delete()
+        Skill.objects.all().delete()
+        Location.objects.all().delete()
+        large = self.flush_queries([self.listing(i, company=f'Company {i % 7}') for i in range(40)])
+
+        self.assertEqual(small, large)
+        self.assertEqual(Job.objects.count(), 40)
+        self.assertEqual(Job.skills.through.objects.count(), 60)
+
+    def test_duplicates_are_skipped_across_and_within_batches(self):
+        ingestor = JobIngestor(batch_size=3)
+        ingestor.extend([self.listing(1), self.listing(2), self.listing(1)])
+        ingestor.extend([self.listing(2), self.listing(3)])
+        ingestor.flush()
+
+        self.assertEqual(Job.objects.count(), 3)
+        self.assertEqual(ingestor.skipped, 2)
+
+    def test_fingerprint_ignores_tracking_params_and_case_but_not_the_url(self):
+        same = dict(self.listing(1), title='ENGINEER  1', external_url='https://www.example.com/jobs/1/?utm_source=x')
+        other = dict(self.listing(1), external_url='https://example.com/jobs/1b')
+        ingestor = JobIngestor()
+        ingestor.extend([self.listing(1), same, other])
+        ingestor.flush()
+
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(ingestor.skipped, 1)
+
+    def test_model_forms_reject_duplicates_instead_of_failing_on_insert(self):
+        ingestor = JobIngestor()
+        ingestor.extend([self.listing(1)])
+        ingestor.flush()
+        job = Job.objects.get()
+        source = JobSource.objects.create(name='Admin', base_url='https://example.com')
+        JobForm = modelform_factory(Job, fields='__all__')  # as the admin builds it
+        data = {
+            'title': 'Engineer 1', 'company': job.company_id, 'description': 'Other words.', 'job_type': 'full_time',
+            'experience_level': 'mid', 'external_url': 'https://example.com/jobs/1?ref=feed', 'status': 'pending',
+            'posted_date': job.posted_date, 'views': 0, 'location': job.location_id, 'source': source.pk,
+        }
+
+        form = JobForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('already exists', form.non_field_errors()[0])
+        form = JobForm(dict(data, title='Engineer 2'))
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        # Edits of a stored job keep its fingerprint
+        self.assertTrue(JobForm(dict(data, title='Engineer 2', description='Edited.'), instance=form.instance).is_valid())
+
+    def test_rescrape_refreshes_changed_jobs_and_skips_unchanged_ones(self):
+        ingestor = JobIngestor(status='approved')
+        ingestor.extend([self.listing(i) for i in range(4)])
+        ingestor.flush()
+        job = Job.objects.get(title='Engineer 1')
+        job.views = 7
+        job.save(update_fields=['views'])
+
+        changed = dict(self.listing(1), description='Build more things.', salary_max=150000, skills=['Python', 'Rust'])
+        rescrape = JobIngestor()
+        rescrape.extend([self.listing(0), changed, self.listing(2), self.listing(3)])
+        rescrape.flush()
+
+        self.assertEqual(Job.objects.count(), 4)
+        self.assertEqual((len(rescrape.created), len(rescrape.updated), rescrape.skipped), (0, 1, 3))
+        job.refresh_from_db()
+        self.assertEqual((job.description, job.salary_max, job.status, job.views), ('Build more things.', 150000, 'approved', 7))
+        self.assertEqual(sorted(job.skills.values_list('name', flat=True)), ['Django', 'Python', 'Rust'])
+        for model in counters.counter_models():
+            self.assertEqual(counters.find_drift(model), {})
+
+        # Nothing changed: lookups only
+        again = JobIngestor()
+        again.extend([self.listing(0), changed, self.listing(2), self.listing(3)])
+        with CaptureQueriesContext(connection) as ctx:
+            again.flush()
+        self.assertEqual(again.skipped, 4)
+        self.assertFalse([q for q in ctx.captured_queries if not q['sql'].lstrip().upper().startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))])
+
+
+# ----------------------- SKILL EXTRACTION -----------------------
+class SkillExtractorTests(TestCase):
+
+    def test_matches_whole_words_only(self):
+        extractor = SkillExtractor([
+            'Go', 'Java', 'JavaScript', 'C', 'C++', 'C#', 'Node.js', 'React', 'React Native', 'Machine Learning',
+        ])
+        self.assertEqual(extractor.extract('Google is ready to go with Javanese coffee'), [])
+        self.assertEqual(extractor.extract('Go and Java, not JavaScript'), ['Go', 'Java', 'JavaScript'])
+        self.assertEqual(extractor.extract('C++ / C# (no plain C)'), ['C++', 'C#', 'C'])
+        self.assertEqual(
+            extractor.extract('React Native dev', 'node.js, golang', 'machine-learning'),
+            ['React Native', 'Node.js', 'Go', 'Machine Learning'],
+        )
+
+    def test_extractor_follows_the_skill_table(self):
+        cache.clear()
+        Skill.objects.create(name='Python')
+        self.assertEqual(get_extractor().extract('Python and Terraform'), ['Python'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Terraform')
+        self.assertEqual(get_extractor().extract('Python and Terraform'), ['Python', 'Terraform'])
+        self.assertEqual(get_extractor(['Rust']).extract('Rust, Python'), ['Rust', 'Python'])
+
+
+# ----------------------- RETAGGING -----------------------
+class RetagJobsTests(TestCase):
+
+    def setUp(self):
+        self.python = Skill.objects.create(name='Python')
+        self.go = Skill.objects.create(name='Go')
+        self.company = Company.objects.create(name='Acme')
+
+    def add_jobs(self, n, description='Python services, written at Google'):
+        start = Job.objects.count()
+        for i in range(start, start + n):
+            job = Job.objects.create(
+                title=f'Engineer {i}', company=self.company, description=description,
+                external_url='https://example.com', status='approved',
+                posted_date=timezone.now().date(),
+            )
+            job.skills.add(self.go)  # stale tag: "Google" is not Go
+
+    def retag(self, *args):
+        out = StringIO()
+        call_command('retag_jobs', '--chunk-size', '5', *args, stdout=out)
+        return out.getvalue()
+
+    def test_applies_only_the_difference_and_keeps_counters(self):
+        self.add_jobs(3)
+        self.assertIn('+3 -3', self.retag())
+        self.assertEqual(
+            set(Job.skills.through.objects.values_list('skill_id', flat=True)), {self.python.pk}
+        )
+        for model in counters.counter_models():
+            self.assertEqual(counters.find_drift(model), {})
+        self.assertIn('+0 -0', self.retag())
+
+        # --add-only and --skill narrow the diff
+        Job.objects.first().skills.add(self.go)
+        self.assertIn('+0 -0', self.retag('--add-only'))
+        self.assertIn('+0 -0', self.retag('--skill', 'Python'))
+
+    def test_queries_per_chunk_do_not_grow_with_jobs(self):
+        def queries(n):
+            Job.objects.all().delete()
+            self.add_jobs(n)
+            with CaptureQueriesContext(connection) as ctx:
+                self.retag('--chunk-size', str(n))
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries(3), queries(30))
+
+    def test_resumes_from_checkpoint_and_runs_in_worker_processes(self):
+        self.add_jobs(4)
+        first, second = Job.objects.order_by('pk').values_list('pk', flat=True)[:2]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'retag.json'
+            Checkpoint(str(path), {
+                'since': None, 'until': None, 'source': None, 'skills': None, 'add_only': False,
+            }).save(second)
+
+            out = self.retag('--checkpoint', str(path), '--workers', '2')
+            self.assertIn(f'Resuming after job #{second}', out)
+            self.assertIn('+2 -2', out)
+            self.assertFalse(path.exists())
+
+        self.assertEqual(list(Job.objects.get(pk=first).skills.all()), [self.go])
+
+
+# ----------------------- NEAR DUPLICATES -----------------------
+class NearDuplicateTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme')
+        self.rng = random.Random(0)
+        self.text = synthetic.description(self.rng, ['Python', 'Django'])
+
+    def add_job(self, title, description, source=None, **kwargs):
+        return Job.objects.create(
+            title=title, company=self.company, description=description, source=source,
+            external_url=f'https://{source or "example"}.com/{Job.objects.count()}',
+            posted_date=timezone.now().date(), **kwargs
+        )
+
+    def find(self, *args):
+        out = StringIO()
+        call_command('find_near_duplicates', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reworded_postings_are_flagged_against_the_oldest_job(self):
+        original = self.add_job('Senior Python Engineer', self.text)
+        other = JobSource.objects.create(name='Other board', base_url='https://other.example.com')
+        reworded = self.add_job('Python Engineer (Remote)', self.text.replace('team', 'group', 1), source=other)
+        unrelated = self.add_job('Senior Python Engineer', synthetic.description(self.rng, ['Python', 'Django']))
+        self.assertIn('flagged 1 near-duplicate', self.find())
+
+        # Incremental: only the new job is checked, and it joins the existing cluster
+        repost = self.add_job('Python Engineer', self.text + ' Apply now.')
+        self.assertIn('Indexed 1 job(s)', self.find())
+        self.assertEqual(
+            dict(Job.objects.values_list('pk', 'duplicate_of')),
+            {original.pk: None, reworded.pk: original.pk, unrelated.pk: None, repost.pk: original.pk},
+        )
+
+    def test_lookup_queries_do_not_grow_with_the_index(self):
+        def queries(n):
+            for _ in range(n):
+                self.add_job('Engineer', synthetic.description(self.rng, ['Go']))
+            self.find()
+            self.add_job('Engineer', synthetic.description(self.rng, ['Rust']))
+            with CaptureQueriesContext(connection) as ctx:
+                self.find()
+            return len(ctx.captured_queries)
+
+        self.assertEqual(queries(2), queries(20))
+
+    def test_merge_moves_skills_and_deactivates_duplicates(self):
+        python, go = Skill.objects.create(name='Python'), Skill.objects.create(name='Go')
+        original = self.add_job('Python Engineer', self.text, status='approved')
+        original.skills.add(python)
+        duplicate = self.add_job('Python Engineer', self.text + ' Go.', status='approved')
+        duplicate.skills.add(python, go)
+        self.find()
+
+        self.assertEqual(merge(Job.objects.all()), 1)
+        duplicate.refresh_from_db()
+        self.assertFalse(duplicate.is_active)
+        self.assertEqual(set(original.skills.all()), {python, go})
+        for model in counters.counter_models():
+            self.assertEqual(counters.find_drift(model), {})
+
+
+# ----------------------- DEMAND COUNTERS -----------------------
+class DemandCounterTests(TestCase):
+
+    def setUp(self):
+        self.company = Company.objects.create(name='Acme')
+        self.other_company = Company.objects.create(name='Globex')
+        self.location = Location.objects.create(city='Remote', country='Worldwide', is_remote=True)
+        self.python = Skill.objects.create(name='Python')
+        self.django = Skill.objects.create(name='Django')
+        self.job_numbers = itertools.count()
+
+    def make_job(self, status='pending', **kwargs):
+        job = Job.objects.create(
+            title='Engineer', company=self.company, location=self.location,
+            description='...', external_url=f'https://example.com/jobs/{next(self.job_numbers)}',
+            status=status, posted_date=timezone.now().date(), **kwargs
+        )
+        job.skills.add(self.python, self.django)
+        return job
+
+    def assertCounts(self, company, location, python, django):
+        for obj, expected in [(self.company, company), (self.location, location),
+                              (self.python, python), (self.django, django)]:
+            obj.refresh_from_db()
+            self.assertEqual(obj.job_count, expected, obj)
+
+    def assertNoDrift(self):
+        for model in counters.counter_models():
+            self.assertEqual(counters.find_drift(model), {}, model)
+
+    def test_save_approve_deactivate(self):
+        job = self.make_job()
+        self.assertCounts(0, 0, 0, 0)
+
+        job.status = 'approved'
+        job.save()
+        self.assertCounts(1, 1, 1, 1)
+
+        job.is_active = False
+        job.save(update_fields=['is_active'])
+        self.assertCounts(0, 0, 0, 0)
+        self.assertNoDrift()
+
+    def test_retagging_and_moving_an_approved_job(self):
+        job = self.make_job(status='approved')
+        self.assertCounts(1, 1, 1, 1)
+
+        job.skills.remove(self.django)
+        self.assertCounts(1, 1, 1, 0)
+
+        job.skills.clear()
+        self.python.jobs.add(job)
+        self.assertCounts(1, 1, 1, 0)
+
+        job.company = self.other_company
+        job.save()
+        self.assertCounts(0, 1, 1, 0)
+        self.assertNoDrift()
+
+    def test_bulk_admin_actions_use_counter_aware_update(self):
+        jobs = [self.make_job() for _ in range(3)]
+
+        Job.objects.filter(pk__in=[j.pk for j in jobs]).update(status='approved')
+        self.assertCounts(3, 3, 3, 3)
+
+        Job.objects.filter(pk=jobs[0].pk).update(status='rejected')
+        self.assertCounts(2, 2, 2, 2)
+
+        Job.objects.filter(pk=jobs[1].pk).update(company=self.other_company)
+        self.assertCounts(1, 2, 2, 2)
+        self.assertNoDrift()
+
+    def test_admin_lists_show_the_counters(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.make_job(status='approved')
+        self.make_job()
+
+        for url in ('/admin/jobs/company/', '/admin/jobs/skill/', '/admin/jobs/location/'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertContains(response, 'Approved jobs')
+            self.assertContains(response, '<td class="field-job_count">1</td>', html=True)
+            # Read from the rows themselves, not counted per row
+            self.assertFalse([q for q in ctx.captured_queries if '"jobs_job"' in q['sql']], url)
+
+    def test_delete_and_rebuild(self):
+        job = self.make_job(status='approved')
+        self.make_job(status='approved')
+        job.delete()
+        self.assertCounts(1, 1, 1, 1)
+
+        Skill.objects.filter(pk=self.python.pk).update(job_count=42)
+        out = StringIO()
+        call_command('rebuild_demand_counters', stdout=out)
+        self.assertIn('Reconciled 1 counter(s)', out.getvalue())
+        self.assertNoDrift()
+
+
+# ----------------------- API QUERY COUNTS -----------------------
+@BUFFERED_VIEWS
+@NO_DATA_CACHE
+class ApiQueryCountTests(TestCase):
+    """Every /api/ route must cost the same number of queries however many rows it returns."""
+
+    maxDiff = None
+
+    def setUp(self):
+        self.source = JobSource.objects.create(name='Stub', base_url='https://example.com')
+        self.company = Company.objects.create(name='Acme')
+        self.location = Location.objects.create(city='Berlin', country='Germany')
+        self.job = self.add_jobs(2)[0]
+
+    def add_jobs(self, n):
+        """Add n approved jobs, each with two fresh skills, plus one more skill on self.job."""
+        jobs = []
+        for _ in range(n):
+            i = Job.objects.count()
+            company = Company.objects.create(name=f'Company {i}')
+            location = Location.objects.create(city=f'City {i}', country='Germany')
+            job = Job.objects.create(
+                title=f'Python Engineer {i}', company=company, location=location,
+                description='...', external_url=f'https://example.com/jobs/{i}',
+                source=self.source, status='approved', posted_date=timezone.now().date(),
+            )
+            skills = [Skill.objects.create(name=f'Skill {i}-{k}') for k in range(2)]
+            job.skills.add(*skills)
+            jobs.append(job)
+        if hasattr(self, 'job'):
+            self.job.skills.add(Skill.objects.create(name=f'Extra {Skill.objects.count()}'))
+        return jobs
+
+    def routes(self):
+        skill = self.job.skills.first()
+        return [
+            '/api/',
+            '/api/companies/', f'/api/companies/{self.job.company_id}/',
+            '/api/skills/', f'/api/skills/{skill.pk}/', '/api/skills/top_demanded/',
+            '/api/locations/', f'/api/locations/{self.job.location_id}/',
+            '/api/jobs/', f'/api/jobs/{self.job.pk}/',
+            '/api/jobs/recent_jobs/', '/api/jobs/filter_by_skill/?skill=skill',
+            '/api/jobs/filter_by_location/?country=germany',
+            '/api/sources/', f'/api/sources/{self.source.pk}/',
+            '/api/async/jobs/', f'/api/async/jobs/{self.job.pk}/', '/api/async/skills/top_demanded/',
+        ]
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_independent_of_row_count(self):
+        routes = self.routes()
+        before = {url: self.count_queries(url) for url in routes}
+        self.add_jobs(6)
+        after = {url: self.count_queries(url) for url in routes}
+        self.assertEqual(before, after)
+
+    def test_job_lists_cost_the_same_at_any_page_size(self):
+        self.add_jobs(6)
+        for url in ['/api/jobs/', '/api/async/jobs/', '/api/jobs/recent_jobs/', '/api/jobs/filter_by_skill/?skill=skill',
+                    '/api/jobs/filter_by_location/?country=germany', '/api/jobs/?ordering=views']:
+            separator = '&' if '?' in url else '?'
+            counts = {size: self.count_queries(f'{url}{separator}page_size={size}') for size in (1, 3, 100)}
+            self.assertEqual(set(counts.values()), {2}, url)  # the page, then its skills
+
+    def test_plans_load_only_what_the_serializers_read(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/jobs/')
+        self.assertNotIn('description', ctx.captured_queries[0]['sql'])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/jobs/{self.job.pk}/')
+        for internal in ('search_vector', 'fingerprint', 'listing_hash', 'duplicate_of'):
+            self.assertNotIn(internal, response.data)
+        self.assertEqual(response.data['source_name'], 'Stub')
+
+    def test_job_counts_come_from_counters_and_annotations(self):
+        response = self.client.get(f'/api/jobs/{self.job.pk}/')
+        self.assertEqual(response.data['company']['job_count'], 1)
+        self.assertEqual([s['job_count'] for s in response.data['skills']], [1, 1])
+
+        response = self.client.get('/api/sources/')
+        self.assertEqual(response.data['results'][0]['job_count'], 2)
+
+        # Writes respond with the count too
+        response = self.client.post('/api/sources/', {'name': 'New', 'base_url': 'https://example.org'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['job_count'], 0)
+        response = self.client.patch(
+            f'/api/sources/{self.source.pk}/', {'scraping_frequency': 12}, content_type='application/json'
+        )
+        self.assertEqual((response.data['scraping_frequency'], response.data['job_count']), (12, 2))
+
+    async def test_async_endpoints_return_what_the_drf_ones_do(self):
+        await sync_to_async(self.add_jobs)(3)
+        for sync_url, async_url in [
+            ('/api/jobs/?page_size=2', '/api/async/jobs/?page_size=2&count=1'),
+            (f'/api/jobs/{self.job.pk}/', f'/api/async/jobs/{self.job.pk}/'),
+            ('/api/skills/top_demanded/', '/api/async/skills/top_demanded/'),
+        ]:
+            expected = (await self.async_client.get(sync_url)).json()
+            response = await self.async_client.get(async_url)
+            self.assertEqual(response.status_code, 200, async_url)
+            if 'results' not in expected:
+                self.assertEqual(response.json(), expected, async_url)
+                continue
+
+            data = response.json()
+            self.assertEqual(data['count'], 5)
+            self.assertEqual(data['results'], expected['results'])
+
+            # Its cursors walk the same pages
+            next_page = (await self.async_client.get(data['next'])).json()
+            expected = (await self.async_client.get(expected['next'])).json()
+            self.assertEqual(next_page['results'], expected['results'])
+            self.assertIn('/api/async/jobs/', next_page['previous'])
+
+        self.assertEqual((await self.async_client.get('/api/async/jobs/0/')).status_code, 404)
+        self.assertEqual((await self.async_client.get('/api/async/jobs/?cursor=nope')).status_code, 404)
+
+
+# ----------------------- PAGINATION -----------------------
+class JobPaginationTests(TestCase):
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme')
+        today = timezone.now().date()
+        for i in range(7):
+            Job.objects.create(
+                title=f'Engineer {i}', company=company, description='...', views=i % 3,
+                external_url='https://example.com', status='approved',
+                posted_date=today - timedelta(days=i // 3),
+            )
+        # Ties on the whole (posted_date, scraped_at) prefix leave only the id to order by
+        Job.objects.update(scraped_at=timezone.now())
+        self.expected = list(Job.objects.values_list('pk', flat=True))
+
+    def walk(self, url, key='next'):
+        seen, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([job['id'] for job in response.data['results']])
+            seen += pages[-1]
+            url = response.data[key]
+        return seen, pages
+
+    def test_cursor_walks_every_job_once_in_both_directions(self):
+        with CaptureQueriesContext(connection) as ctx:
+            seen, pages = self.walk('/api/jobs/?page_size=3')
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertFalse(any('COUNT(' in query['sql'] for query in ctx.captured_queries))
+
+        last = self.client.get('/api/jobs/?page_size=3').data
+        while last['next']:
+            last = self.client.get(last['next']).data
+        back, _ = self.walk(last['previous'], key='previous')
+        self.assertEqual(back, self.expected[3:6] + self.expected[:3])
+
+    def test_other_orderings_page_by_offset(self):
+        expected = list(Job.objects.order_by('views', '-id').values_list('pk', flat=True))
+        seen, _ = self.walk('/api/jobs/?page_size=2&ordering=views')
+        self.assertEqual(seen, expected)
+
+        response = self.client.get('/api/jobs/?page_size=2&count=1')
+        self.assertEqual(response.data['count'], 7)
+        self.assertNotIn('count=', response.data['next'])
+
+    def test_actions_and_browse_page_are_paginated(self):
+        response = self.client.get('/api/jobs/recent_jobs/?page_size=5')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get('/jobs/', {'search': 'engineer'})
+        self.assertEqual(len(response.context['jobs']), 7)
+        self.assertFalse(response.context['jobs'].has_next)
+
+    def test_actions_list_each_job_once_and_can_stream(self):
+        python, pandas = Skill.objects.create(name='Python'), Skill.objects.create(name='Pandas')
+        for job in Job.objects.all():
+            job.skills.add(python, pandas)  # both match ?skill=p
+
+        response = self.client.get('/api/jobs/filter_by_skill/', {'skill': 'p', 'page_size': 100})
+        self.assertEqual([job['id'] for job in response.data['results']], self.expected)
+
+        # One query for the rows plus one skills prefetch per 500-row chunk
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/jobs/filter_by_skill/', {'skill': 'p', 'stream': 1})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['id'] for line in lines], self.expected)
+        self.assertEqual(json.loads(lines[0])['skills_list'], ['Pandas', 'Python'])
+
+    def test_invalid_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/jobs/?cursor=nonsense').status_code, 404)
+        self.assertEqual(self.client.get('/jobs/?cursor=nonsense').status_code, 404)
+
+
+# ----------------------- SEARCH -----------------------
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        acme = Company.objects.create(name='Acme')
+        kafka_co = Company.objects.create(name='Kafka Systems')
+        for title, company, tags, description in [
+            ('Office Manager', acme, '', 'Keeps the lights on.'),
+            ('Backend Engineer', acme, '', 'Our stack uses Kafka heavily.'),
+            ('Data Engineer', kafka_co, '', 'Pipelines.'),
+            ('Platform Engineer', acme, 'Kafka, Go', 'Streams.'),
+            ('Kafka Engineer', acme, '', 'Streams.'),
+        ]:
+            Job.objects.create(
+                title=title, company=company, tags=tags, description=description,
+                external_url='https://example.com', status='approved',
+                posted_date=timezone.now().date(),
+            )
+
+    def test_ranks_title_over_tags_over_company_over_description(self):
+        titles = [job.title for job in search_jobs(Job.objects.all(), 'kafka')]
+        self.assertEqual(titles, ['Kafka Engineer', 'Platform Engineer', 'Data Engineer', 'Backend Engineer'])
+
+    def test_last_word_matches_as_a_prefix(self):
+        titles = [job.title for job in search_jobs(Job.objects.all(), 'kaf')]
+        self.assertEqual(titles, ['Kafka Engineer', 'Platform Engineer', 'Data Engineer', 'Backend Engineer'])
+
+    def test_only_the_newest_matches_are_ranked(self):
+        newest = sorted(job.title for job in search_jobs(Job.objects.all(), 'engineer', ranked=2))
+        self.assertEqual(newest, ['Kafka Engineer', 'Platform Engineer'])
+        self.assertEqual(search_jobs(Job.objects.all(), 'engineer', ranked=None).count(), 4)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'full-text search needs PostgreSQL')
+    def test_full_text_query_syntax(self):
+        search = lambda query: sorted(job.title for job in search_jobs(Job.objects.all(), query))
+        self.assertEqual(search('streams kaf'), ['Kafka Engineer', 'Platform Engineer'])
+        self.assertEqual(search('engineer -streams'), ['Backend Engineer', 'Data Engineer'])
+        self.assertEqual(search('"data engineer"'), ['Data Engineer'])
+        self.assertEqual(search('pipelines or lights'), ['Data Engineer', 'Office Manager'])
+
+    def test_api_and_browse_page_use_search(self):
+        response = self.client.get('/api/jobs/', {'search': 'kafka', 'count': 1})
+        self.assertEqual(response.data['results'][0]['title'], 'Kafka Engineer')
+        self.assertEqual(response.data['count'], 4)
+
+        response = self.client.get('/jobs/', {'search': 'kafka'})
+        self.assertContains(response, 'Kafka Engineer')
+        self.assertNotContains(response, 'Office Manager')
+
+
+# ----------------------- VIEW TRACKING -----------------------
+@BUFFERED_VIEWS
+class ViewTrackingTests(TestCase):
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme')
+        self.jobs = [
+            Job.objects.create(
+                title=f'Engineer {i}', company=company, description='...',
+                external_url='https://example.com', status='approved',
+                posted_date=timezone.now().date(),
+            )
+            for i in range(2)
+        ]
+
+    def test_detail_views_are_buffered_then_written_in_one_batch(self):
+        job = self.jobs[0]
+        for _ in range(3):
+            response = self.client.get(f'/api/jobs/{job.pk}/')
+        self.client.get(f'/jobs/{job.pk}/', REMOTE_ADDR='10.0.0.1')
+
+        # Nothing is written on the request path; the response counts its own view
+        self.assertEqual(response.data['views'], 1)
+        self.assertEqual(JobView.objects.count(), 0)
+
+        flush_views()
+        job.refresh_from_db()
+        self.assertEqual(job.views, 4)
+        self.assertEqual(JobView.objects.filter(job=job).count(), 4)
+        self.assertTrue(JobView.objects.filter(ip_address='10.0.0.1').exists())
+
+    def test_write_events_groups_increments_and_skips_deleted_jobs(self):
+        now = timezone.now()
+        first, second = self.jobs
+        events = [(first.pk, None, now)] * 2 + [(second.pk, None, now)] * 2 + [(999999, None, now)]
+
+        # existing-job lookup, insert, one UPDATE for the shared count of 2 (plus savepoint)
+        with self.assertNumQueries(5):
+            write_events(events)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.views, second.views), (2, 2))
+        self.assertEqual(JobView.objects.count(), 4)
+
+    def test_buffer_flushes_when_full(self):
+        batches = []
+        buffer = ViewBuffer(batches.append, flush_size=3, flush_interval=0)
+        for job_id in [1, 2, 3, 4]:
+            buffer.record(job_id)
+
+        self.assertEqual([[e[0] for e in batch] for batch in batches], [[1, 2, 3]])
+        buffer.stop()
+        self.assertEqual(len(batches), 2)
+
+
+# ----------------------- DATA CACHE -----------------------
+class DataCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.job = Job.objects.create(
+            title='Python Engineer', company=Company.objects.create(name='Acme'),
+            description='...', external_url='https://example.com', status='approved',
+            posted_date=timezone.now().date(),
+        )
+        self.job.skills.add(Skill.objects.create(name='Python'))
+
+    def test_aggregates_are_served_from_cache(self):
+        self.client.get('/')
+        self.client.get('/api/skills/top_demanded/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertContains(response, 'Python Engineer')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/skills/top_demanded/')
+        self.assertEqual(response.data[0]['job_count'], 1)
+
+    def test_job_changes_invalidate_after_commit(self):
+        self.client.get('/api/skills/top_demanded/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.filter(pk=self.job.pk).update(status='rejected')
+
+        response = self.client.get('/api/skills/top_demanded/')
+        self.assertEqual(response.data[0]['job_count'], 0)
+
+    def test_views_only_updates_keep_the_cache(self):
+        generation = caching.current_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            write_events([(self.job.pk, None, timezone.now())])
+            self.job.save(update_fields=['views'])
+        self.assertEqual(caching.current_generation(), generation)
+
+    def test_stale_value_is_served_while_another_request_recomputes(self):
+        self.assertEqual(caching.cached('demo', lambda: 'old'), 'old')
+        caching.invalidate()
+
+        cache.add(caching.make_key('demo') + ':lock', 1)
+        self.assertEqual(caching.cached('demo', lambda: 'new'), 'old')
+
+        cache.delete(caching.make_key('demo') + ':lock')
+        self.assertEqual(caching.cached('demo', lambda: 'new'), 'new')
+        self.assertEqual(caching.cached('demo', lambda: 'newer'), 'new')
+
+
+# ----------------------- SALARY ANALYTICS -----------------------
+class SalaryStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Acme')
+        self.python = Skill.objects.create(name='Python')
+        self.today = timezone.now().date()
+        self.job_numbers = itertools.count()
+
+    def add_jobs(self, salaries, currency='USD', **kwargs):
+        for salary_min, salary_max in salaries:
+            job = Job.objects.create(
+                title='Engineer', company=self.company, description='...', status='approved',
+                external_url=f'https://example.com/jobs/{next(self.job_numbers)}', posted_date=self.today,
+                salary_min=salary_min, salary_max=salary_max, salary_currency=currency, **kwargs
+            )
+            job.skills.add(self.python)
+
+    def test_percentiles_match_numpy_across_chunks(self):
+        rng = random.Random(0)
+        lows = [rng.randrange(40_000, 200_000, 500) for _ in range(300)]
+        self.add_jobs([(low, low + 20_000) for low in lows], experience_level='senior')
+        self.add_jobs([(900_000, None), (None, 50_000)])  # overflow bin, one end only
+        self.add_jobs([(10_000, 20_000)], currency='EUR')
+
+        stats = salary_stats(chunk_size=64)
+        salaries = [low + 10_000 for low in lows] + [900_000, 50_000]
+        self.assertEqual(stats['overall']['jobs'], 302)
+        for q in (10, 50, 90):
+            self.assertAlmostEqual(stats['overall'][f'p{q}'], np.percentile(salaries, q), delta=1_000)
+        self.assertEqual(sum(row['jobs'] for row in stats['histogram']), 302)
+        self.assertEqual([row['skill'] for row in stats['by_skill']], ['Python'])
+        self.assertEqual(
+            {row['experience_level']: row['jobs'] for row in stats['by_experience']}, {'senior': 300, 'mid': 2}
+        )
+
+    def test_api_filters_by_currency_and_rejects_bad_dates(self):
+        self.add_jobs([(50_000, 70_000)], currency='EUR')
+        response = self.client.get('/api/jobs/salaries/', {'currency': 'eur', 'start': str(self.today)})
+        self.assertEqual(response.data['overall']['jobs'], 1)
+        self.assertEqual(response.data['by_skill'][0]['id'], self.python.pk)
+
+        response = self.client.get('/api/jobs/salaries/', {'end': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+# ----------------------- RELATED SKILLS -----------------------
+class SkillCooccurrenceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name='Acme')
+        self.python, self.django, self.go, self.sql = (
+            Skill.objects.create(name=name) for name in ('Python', 'Django', 'Go', 'SQL')
+        )
+        self.job_numbers = itertools.count()
+
+    def add_job(self, *skills, status='approved'):
+        job = Job.objects.create(
+            title='Engineer', company=self.company, description='...', posted_date=timezone.now().date(),
+            external_url=f'https://example.com/jobs/{next(self.job_numbers)}', status=status,
+        )
+        job.skills.add(*skills)
+        return job
+
+    def related(self, skill, **params):
+        response = self.client.get(f'/api/skills/{skill.pk}/related/', params)
+        return [(row['name'], row['jobs']) for row in response.data['related']]
+
+    def test_refresh_counts_new_links_incrementally(self):
+        self.add_job(self.python, self.django, self.sql)
+        self.add_job(self.python, self.django)
+        job = self.add_job(self.go)
+        cooccurrence.refresh()
+
+        # A new job, and a skill added to a job already counted
+        self.add_job(self.python, self.sql)
+        job.skills.add(self.sql)
+        with self.captureOnCommitCallbacks(execute=True):
+            incremental = cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Django', 2), ('SQL', 2)])
+        self.assertEqual(self.related(self.sql), [('Python', 2), ('Django', 1), ('Go', 1)])
+
+        rebuilt = cooccurrence.rebuild()
+        for name in ('indptr', 'indices', 'counts', 'totals'):
+            np.testing.assert_array_equal(getattr(incremental, name), getattr(rebuilt, name))
+        self.assertEqual((incremental.jobs, rebuilt.jobs), (4, 4))
+
+    def test_refresh_counts_links_committed_after_higher_ids(self):
+        Through = Job.skills.through
+        job = self.add_job(self.python, self.django)
+        # A link whose transaction is still open: its id is taken, the row not visible yet
+        late = Through.objects.get(job=job, skill=self.django)
+        late.delete()
+        self.add_job(self.python, self.go)
+        cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Go', 1)])
+
+        Through.objects.create(id=late.id, job=job, skill=self.django)
+        with self.captureOnCommitCallbacks(execute=True):
+            incremental = cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Django', 1), ('Go', 1)])
+        # Counted once, however often refresh() runs
+        incremental = cooccurrence.refresh()
+        rebuilt = cooccurrence.rebuild()
+        for name in ('indptr', 'indices', 'counts', 'totals'):
+            np.testing.assert_array_equal(getattr(incremental, name), getattr(rebuilt, name))
+        self.assertEqual((incremental.jobs, rebuilt.jobs), (2, 2))
+
+    def test_refresh_counts_approved_active_jobs_only(self):
+        self.add_job(self.python, self.django)
+        pending = self.add_job(self.python, self.go, status='pending')
+        closed = self.add_job(self.python, self.sql)
+        closed.is_active = False
+        closed.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Django', 1)])
+
+        # Approved after its links were passed over, and one counted job rejected
+        pending.status = 'approved'
+        pending.save()
+        Job.objects.filter(skills=self.django).update(status='rejected')
+        pending.skills.add(self.sql)
+        with self.captureOnCommitCallbacks(execute=True):
+            incremental = cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Go', 1), ('SQL', 1)])
+        self.assertEqual(self.related(self.django), [])
+
+        rebuilt = cooccurrence.rebuild()
+        for name in ('indptr', 'indices', 'counts', 'totals'):
+            np.testing.assert_array_equal(getattr(incremental, name), getattr(rebuilt, name))
+        self.assertEqual((incremental.jobs, rebuilt.jobs), (1, 1))
+
+    def test_refresh_recreates_a_flushed_matrix_row(self):
+        self.add_job(self.python, self.django)
+        SkillCooccurrence.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            cooccurrence.refresh()
+        self.assertEqual(self.related(self.python), [('Django', 1)])
+
+    def test_related_is_served_without_queries(self):
+        self.add_job(self.python, self.django)
+        self.add_job(self.python, self.django, self.go)
+        self.add_job(self.python)
+        for _ in range(3):
+            self.add_job(self.go)
+        with self.captureOnCommitCallbacks(execute=True):
+            cooccurrence.refresh()
+        self.client.get(f'/api/skills/{self.python.pk}/related/')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(f'/api/skills/{self.go.pk}/related/')
+        self.assertEqual(response.data['jobs'], 4)
+        self.assertEqual(self.related(self.python, limit=1), [('Django', 2)])
+        self.assertEqual(self.related(self.go), [('Python', 1), ('Django', 1)])
+        self.assertEqual(self.related(self.go, by='jaccard'), [('Django', 1), ('Python', 1)])
+        self.assertEqual(self.client.get('/api/skills/999/related/').status_code, 404)
+
+
+# ----------------------- SIMILAR JOBS -----------------------
+@override_settings(SIMILAR_JOBS_INDEX_MAX_AGE=0)
+class SimilarJobsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        # A process of its own, rebuilding inline: a background thread can't see the test's transaction
+        similar._index = None
+        rebuild_inline = mock.patch.object(similar, '_start_rebuild', similar._rebuild)
+        rebuild_inline.start()
+        self.addCleanup(rebuild_inline.stop)
+        self.acme, self.globex = Company.objects.create(name='Acme'), Company.objects.create(name='Globex')
+        self.python, self.django, self.kafka, self.go = (
+            Skill.objects.create(name=name) for name in ('Python', 'Django', 'Kafka', 'Go')
+        )
+        self.job_numbers = itertools.count()
+
+    def add_job(self, *skills, company=None, status='approved'):
+        job = Job.objects.create(
+            title=f'Engineer {next(self.job_numbers)}', company=company or self.globex, description='...',
+            external_url='https://example.com', status=status, posted_date=timezone.now().date(),
+        )
+        job.skills.add(*skills)
+        return job
+
+    def similar(self, job):
+        return [row['id'] for row in self.client.get(f'/api/jobs/{job.pk}/similar/').data]
+
+    def test_ranks_by_weighted_overlap_then_fills_from_the_company(self):
+        common = [self.add_job(self.python) for _ in range(3)]  # Python is common, so it weighs little
+        job = self.add_job(self.python, self.kafka, company=self.acme)
+        kafka = self.add_job(self.kafka)
+        python = self.add_job(self.python, self.django)
+        same_company = self.add_job(company=self.acme)
+        self.add_job(self.python, self.kafka, status='pending')
+
+        response = self.client.get(f'/api/jobs/{job.pk}/similar/', {'limit': 20})
+        self.assertEqual(
+            [row['id'] for row in response.data],
+            [kafka.pk] + [j.pk for j in reversed(common)] + [python.pk, same_company.pk],
+        )
+        self.assertIsNone(response.data[-1]['similarity'])
+
+        response = self.client.get(f'/jobs/{job.pk}/')
+        self.assertEqual([similar.pk for similar in response.context['similar_jobs']], self.similar(job))
+
+    def test_results_are_cached_until_the_jobs_skills_change(self):
+        job = self.add_job(self.python, company=self.acme)
+        python = self.add_job(self.python)
+        go = self.add_job(self.go)
+        self.assertEqual(self.similar(job), [python.pk])
+
+        with self.assertNumQueries(4):  # the job and the similar jobs, with their skills; no ranking
+            self.similar(job)
+        with self.captureOnCommitCallbacks(execute=True):
+            job.skills.set([self.go])
+        self.assertEqual(self.similar(job), [go.pk])
+
+
+@override_settings(SIMILAR_JOBS_INDEX_MAX_AGE=0)
+class SimilarJobsIndexTests(SimpleTestCase):
+
+    def test_the_old_index_is_served_while_one_thread_rebuilds_it(self):
+        old, new = object(), object()
+        similar._index = None
+        with mock.patch.object(similar.SimilarJobsIndex, 'build', return_value=old):
+            self.assertIs(similar.get_index(), old)  # a process's first lookup builds
+
+        caching.invalidate()
+        building, release = threading.Event(), threading.Event()
+
+        def slow_build():
+            building.set()
+            release.wait(5)
+            return new
+
+        with mock.patch.object(similar.SimilarJobsIndex, 'build', side_effect=slow_build) as build:
+            self.assertIs(similar.get_index(), old)
+            self.assertTrue(building.wait(5))
+            self.assertIs(similar.get_index(), old)
+            rebuilding = similar._rebuilding
+            release.set()
+            rebuilding.join(5)
+        self.assertEqual(build.call_count, 1)
+        self.assertIs(similar.get_index(), new)
+
+
+# ----------------------- BULK EXPORT -----------------------
+class JobExportTests(TestCase):
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme')
+        remote = Location.objects.create(city='Remote', country='Worldwide', is_remote=True)
+        python, java, javascript = (Skill.objects.create(name=name) for name in ('Python', 'Java', 'JavaScript'))
+        for i, (skills, status) in enumerate([
+            ([python], 'approved'), ([java, javascript], 'approved'), ([], 'approved'), ([java], 'pending'),
+        ]):
+            job = Job.objects.create(
+                title=f'Engineer {i}', company=company, location=remote, description='...',
+                external_url=f'https://example.com/jobs/{i}', status=status, salary_min=90000,
+                posted_date=timezone.now().date(),
+            )
+            job.skills.add(*skills)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_jobs', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_csv_has_one_row_per_approved_job_with_its_skills(self):
+        rows = list(csv.reader(StringIO(self.export('--chunk-size', '2'))))
+        self.assertEqual(rows[0][:3], ['id', 'title', 'company'])
+        self.assertEqual([(row[1], row[-1]) for row in rows[1:]], [
+            ('Engineer 0', 'Python'), ('Engineer 1', 'Java;JavaScript'), ('Engineer 2', ''),
+        ])
+
+        # The jobs page filters apply; a job matching through two skills is exported once
+        self.assertEqual(len(self.export('--skill', 'java').splitlines()), 2)
+        self.assertEqual(self.export('--skill', 'nothing').splitlines(), [','.join(rows[0])])  # just the header
+
+    def test_ndjson_endpoint_streams_with_page_filters(self):
+        response = self.client.get('/jobs/export.ndjson', {'skill': 'java'})
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([(row['title'], row['skills'], row['remote']) for row in rows], [
+            ('Engineer 1', ['Java', 'JavaScript'], True),
+        ])
+        self.assertEqual(self.client.get('/jobs/export.xml').status_code, 404)
+
+    def test_jobs_page_offers_parquet_only_with_pyarrow(self):
+        self.assertEqual(parquet_available(), b'export.parquet' in self.client.get('/jobs/').content)
+        with mock.patch('frontend.views.parquet_available', return_value=False):
+            self.assertNotContains(self.client.get('/jobs/'), 'export.parquet')
+
+    @unittest.skipUnless(parquet_available(), 'pyarrow is not installed')
+    def test_parquet_export_reads_back(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'jobs.parquet'
+            self.export('--format', 'parquet', '--output', str(path), '--chunk-size', '1')
+            table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column('skills').to_pylist(), [['Python'], ['Java', 'JavaScript'], []])
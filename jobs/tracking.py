@@ -0,0 +1,157 @@
+"""
+Buffered job-view tracking.
+
+Detail views call record_view(), which only appends an event to an
+in-process buffer. The buffer is flushed when it reaches FLUSH_SIZE
+events, every FLUSH_INTERVAL seconds from a background thread, and at
+interpreter exit. A flush bulk-inserts the JobView rows and applies one
+atomic `views = views + n` UPDATE per distinct n, so increments are never
+lost under concurrency and the request path does no writes.
+
+Configured by settings.JOB_VIEW_TRACKING:
+
+    'MODE': 'local'   # flush writes to the DB from this process
+            'celery'  # flush hands the batch to the flush_job_views task
+    'FLUSH_SIZE': 500
+    'FLUSH_INTERVAL': 5   # seconds; 0 disables the background thread
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models import F
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Job, JobView
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {'MODE': 'local', 'FLUSH_SIZE': 500, 'FLUSH_INTERVAL': 5}
+
+
+def write_events(events):
+    """Persist a batch of (job_id, ip_address, viewed_at) events."""
+    job_ids = {job_id for job_id, _, _ in events}
+    existing = set(Job.objects.filter(pk__in=job_ids).values_list('pk', flat=True))
+    events = [event for event in events if event[0] in existing]  # job may be gone by now
+    if not events:
+        return
+
+    # Jobs with the same number of new views share one UPDATE
+    by_count = defaultdict(list)
+    for job_id, n in Counter(job_id for job_id, _, _ in events).items():
+        by_count[n].append(job_id)
+
+    with transaction.atomic():
+        JobView.objects.bulk_create([
+            JobView(job_id=job_id, ip_address=ip_address, viewed_at=viewed_at)
+            for job_id, ip_address, viewed_at in events
+        ])
+        for n, ids in by_count.items():
+            Job.objects.filter(pk__in=ids).update(views=F('views') + n)
+
+
+def send_to_celery(events):
+    from .tasks import flush_job_views
+    flush_job_views.delay([(job_id, ip, viewed_at.isoformat()) for job_id, ip, viewed_at in events])
+
+
+class ViewBuffer:
+    """Thread-safe in-process queue of view events, flushed in batches."""
+
+    def __init__(self, flush, flush_size=500, flush_interval=5):
+        self.flush_batch = flush
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._events = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._pid = None
+
+    def record(self, job_id, ip_address=None):
+        self._ensure_started()
+        with self._lock:
+            self._events.append((job_id, ip_address, timezone.now()))
+            full = len(self._events) >= self.flush_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+        if not events:
+            return
+        try:
+            self.flush_batch(events)
+        except Exception:
+            logger.exception('Failed to flush %d job view events', len(events))
+
+    def stop(self):
+        self._stopped.set()
+        self.flush()
+
+    def _ensure_started(self):
+        # Start the flusher once per process (workers may fork after import)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._events = []
+            if self.flush_interval:
+                threading.Thread(target=self._run, name='job-view-flusher', daemon=True).start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = {**DEFAULTS, **getattr(settings, 'JOB_VIEW_TRACKING', {})}
+                _buffer = ViewBuffer(
+                    send_to_celery if config['MODE'] == 'celery' else write_events,
+                    flush_size=config['FLUSH_SIZE'],
+                    flush_interval=config['FLUSH_INTERVAL'],
+                )
+    return _buffer
+
+
+def record_view(job, ip_address=None):
+    """Queue a view of `job`; the in-memory instance reflects it straight away."""
+    get_view_buffer().record(job.pk, ip_address)
+    job.views += 1
+
+
+def flush_views():
+    if _buffer is not None:
+        _buffer.flush()
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer is not None:
+        _buffer.stop()
+
+
+@receiver(setting_changed)
+def _reset_buffer(setting, **kwargs):
+    global _buffer
+    if setting == 'JOB_VIEW_TRACKING' and _buffer is not None:
+        _buffer.stop()
+        _buffer = None
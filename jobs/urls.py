@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'companies', views.CompanyViewSet)
@@ -11,4 +11,9 @@ router.register(r'sources', views.JobSourceViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
+    
+    # Async versions of the hot read endpoints, for ASGI deployments (see jobs.async_views)
+    path('async/jobs/', async_views.job_list, name='async-job-list'),
+    path('async/jobs/<int:pk>/', async_views.job_detail, name='async-job-detail'),
+    path('async/skills/top_demanded/', async_views.top_demanded, name='async-skill-top-demanded'),
 ]
\ No newline at end of file
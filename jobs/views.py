@@ -1,11 +1,21 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Avg, Prefetch, Q
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
 
-from .models import Company, Skill, Location, Job, JobSource, JobView
+from .models import Company, Skill, Location, Job, JobSource
+from .caching import cached
+from .cooccurrence import get_matrix
+from .export import ndjson_response
+from .pagination import JobCursorPagination
+from .salaries import salary_stats
+from .search import JobSearchFilter
+from .similar import LIMIT as SIMILAR_LIMIT, similar_jobs
+from .tracking import record_view
 from .serializers import (
     CompanySerializer, SkillSerializer, LocationSerializer,
     JobListSerializer, JobDetailSerializer, JobSourceSerializer
@@ -43,15 +53,42 @@ class SkillViewSet(viewsets.ModelViewSet):
     def top_demanded(self, request):
         """Return top 10 most demanded skills based on job count."""
         
-        skills = Skill.objects.annotate(
-            job_count=Count(
-                'jobs',
-                filter=Q(jobs__is_active=True, jobs__status='approved')  # count only valid jobs
-            )
-        ).order_by('-job_count')[:10]  # top 10
+        # job_count is a maintained counter of approved, active jobs (see jobs.counters)
+        def top_skills():
+            skills = Skill.objects.order_by('-job_count')[:10]  # top 10
+            return self.get_serializer(skills, many=True).data
         
-        serializer = self.get_serializer(skills, many=True)
-        return Response(serializer.data)
+        # Cached until the next scrape or moderation change (see jobs.caching)
+        return Response(cached('top_demanded', top_skills))
+    
+    # Custom endpoint: /skills/{id}/related/?limit=10&by=jobs|jaccard
+    @action(detail=True, methods=['get'])
+    def related(self, request, pk=None):
+        """Skills most often listed together with this one.
+        
+        Read from the in-memory co-occurrence matrix (see jobs.cooccurrence), without
+        a database query; ?by=jaccard ranks by overlap rather than by shared jobs.
+        """
+        matrix = get_matrix()
+        skill_id = int(pk) if pk.isdigit() else None
+        if skill_id not in matrix.names:
+            raise NotFound()
+        by = request.query_params.get('by', 'jobs')
+        if by not in ('jobs', 'jaccard'):
+            return Response({'error': "by must be 'jobs' or 'jaccard'"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), 100) if limit.isdigit() else 10
+        
+        return Response({
+            'id': skill_id,
+            'name': matrix.names[skill_id],
+            'jobs': matrix.jobs_with(skill_id),
+            'related': [
+                {'id': other, 'name': matrix.names[other], 'jobs': shared, 'jaccard': round(jaccard, 4)}
+                for other, shared, jaccard in matrix.related(skill_id, limit, by)
+                if other in matrix.names
+            ],
+        })
 
 
 # ----------------------- LOCATION API -----------------------
@@ -67,11 +104,45 @@ class LocationViewSet(viewsets.ModelViewSet):
 class JobViewSet(viewsets.ModelViewSet):
     # Only show approved & active jobs
     queryset = Job.objects.filter(is_active=True, status='approved')
+    
+    # Actions that render JobListSerializer rows
+    LIST_ACTIONS = {'list', 'filter_by_skill', 'filter_by_location', 'recent_jobs'}
+    
+    # Columns JobListSerializer reads, plus scraped_at for the pagination cursor
+    LIST_FIELDS = [
+        'id', 'title', 'job_type', 'experience_level', 'salary_min', 'salary_max',
+        'salary_currency', 'posted_date', 'scraped_at', 'views',
+        'company__name', 'location__city', 'location__country', 'location__is_remote',
+    ]
 
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'company__name', 'tags']
+    # ?search= uses the full-text index (see jobs.search), ranked by relevance
+    filter_backends = [JobSearchFilter, filters.OrderingFilter]
     ordering_fields = ['posted_date', 'views', 'salary_min']
     
+    # Cursor pages (?cursor=) instead of page numbers: no COUNT, constant-time deep pages
+    pagination_class = JobCursorPagination
+    
+    # Per-action query plan: load exactly what the serializer reads, in a
+    # fixed number of queries however many jobs are on the page
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.LIST_ACTIONS:
+            return self.with_list_fields(queryset)
+        return self.with_detail_fields(queryset)
+    
+    # Shared with the async endpoints (see jobs.async_views)
+    @classmethod
+    def with_list_fields(cls, queryset):
+        return queryset.select_related('company', 'location').only(*cls.LIST_FIELDS).prefetch_related(
+            Prefetch('skills', queryset=Skill.objects.only('name'))
+        )
+    
+    @classmethod
+    def with_detail_fields(cls, queryset):
+        return queryset.select_related('company', 'location', 'source').prefetch_related(
+            Prefetch('skills', queryset=Skill.objects.only('name', 'category', 'job_count'))
+        )
+    
     # Use detailed serializer only when retrieving a single job
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -82,15 +153,8 @@ class JobViewSet(viewsets.ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         
-        # Count view
-        instance.views += 1
-        instance.save(update_fields=['views'])
-        
-        # Record the view with IP
-        JobView.objects.create(
-            job=instance,
-            ip_address=self.get_client_ip(request)
-        )
+        # Count view (buffered and written in batches, see jobs.tracking)
+        record_view(instance, ip_address=self.get_client_ip(request))
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -107,41 +171,118 @@ class JobViewSet(viewsets.ModelViewSet):
     # Custom API: /jobs/filter_by_skill/?skill=python
     @action(detail=False, methods=['get'])
     def filter_by_skill(self, request):
-        """Filter jobs based on skill name."""
+        """Filter jobs based on skill name.
+        
+        Paginated like the list endpoint: at most 100 jobs per page
+        (?page_size=, default 20). ?stream=1 returns every match as NDJSON.
+        """
         skill_name = request.query_params.get('skill', None)
         if skill_name:
-            jobs = self.queryset.filter(skills__name__icontains=skill_name)
-            serializer = self.get_serializer(jobs, many=True)
-            return Response(serializer.data)
+            # Subquery rather than a join, so a job matching several skills is listed once
+            job_ids = Job.skills.through.objects.filter(
+                skill__name__icontains=skill_name
+            ).values('job_id')
+            return self.list_response(self.get_queryset().filter(pk__in=job_ids))
         return Response({'error': 'Skill parameter required'}, status=400)
     
     # Custom API: /jobs/filter_by_location/
     @action(detail=False, methods=['get'])
     def filter_by_location(self, request):
-        """Filter jobs based on city or country."""
+        """Filter jobs based on city or country.
+        
+        At most 100 jobs per page (?page_size=, default 20); ?stream=1 for NDJSON.
+        """
         city = request.query_params.get('city', None)
         country = request.query_params.get('country', None)
         
-        jobs = self.queryset
+        jobs = self.get_queryset()
         if city:
             jobs = jobs.filter(location__city__icontains=city)
         if country:
             jobs = jobs.filter(location__country__icontains=country)
         
-        serializer = self.get_serializer(jobs, many=True)
-        return Response(serializer.data)
+        return self.list_response(jobs)
     
     # Custom API: /jobs/recent_jobs/
     @action(detail=False, methods=['get'])
     def recent_jobs(self, request):
-        """Return jobs posted in the last 7 days."""
+        """Return jobs posted in the last 7 days.
+        
+        At most 100 jobs per page (?page_size=, default 20); ?stream=1 for NDJSON.
+        """
         seven_days_ago = timezone.now().date() - timedelta(days=7)
-        jobs = self.queryset.filter(posted_date__gte=seven_days_ago)
-        serializer = self.get_serializer(jobs, many=True)
-        return Response(serializer.data)
+        jobs = self.get_queryset().filter(posted_date__gte=seven_days_ago)
+        return self.list_response(jobs)
+    
+    # Custom API: /jobs/{id}/similar/?limit=4
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """Approved jobs ranked by IDF-weighted skill overlap with this one (see jobs.similar).
+        
+        similarity is the weighted Jaccard index, null for same-company fill-ins.
+        """
+        job = self.get_object()
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), SIMILAR_LIMIT) if limit.isdigit() else 4
+        
+        jobs = similar_jobs(job, limit, queryset=self.with_list_fields(Job.objects.all()))
+        data = self.get_serializer(jobs, many=True).data
+        for row, similar_job in zip(data, jobs):
+            row['similarity'] = None if similar_job.similarity is None else round(similar_job.similarity, 4)
+        return Response(data)
+    
+    # Custom API: /jobs/salaries/?currency=USD&start=YYYY-MM-DD&end=YYYY-MM-DD
+    @action(detail=False, methods=['get'])
+    def salaries(self, request):
+        """Salary percentiles and histogram of approved, active jobs, overall and per
+        experience level, skill and location (see jobs.salaries)."""
+        params = {
+            'currency': request.query_params.get('currency', 'USD').upper()[:3],
+            'start': self.parse_date_param('start'),
+            'end': self.parse_date_param('end'),
+        }
+        if None in (params['start'], params['end']):
+            return Response({'error': 'start and end must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(cached('salaries', lambda: salary_stats(**params), params=params))
+    
+    def parse_date_param(self, name):
+        """The ?name= date, '' when absent, None when invalid."""
+        value = self.request.query_params.get(name, '')
+        if not value:
+            return ''
+        try:
+            return parse_date(value)
+        except ValueError:
+            return None
+    
+    # Respond like the list endpoint: ?search=/?ordering= apply, then one cursor page.
+    # Bulk consumers can pass ?stream=1 to get every row as NDJSON, read in chunks.
+    def list_response(self, jobs):
+        jobs = self.filter_queryset(jobs)
+        if self.request.query_params.get('stream', '').lower() in ('1', 'true'):
+            return ndjson_response(jobs, self.get_serializer_class(), context=self.get_serializer_context())
+        
+        page = self.paginate_queryset(jobs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 # ----------------------- JOB SOURCE API -----------------------
 class JobSourceViewSet(viewsets.ModelViewSet):
-    queryset = JobSource.objects.all()
+    # Count active jobs in the same query instead of once per source
+    queryset = JobSource.objects.annotate(
+        job_count=Count('jobs', filter=Q(jobs__is_active=True))
+    ).order_by('name')
     serializer_class = JobSourceSerializer
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.reload_annotated(serializer)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.reload_annotated(serializer)
+
+    def reload_annotated(self, serializer):
+        # A saved instance has no job_count: respond with the row as the queryset reads it
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
@@ -149,4 +149,50 @@ REST_FRAMEWORK = {
 }
 
 # CORS settings (for development)
-CORS_ALLOW_ALL_ORIGINS = True
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True
+
+# Celery (background tasks) - Redis broker
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    # Daily dashboard rollups (see analytics/rollup.py); each run only redoes changed days
+    'rollup-analytics': {'task': 'analytics.tasks.rollup_analytics', 'schedule': 600},
+    # Job sources whose scraping_frequency has elapsed (see jobs/scraper/scheduler.py)
+    'scrape-due-sources': {'task': 'jobs.tasks.scrape_due_sources', 'schedule': 900},
+    # Skill pairs from scratch: drops removed links, adds any committed too late to refresh (see jobs/cooccurrence.py)
+    'rebuild-skill-cooccurrence': {'task': 'jobs.tasks.rebuild_skill_cooccurrence', 'schedule': 86400},
+}
+
+# Job view tracking (see jobs/tracking.py)
+# Views are buffered in memory and written in batches.
+# MODE 'local' writes from the web process, 'celery' hands batches to a worker.
+JOB_VIEW_TRACKING = {
+    'MODE': os.environ.get('JOB_VIEW_TRACKING_MODE', 'local'),
+    'FLUSH_SIZE': 500,    # Flush once this many views are queued
+    'FLUSH_INTERVAL': 5,  # ...or every N seconds
+}
+# Cache - local memory by default, Redis when REDIS_URL is set
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Aggregate data cache (see jobs/caching.py)
+# Entries are recomputed after DATA_CACHE_TIMEOUT seconds or when jobs change,
+# and served stale for up to DATA_CACHE_STALE_TIMEOUT while that happens.
+DATA_CACHE_TIMEOUT = 300
+DATA_CACHE_STALE_TIMEOUT = 24 * 3600
+
+# Similar-jobs index (see jobs/similar.py): each process rebuilds it after jobs
+# change, at most once per SIMILAR_JOBS_INDEX_MAX_AGE seconds, on a background
+# thread while requests keep using the previous one.
+SIMILAR_JOBS_INDEX_MAX_AGE = 300
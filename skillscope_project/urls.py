@@ -5,6 +5,7 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/analytics/', include('analytics.urls')),
     path('api/', include('jobs.urls')),
     path('', include('frontend.urls')),  # Add this
 ]